@@ -1,18 +1,67 @@
 # backend/api/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.schema import CreateIndex, CreateTable
 from backend.api.routes import telemetry, anomaly
+from ..core.config import RAW_STORE_ENABLED, ROLLUPS_ENABLED, SHARED_STATE_NAME
 from ..core.database import Base, engine
 from ..core.logger import logger
+from ..services.persistence import event_writer
+from ..services.raw_store import raw_store
+from ..services.rollups import rollups
+from ..services.partitions import anomaly_store
+from ..inference.run_inference import model_registry
+from ..services.pipeline import detector_pipeline
+from ..services.shm import claim_single_process
 
 # in main.py (where other routers are included)
-from .routes import telemetry, anomaly, alerts
+from .routes import telemetry, anomaly, alerts, metrics, fusion
 
-# create tables
-Base.metadata.create_all(bind=engine)
+# create tables, and indexes introduced after a table was created; IF NOT EXISTS
+# because every uvicorn worker runs this at the same time
+with engine.begin() as conn:
+    for table in Base.metadata.sorted_tables:
+        conn.execute(CreateTable(table, if_not_exists=True))
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
 logger.info("Database tables ensured.")
 
-app = FastAPI(title="Satellite Anomaly Detector", version="0.1.0")
+
+def _check_single_worker():
+    """
+    The raw store and the rollups live in this process only: a second worker
+    would overwrite the first one's raw segments and serve a partial rollup.
+    """
+    per_process = [name for name, on in (("RAW_STORE_ENABLED", RAW_STORE_ENABLED),
+                                         ("ROLLUPS_ENABLED", ROLLUPS_ENABLED)) if on]
+    if per_process and not claim_single_process(f"{SHARED_STATE_NAME}-single-worker"):
+        raise RuntimeError(
+            f"another worker is already running with {' and '.join(per_process)}; "
+            f"run one worker, or set {'=0 '.join(per_process)}=0 SHARED_STATE_ENABLED=1 to run "
+            f"several (the default when WEB_CONCURRENCY > 1, see docs/internals.md)"
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _check_single_worker()
+    event_writer.start()
+    # rebuild rollups from stored events without delaying startup
+    backfill = rollups.start_backfill(anomaly_store) if ROLLUPS_ENABLED else None
+    # retention / archiving, only once the backfill has read what it needs
+    anomaly_store.start_maintenance(wait_for=backfill)
+    # map and warm the model weights in the background; requests meanwhile score without them
+    model_registry.warm()
+    yield
+    # drain queued anomaly events before the process exits
+    event_writer.stop()
+    anomaly_store.stop_maintenance()
+    raw_store.close()
+    detector_pipeline.close()
+
+
+app = FastAPI(title="Satellite Anomaly Detector", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,9 +71,12 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
-app.include_router(telemetry.router, prefix="/telemetry", tags=["telemetry"])
-app.include_router(anomaly.router, prefix="/anomalies", tags=["anomalies"])
-app.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
+# routers already carry their own prefix
+app.include_router(telemetry.router)
+app.include_router(anomaly.router)
+app.include_router(alerts.router)
+app.include_router(metrics.router)
+app.include_router(fusion.router)
 @app.get("/")
 def root():
     return {"message": "Satellite Anomaly Detector Backend is running"}
@@ -1,34 +1,184 @@
 # backend/api/routes/anomaly.py
-from fastapi import APIRouter, Query
+import asyncio
+import base64
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from backend.services.state import get_latest_anomalies
-from backend.core.database import SessionLocal
-from backend.core.models import AnomalyEvent
+from backend.services.feed import anomaly_feed
+from backend.services.rollups import rollups
+from backend.services.response_cache import response_cache
+from backend.utils.helpers import parse_timestamp, epoch_seconds
+from backend.core.config import FEED_HEARTBEAT_S, ROLLUPS_ENABLED
+from backend.services.partitions import anomaly_store
 
 router = APIRouter(prefix="/anomalies", tags=["Anomalies"])
 
+
+def _cached(request: Request, endpoint: str, params: dict, compute) -> Response:
+    """
+    Serve `compute()` through the versioned response cache: 304 if the
+    client's If-None-Match is still current, else the cached or freshly
+    rendered JSON body with its ETag.
+    """
+    key = response_cache.key(endpoint, params)
+    if response_cache.not_modified(key, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers={"ETag": response_cache.etag(key)})
+    body, etag = response_cache.get_or_render(key, compute)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
 @router.get("/latest")
-def latest_anomalies():
-    return {"data": get_latest_anomalies()}
+def latest_anomalies(
+    request: Request,
+    limit: int = Query(200, ge=1),
+    satellite_id: Optional[str] = None,
+):
+    """
+    Most recent anomaly records, newest first: fleet-wide, or for one
+    satellite. `limit` is capped by the in-memory ring sizes.
+    """
+    return _cached(
+        request, "latest", {"limit": limit, "satellite_id": satellite_id},
+        lambda: {"data": get_latest_anomalies(limit, satellite_id)},
+    )
+
+@router.get("/stream")
+async def stream_anomalies(
+    request: Request,
+    satellite_id: Optional[List[str]] = Query(None),
+    severity: Optional[List[str]] = Query(None),
+):
+    """
+    Server-sent events: each new anomaly record is pushed once, as
+    `event: anomaly` with the record (same shape as /latest items) as data.
+    Repeat satellite_id / severity to filter on several values.
+    """
+    sub = anomaly_feed.subscribe(satellite_id, severity)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    seq, payload = await asyncio.wait_for(sub.queue.get(), timeout=FEED_HEARTBEAT_S)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"id: {seq}\nevent: anomaly\ndata: {payload}\n\n"
+        finally:
+            anomaly_feed.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _encode_cursor(ts: datetime, event_id: int) -> str:
+    raw = f"{ts.isoformat()}|{event_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, event_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(event_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=422, detail="invalid cursor")
+
 
 @router.get("/history")
-def get_anomaly_history(limit: int = Query(50, ge=1, le=200)):
-    db = SessionLocal()
+def get_anomaly_history(
+    request: Request,
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    satellite_id: Optional[str] = None,
+    severity: Optional[str] = None,
+    issue: Optional[str] = None,
+    from_: Optional[str] = Query(None, alias="from", description="ISO-8601, inclusive"),
+    to: Optional[str] = Query(None, description="ISO-8601, exclusive"),
+):
+    """
+    Stored anomaly events, newest first, paged by keyset over (timestamp, id):
+    pass the returned next_cursor to get the following page. Each page costs
+    O(limit) thanks to the (satellite_id|severity, timestamp, id) indexes of
+    the day partitions; archived days are read from their archive files.
+    Served through the response cache (ETag / If-None-Match).
+    """
+    params = {
+        "limit": limit, "cursor": cursor, "satellite_id": satellite_id,
+        "severity": severity, "issue": issue, "from_": from_, "to": to,
+    }
+    return _cached(request, "history", params, lambda: _history_page(**params))
+
+
+def _history_page(
+    limit: int,
+    cursor: Optional[str],
+    satellite_id: Optional[str],
+    severity: Optional[str],
+    issue: Optional[str],
+    from_: Optional[str],
+    to: Optional[str],
+):
+    try:
+        t_from = parse_timestamp(from_) if from_ is not None else None
+        t_to = parse_timestamp(to) if to is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    before = _decode_cursor(cursor) if cursor is not None else None
+
+    # routed to the day partitions / archives that overlap the range
+    rows = anomaly_store.history(
+        limit + 1, before=before, satellite_id=satellite_id, severity=severity,
+        issue=issue, t_from=t_from, t_to=t_to,
+    )
+    more = len(rows) > limit
+    rows = rows[:limit]
+    result = [
+        {
+            "timestamp": r["timestamp"],
+            "satellite_id": r["satellite_id"],
+            "severity": r["severity"],
+            "issues": r["issues"].split(",") if r["issues"] else [],
+            "score": r["score"],
+        } for r in rows
+    ]
+    next_cursor = _encode_cursor(rows[-1]["timestamp"], rows[-1]["id"]) if more else None
+    return {"data": result, "next_cursor": next_cursor}
+
+@router.get("/rollup")
+def get_anomaly_rollup(
+    request: Request,
+    satellite_id: str,
+    start: str = Query(..., description="ISO-8601, inclusive"),
+    end: str = Query(..., description="ISO-8601, exclusive"),
+    points: int = Query(500, ge=1, le=5000),
+):
+    """
+    Bucketed anomaly history for long ranges. The resolution (1m / 1h / 1d)
+    is the finest one that fits `points` buckets; each bucket has count,
+    max/mean score, a severity histogram and issue counts.
+    """
     try:
-        rows = (
-            db.query(AnomalyEvent)
-            .order_by(AnomalyEvent.id.desc())
-            .limit(limit)
-            .all()
-        )
-        result = [
-            {
-                "timestamp": r.timestamp,
-                "satellite_id": r.satellite_id,
-                "severity": r.severity,
-                "issues": r.issues.split(",") if r.issues else [],
-                "score": r.score,
-            } for r in rows
-        ]
-        return {"data": result}
-    finally:
-        db.close()
+        t0 = epoch_seconds(parse_timestamp(start))
+        t1 = epoch_seconds(parse_timestamp(end))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if t1 <= t0:
+        raise HTTPException(status_code=422, detail="end must be after start")
+    if not ROLLUPS_ENABLED:
+        raise HTTPException(status_code=503, detail="rollups are disabled (ROLLUPS_ENABLED=0)")
+    return _cached(
+        request, "rollup", {"satellite_id": satellite_id, "t0": t0, "t1": t1, "points": points},
+        lambda: {"satellite_id": satellite_id, **rollups.query(satellite_id, t0, t1, points)},
+    )
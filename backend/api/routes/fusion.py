@@ -0,0 +1,58 @@
+# backend/api/routes/fusion.py
+from fastapi import APIRouter, HTTPException
+from typing import Any, Dict, List
+
+import numpy as np
+
+from backend.api.routes.telemetry import Telemetry, MAX_BATCH_SIZE
+from backend.services.pipeline import detector_pipeline
+from backend.services.preprocess import preprocess_telemetry_batch
+from backend.utils.helpers import parse_timestamp, epoch_seconds
+
+router = APIRouter(prefix="/fusion", tags=["Fusion"])
+
+
+def _json_float(x: float):
+    return None if np.isnan(x) else float(x)
+
+
+def _fuse(samples: List[Telemetry]) -> List[Dict[str, Any]]:
+    """Run the detector DAG over the samples (one pipeline run) and shape one result per sample."""
+    run = detector_pipeline.run({
+        "satellite_ids": [s.satellite_id for s in samples],
+        "t": np.fromiter((epoch_seconds(parse_timestamp(s.timestamp)) for s in samples), dtype=float, count=len(samples)),
+        "features": preprocess_telemetry_batch(samples),
+    })
+    fused = run["fusion"]
+    if fused is None:
+        raise HTTPException(status_code=500, detail=f"Fusion failed: {run.failed or run.skipped}")
+    missing = run.late + list(run.failed) + run.skipped
+    details = {name: [_json_float(x) for x in scores.tolist()] for name, scores in fused["details"].items()}
+    return [
+        {
+            "timestamp": s.timestamp,
+            "satellite_id": s.satellite_id,
+            "fusion_score": float(fused["fusion_score"][i]),
+            "severity": str(fused["severity"][i]),
+            "details": {name: scores[i] for name, scores in details.items()},
+            "missing_detectors": missing,
+        }
+        for i, s in enumerate(samples)
+    ]
+
+
+@router.post("/")
+def fuse_one(sample: Telemetry):
+    return _fuse([sample])[0]
+
+
+@router.post("/batch")
+def fuse_batch(samples: List[Telemetry]):
+    if len(samples) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(samples)} samples (max {MAX_BATCH_SIZE})",
+        )
+    if not samples:
+        return {"results": []}
+    return {"results": _fuse(samples)}
@@ -0,0 +1,40 @@
+# backend/api/routes/metrics.py
+from fastapi import APIRouter
+
+from backend.services.persistence import event_writer
+from backend.services.feed import anomaly_feed
+from backend.services.admission import admission
+from backend.services.rollups import rollups
+from backend.services.response_cache import response_cache
+from backend.services.state import STATE
+from backend.services.partitions import anomaly_store
+from backend.services.feature_engineering import rolling_features
+from backend.services.change_detectors import change_detectors
+from backend.services.matrix_profile import comms_discords
+from backend.services.pipeline import detector_pipeline
+from backend.models.orbit_kalman import orbit_ekf
+from backend.inference import run_inference
+from backend.api.routes.telemetry import single_sample_batcher
+from backend.utils.thresholds import threshold_rules
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/")
+def get_metrics():
+    return {
+        "persistence": event_writer.stats(),
+        "feed": anomaly_feed.stats(),
+        "admission": admission.stats(),
+        "rollups": rollups.stats(),
+        "response_cache": response_cache.stats(),
+        "state": STATE.stats(),
+        "storage": anomaly_store.stats(),
+        "threshold_rules": threshold_rules.stats(),
+        "rolling_features": rolling_features.stats(),
+        "change_detectors": change_detectors.stats(),
+        "comms_discords": comms_discords.stats(),
+        "models": run_inference.stats(),
+        "micro_batch": single_sample_batcher.stats(),
+        "pipeline": detector_pipeline.stats(),
+        "orbit_ekf": orbit_ekf.stats(),
+    }
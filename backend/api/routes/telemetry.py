@@ -1,20 +1,47 @@
 # backend/api/routes/telemetry.py
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Any, Dict
-
-from backend.services.preprocess import preprocess_telemetry
-from backend.services.anomaly_engine import compute_anomaly
-from backend.services.state import add_anomaly_record
-from backend.core.database import SessionLocal
-from backend.core.models import AnomalyEvent
+import asyncio
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, ValidationError, field_validator
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from backend.services.preprocess import preprocess_telemetry, preprocess_telemetry_batch
+from backend.services.anomaly_engine import compute_anomaly_batch
+from backend.services.feature_engineering import rolling_features
+from backend.services.change_detectors import change_detectors
+from backend.services.matrix_profile import comms_discords
+from backend.inference.run_inference import run_models
+from backend.services.state import add_anomaly_records
+from backend.services.persistence import event_writer, PersistenceQueueFull
+from backend.services.admission import admission, AdmissionRejected
+from backend.services.micro_batch import MicroBatcher
+from backend.services.columnar import decode_columnar, encode_npz, ColumnarFormatError, UnsupportedColumnarFormat, NPZ_CONTENT_TYPE
+from backend.services.preprocess import FEATURE_FIELDS
 from backend.core.logger import logger   # note: absolute import, no "..."
+from backend.services.raw_store import raw_store
+from backend.services.rollups import rollups
+from backend.services.response_cache import response_cache
+from backend.core.config import RAW_STORE_ENABLED, ROLLUPS_ENABLED, ROLLING_FEATURES_ENABLED, CHANGE_DETECTORS_ENABLED, DISCORDS_ENABLED, MICRO_BATCH_ENABLED
+from backend.utils.helpers import parse_timestamp, epoch_seconds
 
 
 # Single router for telemetry
 router = APIRouter(prefix="/telemetry", tags=["Telemetry"])
 
+# Upper bound on samples accepted by one /telemetry/batch request
+MAX_BATCH_SIZE = 10000
+# Columnar payloads carry no per-row objects, so they can be larger
+MAX_COLUMNAR_ROWS = 100000
+# Body size checked before reading: a generous per-row allowance for the string columns
+MAX_COLUMNAR_BYTES = MAX_COLUMNAR_ROWS * 1024
+# Frames a /telemetry/stream connection may have queued before we stop reading the socket
+STREAM_MAX_INFLIGHT = 32
+
 
 # ----- Pydantic schema -----
 class Telemetry(BaseModel):
@@ -41,53 +68,405 @@ class Telemetry(BaseModel):
     comms_snr: float
     comms_packet_loss: float
 
+    @field_validator("timestamp")
+    @classmethod
+    def _parseable_timestamp(cls, v: str) -> str:
+        parse_timestamp(v)  # ValueError -> 422 for this sample only
+        return v
+
+
+def _event_row(timestamp: datetime, satellite_id: str, anomaly: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values of the AnomalyEvent persisted for one scored sample."""
+    return {
+        "timestamp": timestamp,
+        "satellite_id": satellite_id,
+        "severity": anomaly.get("severity", "normal"),
+        "issues": ",".join(anomaly.get("issues", [])),
+        "score": float(anomaly.get("score", 0.0)),
+    }
+
+
+def _admit(satellite_ids: List[str], features: np.ndarray, model) -> np.ndarray:
+    """
+    Admission control before any stateful detector sees the samples. The
+    priority lane goes by a preliminary score on the sample's own channels
+    and the model columns; the rolling, change-point and discord columns
+    are only known once the sample has been admitted.
+    """
+    preliminary = compute_anomaly_batch(features, model=model)
+    critical = np.asarray(preliminary.ruleset.severity_names)[preliminary.severity] == "critical"
+    return admission.admit(satellite_ids, critical)
+
+
+def _score_and_store(timestamps: List[str], satellite_ids: List[str], features) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """
+    Run the autoencoder (if one is loaded), admit the samples (see _admit),
+    update the rolling-window features, change-point detectors and comms
+    matrix profiles of the admitted ones, and score them in one vectorized
+    pass. The admitted AnomalyEvents are queued as one unit, their raw
+    feature rows appended to the raw store, folded into the rollups and
+    added to in-memory state, then the response cache version is bumped.
+
+    Returns (admitted records, indices of shed samples).
+    Raises AdmissionRejected if nothing was admitted.
+    """
+    # everything that can reject a sample runs before slots are reserved
+    parsed = [parse_timestamp(ts) for ts in timestamps]
+    t = np.fromiter((epoch_seconds(p) for p in parsed), dtype=float, count=len(parsed))
+    model = run_models(features)
+
+    mask = _admit(satellite_ids, features, model)
+    shed: List[int] = []
+    if not mask.all():
+        shed = np.nonzero(~mask)[0].tolist()
+        keep = mask.nonzero()[0]
+        timestamps = [timestamps[i] for i in keep]
+        satellite_ids = [satellite_ids[i] for i in keep]
+        parsed = [parsed[i] for i in keep]
+        t, features = t[mask], features[mask]
+        model = model[mask] if model is not None else None
+
+    try:
+        rolling = change = discords = None
+        if ROLLING_FEATURES_ENABLED:
+            rolling = rolling_features.update(satellite_ids, t, features)
+        if CHANGE_DETECTORS_ENABLED:
+            change = change_detectors.update(satellite_ids, features)
+        if DISCORDS_ENABLED:
+            discords = comms_discords.update(satellite_ids, features)
+
+        # issue bitmasks until here; the JSON replies and event rows need dicts
+        anomalies = compute_anomaly_batch(features, rolling, change, model, discords).to_dicts()
+
+        records = [
+            {
+                "timestamp": ts,
+                "satellite_id": sid,
+                "anomaly": anomaly,
+            }
+            for ts, sid, anomaly in zip(timestamps, satellite_ids, anomalies)
+        ]
+        rows = [_event_row(p, sid, a) for p, sid, a in zip(parsed, satellite_ids, anomalies)]
+        event_writer.submit(rows)
+    except Exception:
+        # the event writer never got the rows, so it will not free their slots
+        admission.release([{"satellite_id": sid} for sid in satellite_ids])
+        raise
+
+    if RAW_STORE_ENABLED and rows:
+        raw_store.append_batch(satellite_ids, t, features)
+    if ROLLUPS_ENABLED:
+        rollups.add_records(records, t)
+
+    add_anomaly_records(records, t)
+    response_cache.bump()
+    return records, shed
+
+
+def _score_single_samples(items: List[Tuple[str, str, np.ndarray]]) -> List[Any]:
+    """
+    MicroBatcher process function for POST /telemetry/: items are
+    (timestamp, satellite_id, feature vector). Items that cannot be scored
+    get their own exception; one _score_and_store call serves the rest, and
+    each gets its record, or the exception for its row.
+    """
+    results: List[Any] = [None] * len(items)
+    valid = []
+    for i, (ts, _, row) in enumerate(items):
+        try:
+            parse_timestamp(ts)
+            if np.shape(row) != (len(FEATURE_FIELDS),):
+                raise ValueError(f"expected {len(FEATURE_FIELDS)} features, got shape {np.shape(row)}")
+        except (ValueError, TypeError) as e:
+            results[i] = e
+        else:
+            valid.append(i)
+    if not valid:
+        return results
+
+    timestamps, satellite_ids, rows = zip(*(items[i] for i in valid))
+    try:
+        records, shed = _score_and_store(list(timestamps), list(satellite_ids), np.stack(rows))
+    except (AdmissionRejected, PersistenceQueueFull) as e:
+        for i in valid:
+            results[i] = e
+        return results
+    shed_set = set(shed)
+    admitted = iter(records)
+    for k, i in enumerate(valid):
+        results[i] = admission.reject_shed() if k in shed_set else next(admitted)
+    return results
+
+
+# concurrent single-sample requests are scored together
+single_sample_batcher = MicroBatcher(_score_single_samples, name="telemetry")
+
+
+def _rejected(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+
 
 # ----- Main endpoint -----
 @router.post("/", status_code=200)
 async def receive_telemetry(data: Telemetry):
     """
     Ingest a single telemetry sample, run preprocessing + anomaly detection,
-    store result in memory and DB, and return anomaly summary.
+    store result in memory, queue it for the DB, and return anomaly summary.
     """
+    if admission.saturated():
+        raise _rejected(admission.reject_saturated())
+
     try:
         logger.info(f"Received telemetry for {data.satellite_id} at {data.timestamp}")
 
         # Convert to dict for downstream functions
-        payload: Dict[str, Any] = data.dict()
+        payload: Dict[str, Any] = data.model_dump()
 
         # 1) Preprocess features (expects dict)
         features = preprocess_telemetry(payload)
 
-        # 2) Run anomaly engine (make sure this works with dict, not attributes!)
-        anomaly: Dict[str, Any] = compute_anomaly(features)
+        # 2) Run anomaly engine (with the satellite's rolling features), then admission
+        #    control, queue for DB persistence, keep raw features, add to in-memory state;
+        #    batched with the other requests arriving within MICRO_BATCH_MAX_WAIT_MS
+        item = (data.timestamp, data.satellite_id, features)
+        if MICRO_BATCH_ENABLED:
+            record = await single_sample_batcher.submit(item)
+        else:
+            record = _score_single_samples([item])[0]
+            if isinstance(record, Exception):
+                raise record
+
+        return {"status": "ok", **record}
+
+    except AdmissionRejected as e:
+        raise _rejected(e)
+    except PersistenceQueueFull as e:
+        logger.warning(f"/telemetry rejected: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in /telemetry: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ----- Batch endpoint -----
+@router.post("/batch", status_code=200)
+async def receive_telemetry_batch(samples: List[Telemetry]):
+    """
+    Ingest many telemetry samples at once: build one (N, 15) feature matrix,
+    score all rows in a single vectorized pass, and hand every AnomalyEvent
+    to the event writer as one unit (bulk insert, group commit).
+
+    Per-sample results are identical to POST /telemetry/.
+    """
+    if len(samples) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(samples)} samples (max {MAX_BATCH_SIZE})",
+        )
+    if not samples:
+        return {"status": "ok", "count": 0, "results": [], "shed": []}
+    if admission.saturated():
+        raise _rejected(admission.reject_saturated(len(samples)))
+
+    try:
+        logger.info(f"Received telemetry batch of {len(samples)} samples")
 
-        # Prepare record to keep history
-        record = {
-            "timestamp": data.timestamp,
-            "satellite_id": data.satellite_id,
-            "anomaly": anomaly,
+        # 1) Preprocess all samples into one matrix
+        features = preprocess_telemetry_batch(samples)
+
+        # 2) Score, admit, queue for DB, keep in memory
+        records, shed = _score_and_store(
+            [s.timestamp for s in samples],
+            [s.satellite_id for s in samples],
+            features,
+        )
+
+        return {"status": "ok", "count": len(records), "results": records, "shed": shed}
+
+    except AdmissionRejected as e:
+        raise _rejected(e)
+    except PersistenceQueueFull as e:
+        logger.warning(f"/telemetry/batch rejected: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in /telemetry/batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ----- Columnar endpoint -----
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Payload too large (max {limit} bytes)")
+
+
+async def _read_body(request: Request, limit: int) -> bytes:
+    """The request body, refused with 413 before (or while) reading once it exceeds `limit` bytes."""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > limit:
+        raise _too_large(limit)
+    body = bytearray()
+    async for chunk in request.stream():  # chunked uploads carry no Content-Length
+        body += chunk
+        if len(body) > limit:
+            raise _too_large(limit)
+    return bytes(body)
+
+
+@router.post("/columnar", status_code=200)
+async def receive_telemetry_columnar(request: Request):
+    """
+    Ingest a columnar binary payload (NPZ, structured NPY, or Arrow IPC
+    when pyarrow is installed). Numeric columns map straight onto the
+    (N, 15) feature matrix without building per-sample objects.
+
+    Results come back column-wise, in input row order, for admitted rows;
+    "shed" lists the input rows dropped by admission control.
+    """
+    body = await _read_body(request, MAX_COLUMNAR_BYTES)
+    try:
+        timestamps, satellite_ids, features = decode_columnar(
+            body, request.headers.get("content-type", "")
+        )
+    except UnsupportedColumnarFormat as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ColumnarFormatError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    n = features.shape[0]
+    if n > MAX_COLUMNAR_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Payload too large: {n} rows (max {MAX_COLUMNAR_ROWS})",
+        )
+    if n and admission.saturated():
+        raise _rejected(admission.reject_saturated(n))
+
+    try:
+        logger.info(f"Received columnar telemetry with {n} rows")
+
+        records, shed = _score_and_store(timestamps.tolist(), satellite_ids.tolist(), features)
+
+        return {
+            "status": "ok",
+            "count": len(records),
+            "severity": [r["anomaly"]["severity"] for r in records],
+            "score": [r["anomaly"]["score"] for r in records],
+            "issues": [r["anomaly"]["issues"] for r in records],
+            "shed": shed,
         }
 
-        # 3) Add to in-memory state
-        add_anomaly_record(record)
+    except AdmissionRejected as e:
+        raise _rejected(e)
+    except PersistenceQueueFull as e:
+        logger.warning(f"/telemetry/columnar rejected: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in /telemetry/columnar: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 
-        # 4) Persist to DB
-        db = SessionLocal()
+# ----- Streaming endpoint -----
+def _process_stream_frame(text: str) -> Dict[str, Any]:
+    """
+    Score one /telemetry/stream frame. A frame is either a single telemetry
+    object, a JSON list of them, or {"seq": ..., "samples": [...]}.
+    The reply echoes "seq" so producers can match results to frames.
+    """
+    seq = None
+    try:
+        frame = json.loads(text)
+        if isinstance(frame, dict) and "samples" in frame:
+            seq = frame.get("seq")
+            raw = frame["samples"]
+        elif isinstance(frame, dict):
+            seq = frame.pop("seq", None)
+            raw = [frame]
+        else:
+            raw = frame
+        if not isinstance(raw, list):
+            raise ValueError("samples must be a list")
+        if len(raw) > MAX_BATCH_SIZE:
+            raise ValueError(f"frame too large: {len(raw)} samples (max {MAX_BATCH_SIZE})")
+        samples = [Telemetry(**s) for s in raw]
+    except (ValueError, TypeError, ValidationError) as e:
+        return {"status": "error", "seq": seq, "code": 422, "detail": str(e)}
+
+    if not samples:
+        return {"status": "ok", "seq": seq, "count": 0, "results": [], "shed": []}
+
+    try:
+        if admission.saturated():
+            raise admission.reject_saturated(len(samples))
+        records, shed = _score_and_store(
+            [s.timestamp for s in samples],
+            [s.satellite_id for s in samples],
+            preprocess_telemetry_batch(samples),
+        )
+    except AdmissionRejected as e:
+        return {"status": "error", "seq": seq, "code": e.status_code, "detail": e.detail,
+                "retry_after": e.retry_after}
+    except PersistenceQueueFull as e:
+        return {"status": "error", "seq": seq, "code": 503, "detail": str(e)}
+    except Exception as e:
+        logger.error(f"Error in /telemetry/stream: {e}")
+        return {"status": "error", "seq": seq, "code": 500, "detail": str(e)}
+
+    return {"status": "ok", "seq": seq, "count": len(records), "results": records, "shed": shed}
+
+
+@router.websocket("/stream")
+async def telemetry_stream(websocket: WebSocket):
+    """
+    Long-lived ingest link: the producer pushes telemetry frames and gets one
+    result frame back per input frame, in order, on the same connection.
+
+    Flow control: at most STREAM_MAX_INFLIGHT frames are buffered. When the
+    backend falls behind, the reader stops pulling from the socket, so TCP
+    backpressure slows the producer instead of memory growing without limit.
+    """
+    await websocket.accept()
+    inbox: asyncio.Queue = asyncio.Queue(maxsize=STREAM_MAX_INFLIGHT)
+
+    async def reader():
         try:
-            db_event = AnomalyEvent(
-                timestamp=data.timestamp,
-                satellite_id=data.satellite_id,
-                severity=anomaly.get("severity", "normal"),
-                issues=",".join(anomaly.get("issues", [])),
-                score=float(anomaly.get("score", 0.0)),
-            )
-            db.add(db_event)
-            db.commit()
+            while True:
+                await inbox.put(await websocket.receive_text())
+        except WebSocketDisconnect:
+            pass
         finally:
-            db.close()
+            await inbox.put(None)
 
-        return {"status": "ok", **record}
+    reader_task = asyncio.create_task(reader())
+    try:
+        while True:
+            text = await inbox.get()
+            if text is None:
+                break
+            await websocket.send_json(_process_stream_frame(text))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader_task.cancel()
 
-    except Exception as e:
-        logger.error(f"Error in /telemetry: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+# ----- Raw telemetry read-back -----
+@router.get("/raw/{satellite_id}")
+def read_raw_telemetry(
+    satellite_id: str,
+    start: str = Query(..., description="ISO-8601, inclusive"),
+    end: str = Query(..., description="ISO-8601, exclusive"),
+):
+    """
+    Raw 15-channel feature rows of one satellite for [start, end), returned
+    as an application/x-npz payload (same columns as /telemetry/columnar,
+    with "timestamp" as epoch seconds).
+    """
+    try:
+        t0 = epoch_seconds(parse_timestamp(start))
+        t1 = epoch_seconds(parse_timestamp(end))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    t, features = raw_store.read_range(satellite_id, t0, t1)
+    columns = {"timestamp": t, "satellite_id": np.full(t.size, satellite_id)}
+    columns.update({name: features[:, j] for j, name in enumerate(FEATURE_FIELDS)})
+    return Response(content=encode_npz(columns), media_type=NPZ_CONTENT_TYPE)
@@ -1,15 +1,126 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-import os
-from pathlib import Path
-
-# Use a local SQLite file for demo
-BASE_DIR = Path(__file__).resolve().parents[2]  # project root
-DB_PATH = BASE_DIR / "satellite_demo.db"
-DB_URL = f"sqlite:///{DB_PATH}"
-
-engine = create_engine(
-    DB_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+"""
+Engine and session setup. The database is chosen by DB_URL (backend/core/config.py):
+SQLite gets WAL and related pragmas, PostgreSQL a pre-pinged connection pool.
+"""
+import io
+from datetime import datetime
+from typing import Any, Dict, List, Union
+
+from sqlalchemy import create_engine, event, insert, inspect
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
+
+from .config import (
+    DB_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_S,
+    DB_POOL_RECYCLE_S,
+    DB_COPY_ENABLED,
+    SQLITE_MMAP_SIZE,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_BUSY_TIMEOUT_MS,
+)
+
+
+def _sqlite_pragmas(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")  # readers and the writer stop blocking each other
+    cur.execute("PRAGMA synchronous=NORMAL")  # fsync at checkpoints only, safe with WAL
+    cur.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cur.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")  # negative = KiB
+    cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")  # other workers' writes wait, not fail
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.close()
+
+
+def make_engine(url: str = DB_URL, tuned: bool = True) -> Engine:
+    """
+    Engine for `url`: SQLite with the pragmas above, PostgreSQL with a
+    QueuePool (DB_POOL_SIZE + DB_MAX_OVERFLOW) whose dropped connections are
+    replaced by pre-ping and recycling. `tuned=False` gives driver defaults.
+    """
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        eng = create_engine(url, connect_args={"check_same_thread": False})
+        in_memory = make_url(url).database in (None, "", ":memory:")
+        if tuned and not in_memory:
+            event.listen(eng, "connect", _sqlite_pragmas)
+        return eng
+    if backend == "postgresql" and tuned:
+        return create_engine(
+            url,
+            poolclass=QueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT_S,
+            pool_recycle=DB_POOL_RECYCLE_S,
+            pool_pre_ping=True,
+            pool_use_lifo=True,  # reuse hot connections; surplus idle ones get recycled
+        )
+    return create_engine(url, pool_pre_ping=True)
+
+
+engine = make_engine()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base = declarative_base()
+
+
+# ----- bulk insert -----
+def _copy_value(v: Any) -> str:
+    # PostgreSQL COPY text format
+    if v is None:
+        return "\\N"
+    if isinstance(v, datetime):
+        return v.isoformat(sep=" ")
+    return (
+        str(v).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def _copy_rows(conn: Connection, target, rows: List[Dict[str, Any]]):
+    keys = list(rows[0])
+    if hasattr(target, "__table__"):  # mapped class: keys are attribute names
+        attrs = inspect(target).column_attrs
+        names = [attrs[k].columns[0].name for k in keys]
+        table = target.__table__
+    else:
+        names = [target.c[k].name for k in keys]
+        table = target
+    preparer = conn.dialect.identifier_preparer
+    columns = ", ".join(preparer.quote(name) for name in names)
+    sql = f"COPY {preparer.format_table(table)} ({columns}) FROM STDIN"
+
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join([_copy_value(row[k]) for k in keys]))
+        buf.write("\n")
+    buf.seek(0)
+
+    # raw driver connection of the caller's transaction, so COPY commits with it
+    cur = conn.connection.driver_connection.cursor()
+    try:
+        if hasattr(cur, "copy_expert"):  # psycopg2
+            cur.copy_expert(sql, buf)
+        else:  # psycopg 3
+            with cur.copy(sql) as copy:
+                copy.write(buf.getvalue())
+    finally:
+        cur.close()
+
+
+def bulk_insert(db: Union[Session, Connection], target, rows: List[Dict[str, Any]]):
+    """
+    Insert rows (dicts with the same keys) inside the caller's transaction:
+    one COPY on PostgreSQL, one executemany INSERT elsewhere. The caller
+    commits. `target` is a mapped class with a Session (keys are attribute
+    names) or a Table with a Session or Connection (keys are column keys).
+    """
+    if not rows:
+        return
+    conn = db.connection() if isinstance(db, Session) else db
+    if DB_COPY_ENABLED and conn.dialect.name == "postgresql":
+        _copy_rows(conn, target, rows)
+    else:
+        db.execute(insert(target), rows)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
 from datetime import datetime
 from .database import Base
 
@@ -27,6 +27,14 @@ class AnomalyEvent(Base):
     id = Column(Integer, primary_key=True, index=True)
     satellite_id = Column(String, index=True)
     severity = Column(String)
-    issue = Column(String)
+    issues = Column("issue", String)
     score = Column(Float)
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+
+    # keyset pagination of /anomalies/history walks (timestamp, id) descending,
+    # optionally pinned to one satellite or severity
+    __table_args__ = (
+        Index("ix_anomalies_ts_id", "timestamp", "id"),
+        Index("ix_anomalies_sat_ts_id", "satellite_id", "timestamp", "id"),
+        Index("ix_anomalies_sev_ts_id", "severity", "timestamp", "id"),
+    )
@@ -0,0 +1,166 @@
+# backend/inference/registry.py
+"""
+Versioned model registry: models load lazily on first use and newer
+versions are swapped in without interrupting requests (see docs/internals.md).
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.core.config import MODEL_CHECK_INTERVAL_S
+from backend.core.logger import logger
+
+CURRENT_FILE = "CURRENT"
+MODEL_SUFFIX = ".npz"
+
+
+class _Entry:
+    def __init__(self, name: str, path: str, loader: Callable[[str], Any]):
+        self.name = name
+        self.path = path
+        self.loader = loader
+        self.model: Any = None
+        self.key: Optional[Tuple[str, float]] = None  # (version, mtime) of the loaded model
+        self.next_check = 0.0
+        self.lock = threading.Lock()                  # one load at a time
+        self.loading: Optional[threading.Thread] = None
+
+        # metrics
+        self.loads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.load_ms = 0.0
+        self.failed_key: Optional[Tuple[str, float]] = None
+
+
+class ModelRegistry:
+    def __init__(self, check_interval_s: float = MODEL_CHECK_INTERVAL_S):
+        self.check_interval_s = check_interval_s
+        self._entries: Dict[str, _Entry] = {}
+
+    def register(self, name: str, path: str, loader: Callable[[str], Any]):
+        """`loader(file)` builds the model; it may define warm() to run once before serving."""
+        self._entries[name] = _Entry(name, path, loader)
+
+    # ----- versions -----
+    def versions(self, name: str) -> List[str]:
+        path = self._entries[name].path
+        if os.path.isfile(path):
+            return [os.path.splitext(os.path.basename(path))[0]]
+        try:
+            files = os.listdir(path)
+        except OSError:
+            return []
+        # dotfiles are artifacts still being written
+        return sorted(f[:-len(MODEL_SUFFIX)] for f in files if f.endswith(MODEL_SUFFIX) and not f.startswith("."))
+
+    def _active(self, entry: _Entry) -> Optional[Tuple[str, str, float]]:
+        """(version, file, mtime) that should be serving, or None if there is no artifact."""
+        try:
+            if os.path.isfile(entry.path):
+                version = os.path.splitext(os.path.basename(entry.path))[0]
+                return version, entry.path, os.stat(entry.path).st_mtime
+            versions = self.versions(entry.name)
+            pinned = None
+            try:
+                with open(os.path.join(entry.path, CURRENT_FILE)) as f:
+                    pinned = f.read().strip()
+            except OSError:
+                pass
+            version = pinned if pinned in versions else (versions[-1] if versions else None)
+            if version is None:
+                return None
+            file = os.path.join(entry.path, version + MODEL_SUFFIX)
+            return version, file, os.stat(file).st_mtime
+        except OSError:
+            return None  # being replaced right now; look again on the next check
+
+    def activate(self, name: str, version: str):
+        """Pin `version` of a versioned model for every worker and load it here."""
+        entry = self._entries[name]
+        if os.path.isfile(entry.path) or version not in self.versions(name):
+            raise KeyError(f"model '{name}' has no version '{version}'")
+        tmp = os.path.join(entry.path, f".{CURRENT_FILE}.{os.getpid()}")
+        with open(tmp, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp, os.path.join(entry.path, CURRENT_FILE))
+        entry.next_check = 0.0
+        self._load(entry, self._active(entry))
+
+    # ----- loading -----
+    def _load(self, entry: _Entry, target: Optional[Tuple[str, str, float]]) -> bool:
+        if target is None:
+            return False
+        version, file, mtime = target
+        with entry.lock:
+            if entry.key == (version, mtime):
+                return True  # another thread got there first
+            start = time.perf_counter()
+            try:
+                model = entry.loader(file)
+                if hasattr(model, "warm"):
+                    model.warm()
+            except (OSError, ValueError) as e:
+                entry.failures += 1
+                entry.failed_key = (version, mtime)
+                entry.last_error = str(e)
+                logger.error(f"Model '{entry.name}' version {version} not loaded, keeping {entry.key}: {e}")
+                return False
+            entry.model = model  # one assignment: callers see the old or the new model
+            entry.key = (version, mtime)
+            entry.loads += 1
+            entry.load_ms = (time.perf_counter() - start) * 1000.0
+            entry.last_error = None
+        logger.info(f"Model '{entry.name}' version {version} loaded from {file} in {entry.load_ms:.1f} ms")
+        return True
+
+    def _swap_in_background(self, entry: _Entry, target: Tuple[str, str, float]):
+        if entry.loading is not None and entry.loading.is_alive():
+            return
+        entry.loading = threading.Thread(
+            target=self._load, args=(entry, target), name=f"model-load-{entry.name}", daemon=True
+        )
+        entry.loading.start()
+
+    def get(self, name: str) -> Any:
+        """The serving model `name`, loading it on first use; None if it has no artifact."""
+        entry = self._entries[name]
+        now = time.monotonic()
+        if now < entry.next_check:
+            return entry.model
+        entry.next_check = now + self.check_interval_s
+        target = self._active(entry)
+        if target is not None and (target[0], target[2]) not in (entry.key, entry.failed_key):
+            if entry.model is None:
+                self._load(entry, target)
+            else:
+                self._swap_in_background(entry, target)
+        return entry.model
+
+    def warm(self, names: Optional[List[str]] = None) -> threading.Thread:
+        """Load (and warm) models in a background thread, e.g. right after startup."""
+        thread = threading.Thread(
+            target=lambda: [self.get(n) for n in (names or list(self._entries))],
+            name="model-warm",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Any]:
+        out = {}
+        for name, e in self._entries.items():
+            model = e.model
+            out[name] = {
+                "path": e.path,
+                "version": e.key[0] if e.key else None,
+                "versions": self.versions(name),
+                "loads": e.loads,
+                "failures": e.failures,
+                "last_error": e.last_error,
+                "load_ms": e.load_ms,
+                "model": model.stats() if model is not None and hasattr(model, "stats") else None,
+            }
+        return out
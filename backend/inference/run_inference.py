@@ -1,14 +1,278 @@
-# Placeholder for loading ML models later
+# backend/inference/run_inference.py
+"""
+NumPy-only inference for dense autoencoders trained offline, served
+through model_registry (file format in docs/internals.md).
+"""
 
+import struct
+import threading
+import zipfile
+from typing import Any, Dict, Optional, Sequence
 
-def load_models():
-# e.g., load Keras / PyTorch models
-    return None
+import numpy as np
 
+from backend.core.config import AUTOENCODER_MODEL_PATH, INFERENCE_BATCH_SIZE, MODEL_MMAP
+from backend.inference.registry import ModelRegistry
+from backend.services.preprocess import FEATURE_FIELDS
 
-models = load_models()
+MODEL_NAMES = ("autoencoder_error", "autoencoder_score")
 
 
-def run_models(features):
-# replace compute_anomaly with model inference when available
-    return None
\ No newline at end of file
+class ModelFormatError(ValueError):
+    """An exported model file is missing arrays or has inconsistent shapes."""
+
+
+# ----- artifact files -----
+def load_npz(path: str, mmap: bool = MODEL_MMAP) -> Dict[str, np.ndarray]:
+    """
+    Arrays of an .npz file. With mmap, stored (uncompressed) non-empty
+    arrays are read-only np.memmap views of the file itself.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            key = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                # data starts after the local header, whose extra field may differ from the central one
+                f.seek(info.header_offset)
+                local = f.read(30)
+                if local[:4] != b"PK\x03\x04":
+                    raise ModelFormatError(f"{path}: bad zip entry {info.filename}")
+                name_len, extra_len = struct.unpack("<HH", local[26:30])
+                f.seek(info.header_offset + 30 + name_len + extra_len)
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+                elif version == (2, 0):
+                    shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+                else:
+                    shape, dtype = (), None
+                if dtype is not None and not dtype.hasobject and len(shape) and 0 not in shape:
+                    arrays[key] = np.memmap(f, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                            order="F" if fortran else "C")
+                    continue
+            with zf.open(info) as member:
+                arrays[key] = np.lib.format.read_array(member, allow_pickle=False)
+    return arrays
+
+
+# ----- activations, in place on a float buffer -----
+def _linear(a: np.ndarray):
+    pass
+
+
+def _relu(a: np.ndarray):
+    np.maximum(a, 0, out=a)
+
+
+def _tanh(a: np.ndarray):
+    np.tanh(a, out=a)
+
+
+def _sigmoid(a: np.ndarray):
+    # 1 / (1 + exp(-a))
+    np.negative(a, out=a)
+    np.exp(a, out=a)
+    np.add(a, 1, out=a)
+    np.reciprocal(a, out=a)
+
+
+def _elu(a: np.ndarray):
+    neg = a < 0
+    a[neg] = np.expm1(a[neg])
+
+
+def _softplus(a: np.ndarray):
+    np.logaddexp(a, 0, out=a)
+
+
+ACTIVATIONS = {
+    "linear": _linear,
+    "relu": _relu,
+    "tanh": _tanh,
+    "sigmoid": _sigmoid,
+    "elu": _elu,
+    "softplus": _softplus,
+}
+
+
+class DenseAutoencoder:
+    def __init__(self, path: str, batch_size: int = INFERENCE_BATCH_SIZE, mmap: bool = MODEL_MMAP):
+        self.path = path
+        self.batch_size = int(batch_size)
+        try:
+            arrays = load_npz(path, mmap)
+        except zipfile.BadZipFile as e:
+            raise ModelFormatError(f"{path}: {e}") from None
+
+        n_layers = sum(1 for k in arrays if k.startswith("W"))
+        if n_layers == 0:
+            raise ModelFormatError(f"{path}: no W0, b0, ... arrays")
+        try:
+            self.weights = [np.ascontiguousarray(arrays[f"W{i}"]) for i in range(n_layers)]
+            self.biases = [arrays[f"b{i}"] for i in range(n_layers)]
+        except KeyError as e:
+            raise ModelFormatError(f"{path}: missing array {e}") from None
+        self.dtype = np.result_type(*self.weights)
+        self.mapped = sum(a.nbytes for a in arrays.values() if isinstance(a, np.memmap))
+
+        names = [str(a) for a in arrays.get("activations", ["relu"] * (n_layers - 1) + ["linear"])]
+        if len(names) != n_layers:
+            raise ModelFormatError(f"{path}: {len(names)} activations for {n_layers} layers")
+        unknown = sorted(set(names) - set(ACTIVATIONS))
+        if unknown:
+            raise ModelFormatError(f"{path}: unsupported activations {unknown}")
+        self.activations = names
+        self._act = [ACTIVATIONS[a] for a in names]
+
+        width = self.weights[0].shape[0]
+        self.n_inputs = width
+        for i, (W, b) in enumerate(zip(self.weights, self.biases)):
+            if W.ndim != 2 or W.shape[0] != width or b.shape != (W.shape[1],):
+                raise ModelFormatError(f"{path}: layer {i} has W {W.shape}, b {b.shape} after width {width}")
+            width = W.shape[1]
+        if width != self.n_inputs:
+            raise ModelFormatError(f"{path}: output width {width} != input width {self.n_inputs}")
+
+        self.features = tuple(str(f) for f in arrays.get("features", FEATURE_FIELDS))
+        if len(self.features) != self.n_inputs:
+            raise ModelFormatError(f"{path}: {len(self.features)} feature names for {self.n_inputs} inputs")
+        missing = sorted(set(self.features) - set(FEATURE_FIELDS))
+        if missing:
+            raise ModelFormatError(f"{path}: unknown input features {missing}")
+        self._columns = np.array([FEATURE_FIELDS.index(f) for f in self.features])
+
+        self.mean = arrays.get("mean", np.zeros(self.n_inputs)).astype(self.dtype)
+        self.scale = arrays.get("scale", np.ones(self.n_inputs)).astype(self.dtype)
+        if self.mean.shape != (self.n_inputs,) or self.scale.shape != (self.n_inputs,):
+            raise ModelFormatError(f"{path}: mean / scale must have {self.n_inputs} values")
+        self.threshold = float(arrays["threshold"]) if "threshold" in arrays else None
+        self.biases = [b.astype(self.dtype) for b in self.biases]
+
+        # buffers: standardized input, then one per layer output
+        self._x = np.empty((self.batch_size, self.n_inputs), dtype=self.dtype)
+        self._bufs = [np.empty((self.batch_size, W.shape[1]), dtype=self.dtype) for W in self.weights]
+        self._lock = threading.Lock()
+
+        # metrics
+        self._samples = 0
+        self._batches = 0
+
+    @property
+    def n_params(self) -> int:
+        return sum(W.size + b.size for W, b in zip(self.weights, self.biases))
+
+    def warm(self):
+        """One forward pass, so that the weight pages are resident before the first request."""
+        self.score(np.zeros((1, len(FEATURE_FIELDS))))
+
+    def reconstruct(self, features: np.ndarray) -> np.ndarray:
+        """Reconstructions of (N, 15) feature rows, in standardized units: (N, n_inputs)."""
+        out = np.empty((features.shape[0], self.n_inputs), dtype=self.dtype)
+        self._run(features, out=out)
+        return out
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Mean squared reconstruction error of each (N, 15) feature row: (N,) float64."""
+        err = np.empty(features.shape[0])
+        self._run(features, err=err)
+        return err
+
+    def _run(self, features: np.ndarray, out: Optional[np.ndarray] = None, err: Optional[np.ndarray] = None):
+        features = np.asarray(features, dtype=float).reshape(-1, len(FEATURE_FIELDS))
+        with self._lock:
+            for start in range(0, features.shape[0], self.batch_size):
+                chunk = features[start:start + self.batch_size]
+                n = chunk.shape[0]
+                x = self._x[:n]
+                np.subtract(chunk[:, self._columns], self.mean, out=x, casting="unsafe")
+                np.divide(x, self.scale, out=x)
+                a = x
+                for W, b, act, buf in zip(self.weights, self.biases, self._act, self._bufs):
+                    h = buf[:n]
+                    np.matmul(a, W, out=h)
+                    np.add(h, b, out=h)
+                    act(h)
+                    a = h
+                if out is not None:
+                    out[start:start + n] = a
+                if err is not None:
+                    np.subtract(a, x, out=a)
+                    np.square(a, out=a)
+                    err[start:start + n] = a.mean(axis=1)
+                self._batches += 1
+            self._samples += features.shape[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "layers": [W.shape[1] for W in self.weights],
+            "activations": self.activations,
+            "params": self.n_params,
+            "dtype": str(self.dtype),
+            "mapped_bytes": self.mapped,
+            "threshold": self.threshold,
+            "samples": self._samples,
+            "batches": self._batches,
+        }
+
+
+def export_dense_autoencoder(
+    model: Any,
+    path: str,
+    mean: Optional[np.ndarray] = None,
+    scale: Optional[np.ndarray] = None,
+    threshold: Optional[float] = None,
+    features: Sequence[str] = FEATURE_FIELDS,
+):
+    """
+    Write a trained Keras model made of Dense layers to `path` in the
+    format of docs/internals.md. Only the layers' get_weights() / get_config() are used,
+    so this does not import TensorFlow itself.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    activations = []
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if not weights:  # Input, Dropout, ...
+            continue
+        if len(weights) != 2:
+            raise ModelFormatError(f"layer {layer.name}: expected a Dense kernel and bias")
+        i = len(activations)
+        arrays[f"W{i}"], arrays[f"b{i}"] = weights
+        activations.append(layer.get_config().get("activation", "linear"))
+    arrays["activations"] = np.array(activations)
+    arrays["features"] = np.array(list(features))
+    if mean is not None:
+        arrays["mean"] = np.asarray(mean, dtype=np.float32)
+    if scale is not None:
+        arrays["scale"] = np.asarray(scale, dtype=np.float32)
+    if threshold is not None:
+        arrays["threshold"] = np.float64(threshold)
+    np.savez(path, **arrays)
+
+
+# Models served by the telemetry route; loaded on first use (or by warm() at startup)
+model_registry = ModelRegistry()
+model_registry.register("autoencoder", AUTOENCODER_MODEL_PATH, DenseAutoencoder)
+
+
+def run_models(features: np.ndarray) -> Optional[np.ndarray]:
+    """
+    (N, len(MODEL_NAMES)) model columns for an (N, 15) feature matrix:
+    reconstruction error, and error / threshold (NaN without a threshold).
+    None when no model is loaded.
+    """
+    model = model_registry.get("autoencoder")
+    if model is None:
+        return None
+    err = model.score(features)
+    out = np.full((err.shape[0], len(MODEL_NAMES)), np.nan)
+    out[:, 0] = err
+    if model.threshold:
+        out[:, 1] = err / model.threshold
+    return out
+
+
+def stats() -> Dict[str, Any]:
+    return model_registry.stats()
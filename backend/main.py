@@ -3,8 +3,11 @@ from fastapi import FastAPI, Depends
 from sqlalchemy.orm import Session
 from core import models, schemas
 from core.database import engine, get_db
+from utils.thresholds import threshold_rules
 from datetime import datetime
 
+threshold_rules.declare_inputs("legacy", ("temperature", "packet_loss"))
+
 # Create tables
 models.Base.metadata.create_all(bind=engine)
 
@@ -17,22 +20,11 @@ def receive_telemetry(data: schemas.TelemetrySchema, db: Session = Depends(get_d
     db.commit()
     db.refresh(telemetry)
 
-    # Example anomaly logic
-    issues = []
-    score = 0
-    severity = "normal"
-
-    if telemetry.temperature and telemetry.temperature > 70:
-        issues.append("High Temperature")
-        score += 0.6
-    if telemetry.packet_loss and telemetry.packet_loss > 10:
-        issues.append("High Packet Loss")
-        score += 0.8
-
-    if len(issues) == 1:
-        severity = "warning"
-    elif len(issues) >= 2:
-        severity = "critical"
+    # Example anomaly logic: the "legacy" ruleset of utils/thresholds.yaml
+    result = threshold_rules.get("legacy").evaluate(
+        {"temperature": telemetry.temperature, "packet_loss": telemetry.packet_loss}, n=1
+    )[0]
+    issues, score, severity = result["issues"], result["score"], result["severity"]
 
     if issues:
         anomaly = models.Anomaly(
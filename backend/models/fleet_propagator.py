@@ -0,0 +1,142 @@
+# backend/models/fleet_propagator.py
+
+"""
+Vectorized orbit propagation for the whole fleet: analytic Kepler with J2
+secular drift, or fixed-step RK4 on two-body + J2, over (N, 6) states at
+once (accuracy notes in docs/internals.md).
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from backend.core.config import ORBIT_PROPAGATOR, ORBIT_RK4_STEP_S
+
+MU_EARTH = 398600.4418  # km^3/s^2
+R_EARTH = 6378.137      # km, equatorial
+J2 = 1.08262668e-3
+
+KEPLER_TOL = 1e-12
+KEPLER_MAX_ITER = 20
+CIRCULAR_ECC = 1e-10  # below this, perigee is put at the current position
+
+
+def acceleration(r: np.ndarray, j2: bool = True) -> np.ndarray:
+    """Two-body (+ J2) acceleration (km/s^2) at positions r (..., 3) km."""
+    norm = np.linalg.norm(r, axis=-1, keepdims=True)
+    acc = -MU_EARTH * r / norm ** 3
+    if j2:
+        z2 = (r[..., 2:3] / norm) ** 2
+        k = -1.5 * J2 * MU_EARTH * R_EARTH ** 2 / norm ** 5
+        acc = acc + k * r * np.concatenate([1.0 - 5.0 * z2, 1.0 - 5.0 * z2, 3.0 - 5.0 * z2], axis=-1)
+    return acc
+
+
+# ----- analytic Kepler + J2 secular -----
+def _solve_kepler(M: np.ndarray, e: np.ndarray) -> np.ndarray:
+    """Eccentric anomaly E with E - e sin E = M (Newton, all rows at once)."""
+    E = np.where(e < 0.8, M, np.pi)
+    for _ in range(KEPLER_MAX_ITER):
+        step = (E - e * np.sin(E) - M) / (1.0 - e * np.cos(E))
+        E = E - step
+        if not np.any(np.abs(step) > KEPLER_TOL):
+            break
+    return E
+
+
+def _rotate(a: np.ndarray, b: np.ndarray, angle: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Rotate the orthonormal in-plane pair (a, b) by `angle` (N,) about a x b."""
+    c, s = np.cos(angle)[:, None], np.sin(angle)[:, None]
+    return c * a + s * b, c * b - s * a
+
+
+def _rotate_z(u: np.ndarray, angle: np.ndarray) -> np.ndarray:
+    c, s = np.cos(angle), np.sin(angle)
+    return np.stack([c * u[:, 0] - s * u[:, 1], s * u[:, 0] + c * u[:, 1], u[:, 2]], axis=1)
+
+
+def propagate_kepler(x: np.ndarray, dt: np.ndarray, j2: bool = True) -> np.ndarray:
+    """(N, 6) states advanced by dt (N,) seconds; NaN rows where the orbit is not an ellipse."""
+    x = np.asarray(x, dtype=float).reshape(-1, 6)
+    dt = np.broadcast_to(np.asarray(dt, dtype=float), x.shape[:1])
+    r, v = x[:, :3], x[:, 3:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r_norm = np.linalg.norm(r, axis=1)
+        h = np.cross(r, v)
+        h_norm = np.linalg.norm(h, axis=1)
+        e_vec = (np.sum(v * v, axis=1) / MU_EARTH - 1.0 / r_norm)[:, None] * r \
+            - (np.sum(r * v, axis=1) / MU_EARTH)[:, None] * v
+        e = np.linalg.norm(e_vec, axis=1)
+        a = 1.0 / (2.0 / r_norm - np.sum(v * v, axis=1) / MU_EARTH)
+
+        # perifocal frame; a circular orbit takes perigee at r
+        circular = (e < CIRCULAR_ECC)[:, None]
+        P = np.where(circular, r / r_norm[:, None], e_vec / np.where(circular, 1.0, e[:, None]))
+        W = h / h_norm[:, None]
+        Q = np.cross(W, P)
+
+        # mean anomaly now
+        nu = np.arctan2(np.sum(r * Q, axis=1), np.sum(r * P, axis=1))
+        E0 = 2.0 * np.arctan2(np.sqrt(1.0 - e) * np.sin(nu / 2), np.sqrt(1.0 + e) * np.cos(nu / 2))
+        M0 = E0 - e * np.sin(E0)
+        n = np.sqrt(MU_EARTH / a ** 3)
+        root = np.sqrt(1.0 - e ** 2)
+
+        M_dot = n
+        if j2:
+            cos_i = W[:, 2]
+            sin2_i = 1.0 - cos_i ** 2
+            # the rates need the mean semi-major axis: remove the first-order short-period
+            # J2 term from the osculating one (Kozai), or the along-track error grows ~100 km per orbit
+            ar3 = (a / r_norm) ** 3
+            sin2_u_i = sin2_i - 2.0 * (r[:, 2] / r_norm) ** 2  # sin^2 i cos 2u, u = argument of latitude
+            a_mean = a - J2 * R_EARTH ** 2 / a * (
+                (1.0 - 1.5 * sin2_i) * (ar3 - root ** -3) + 1.5 * ar3 * sin2_u_i
+            )
+            n = np.sqrt(MU_EARTH / a_mean ** 3)
+            k = 1.5 * J2 * (R_EARTH / (a_mean * root ** 2)) ** 2 * n
+            M_dot = n + k * root * (1.0 - 1.5 * sin2_i)
+            # perigee advances in the orbit plane, then the plane turns about the pole
+            P, Q = _rotate(P, Q, k * (2.0 - 2.5 * sin2_i) * dt)
+            node = -k * cos_i * dt
+            P, Q = _rotate_z(P, node), _rotate_z(Q, node)
+
+        E = _solve_kepler(np.remainder(M0 + M_dot * dt, 2.0 * np.pi), e)
+        cos_E, sin_E = np.cos(E)[:, None], np.sin(E)[:, None]
+        r_new = a[:, None] * ((cos_E - e[:, None]) * P + root[:, None] * sin_E * Q)
+        rate = (np.sqrt(MU_EARTH * a) / np.linalg.norm(r_new, axis=1))[:, None]
+        v_new = rate * (-sin_E * P + root[:, None] * cos_E * Q)
+
+    out = np.concatenate([r_new, v_new], axis=1)
+    out[~((e < 1.0) & (a > 0.0) & (h_norm > 0.0))] = np.nan
+    return out
+
+
+# ----- RK4 -----
+def propagate_rk4(x: np.ndarray, dt: np.ndarray, step_s: float = ORBIT_RK4_STEP_S, j2: bool = True) -> np.ndarray:
+    """(N, 6) states advanced by dt (N,) seconds with fixed RK4 steps of at most step_s."""
+    x = np.asarray(x, dtype=float).reshape(-1, 6)
+    dt = np.broadcast_to(np.asarray(dt, dtype=float), x.shape[:1])
+    steps = max(1, int(np.ceil(np.max(np.abs(dt), initial=0.0) / step_s)))
+    h = (dt / steps)[:, None]
+
+    def deriv(y):
+        return np.concatenate([y[:, 3:], acceleration(y[:, :3], j2)], axis=1)
+
+    y = x.copy()
+    for _ in range(steps):
+        k1 = deriv(y)
+        k2 = deriv(y + 0.5 * h * k1)
+        k3 = deriv(y + 0.5 * h * k2)
+        k4 = deriv(y + h * k3)
+        y += h / 6.0 * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+    return y
+
+
+def propagate(x: np.ndarray, dt: np.ndarray, method: str = ORBIT_PROPAGATOR) -> np.ndarray:
+    """(N, 6) states advanced by dt (N,) seconds with the "kepler" or "rk4" propagator."""
+    if method == "kepler":
+        return propagate_kepler(x, dt)
+    if method == "rk4":
+        return propagate_rk4(x, dt)
+    raise ValueError(f"unknown propagator '{method}' (kepler or rk4)")
@@ -6,10 +6,26 @@ orbit, sensor, and communication anomaly detectors.
 
 Each detector returns a score in [0, 1].
 We take a weighted average + derive a label.
+
+fusion_anomaly_batch does the same over arrays of scores, for the
+detector pipeline (backend/services/pipeline.py).
 """
 
 from typing import Optional, Dict, Any
 
+import numpy as np
+
+# Simple weighted average: you can tune weights if needed
+WEIGHTS = {
+    "orbit": 0.4,
+    "sensor": 0.3,
+    "comms": 0.3,
+}
+
+# Severity thresholds – tweak if needed
+SEVERITIES = ("NORMAL", "WARNING", "CRITICAL")
+SEVERITY_THRESHOLDS = (0.3, 0.6)  # fusion score from which WARNING / CRITICAL apply
+
 
 def fusion_anomaly(
     orbit_score: Optional[float] = None,
@@ -42,27 +58,19 @@ def fusion_anomaly(
             "details": {"reason": "No scores available"},
         }
 
-    # Simple weighted average: you can tune weights if needed
-    weights = {
-        "orbit": 0.4,
-        "sensor": 0.3,
-        "comms": 0.3,
-    }
-
     num = 0.0
     den = 0.0
     for name, s in scores:
-        w = weights.get(name, 0.3)
+        w = WEIGHTS.get(name, 0.3)
         num += w * s
         den += w
         details[name] = s
 
     fusion_score = num / den if den > 0 else 0.0
 
-    # Severity thresholds – tweak if needed
-    if fusion_score < 0.3:
+    if fusion_score < SEVERITY_THRESHOLDS[0]:
         severity = "NORMAL"
-    elif fusion_score < 0.6:
+    elif fusion_score < SEVERITY_THRESHOLDS[1]:
         severity = "WARNING"
     else:
         severity = "CRITICAL"
@@ -72,3 +80,43 @@ def fusion_anomaly(
         "severity": severity,
         "details": details,
     }
+
+
+def fusion_anomaly_batch(
+    orbit_score: Optional[np.ndarray] = None,
+    sensor_score: Optional[np.ndarray] = None,
+    comms_score: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    fusion_anomaly over (N,) score arrays, row by row. A None array or a
+    NaN entry means that detector has no score for the row.
+
+    Returns:
+        {
+            "fusion_score": (N,) float,
+            "severity": (N,) str,
+            "details": {detector: (N,) float, NaN = no score},
+        }
+    """
+    given = {
+        name: np.asarray(s, dtype=float).reshape(-1)
+        for name, s in (("orbit", orbit_score), ("sensor", sensor_score), ("comms", comms_score))
+        if s is not None
+    }
+    n = max((s.size for s in given.values()), default=0)
+    num = np.zeros(n)
+    den = np.zeros(n)
+    for name, s in given.items():
+        have = np.isfinite(s)
+        w = WEIGHTS.get(name, 0.3)
+        num += np.where(have, w * s, 0.0)
+        den += np.where(have, w, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fusion_score = np.where(den > 0, num / den, 0.0)
+    severity = np.asarray(SEVERITIES)[np.searchsorted(SEVERITY_THRESHOLDS, fusion_score, side="right")]
+    return {
+        "fusion_score": fusion_score,
+        "severity": severity,
+        "details": given,
+    }
@@ -7,13 +7,30 @@ from .comms_seq_model import detect as detect_comms_anomaly
 # backend/models/orbit_kalman.py
 
 """
-Simplified orbit drift detector for demo purposes.
-
-We DON'T use a real Kalman filter here to avoid extra dependencies.
-We just compute a basic drift score based on change in altitude/inclination.
+Orbit anomaly detectors: OrbitEKF, a batched extended Kalman filter that
+scores each measurement by its normalized innovation squared (see
+docs/internals.md), and the older scalar altitude / inclination drift
+check of detect() / kalman_predict().
 """
 
-from typing import Dict, Any, Tuple
+import threading
+from typing import Dict, Any, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.core.config import (
+    ORBIT_ACCEL_PSD,
+    ORBIT_MAX_STEP_S,
+    ORBIT_POS_SIGMA_KM,
+    ORBIT_REINIT_GAP_S,
+    ORBIT_VEL_SIGMA_KMS,
+)
+from backend.models.fleet_propagator import MU_EARTH
+from backend.utils.helpers import SatelliteIndex, satellite_rounds
+from backend.utils.thresholds import threshold_rules
+
+INPUTS = ("altitude_prev", "altitude_now", "inclination_prev", "inclination_now", "nis", "position_residual_km")
+threshold_rules.declare_inputs("orbit", INPUTS)
 
 
 def kalman_predict(prev_state: Dict[str, float], obs: Dict[str, float]) -> Dict[str, float]:
@@ -51,42 +68,204 @@ def detect(prev_state: Dict[str, float], obs: Dict[str, float]) -> Tuple[float,
     """
     new_state = kalman_predict(prev_state, obs)
 
-    alt_prev = prev_state.get("orbit_altitude_km")
-    alt_now = obs.get("orbit_altitude_km")
-    inc_prev = prev_state.get("orbit_inclination_deg")
-    inc_now = obs.get("orbit_inclination_deg")
-
-    score = 0.0
-    reasons = []
-
-    if alt_prev is not None and alt_now is not None:
-        alt_diff = abs(alt_now - alt_prev)
-        # crude thresholding
-        if alt_diff > 50:
-            score += 0.6
-            reasons.append(f"Altitude jump {alt_diff:.1f} km")
-        elif alt_diff > 20:
-            score += 0.3
-            reasons.append(f"Altitude change {alt_diff:.1f} km")
-
-    if inc_prev is not None and inc_now is not None:
-        inc_diff = abs(inc_now - inc_prev)
-        if inc_diff > 5:
-            score += 0.4
-            reasons.append(f"Inclination jump {inc_diff:.1f}°")
-        elif inc_diff > 2:
-            score += 0.2
-            reasons.append(f"Inclination change {inc_diff:.1f}°")
-
-    score = min(score, 1.0)
-    if not reasons:
-        message = "Orbit stable"
-    else:
-        message = "; ".join(reasons)
-
+    # altitude change > 50 / > 20 km, inclination change > 5 / > 2 deg
+    # (the "orbit" ruleset of backend/utils/thresholds.yaml)
+    score, message = threshold_rules.get("orbit").explain({
+        "altitude_prev": prev_state.get("orbit_altitude_km"),
+        "altitude_now": obs.get("orbit_altitude_km"),
+        "inclination_prev": prev_state.get("orbit_inclination_deg"),
+        "inclination_now": obs.get("orbit_inclination_deg"),
+    })
     return score, message, new_state
 
 
+def score_batch(columns: Mapping[str, np.ndarray]) -> np.ndarray:
+    """
+    (N,) scores of rows given as {key: (N,) array}, keys altitude_prev /
+    altitude_now (km), inclination_prev / inclination_now (deg), nis
+    (OrbitEKF.update) and position_residual_km (observed position minus
+    the previous sample propagated to it, backend/models/fleet_propagator.py);
+    NaN = no data. The caller tracks the state.
+    """
+    return threshold_rules.get("orbit").evaluate(columns).score
+
+
+# ----- orbit EKF -----
+def gravity(r: np.ndarray) -> np.ndarray:
+    """Two-body acceleration (km/s^2) at positions r (..., 3) km."""
+    norm = np.linalg.norm(r, axis=-1, keepdims=True)
+    return -MU_EARTH * r / norm ** 3
+
+
+def gravity_gradient(r: np.ndarray) -> np.ndarray:
+    """d gravity / d r, (..., 3, 3) 1/s^2, at positions r (..., 3) km."""
+    norm = np.linalg.norm(r, axis=-1)[..., None, None]
+    outer = r[..., :, None] * r[..., None, :] / norm ** 2
+    return MU_EARTH / norm ** 3 * (3.0 * outer - np.eye(3))
+
+
+def propagate(x: np.ndarray, dt: np.ndarray, max_step: float = ORBIT_MAX_STEP_S) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Advance (M, 6) states [r, v] by dt (M,) seconds under two-body gravity.
+    Every row takes the same number of velocity-Verlet substeps (the
+    largest dt sets it). Returns the states and the (M, 6, 6) transition
+    Jacobians.
+    """
+    steps = max(1, int(np.ceil(np.max(np.abs(dt), initial=0.0) / max_step)))
+    h = (dt / steps)[:, None]
+    h3 = h[:, :, None]
+    r, v = x[:, :3].copy(), x[:, 3:].copy()
+    eye = np.eye(3)
+    phi = np.broadcast_to(np.eye(6), (x.shape[0], 6, 6))
+    a = gravity(r)
+    for _ in range(steps):
+        # Jacobian of this substep: I + A h + A^2 h^2 / 2 with A = [[0, I], [G, 0]]
+        g = gravity_gradient(r)
+        step = np.empty_like(phi)
+        step[:, :3, :3] = eye + 0.5 * h3 ** 2 * g
+        step[:, :3, 3:] = h3 * eye
+        step[:, 3:, :3] = h3 * g
+        step[:, 3:, 3:] = step[:, :3, :3]
+        phi = step @ phi
+        v += 0.5 * h * a
+        r += h * v
+        a = gravity(r)
+        v += 0.5 * h * a
+    return np.concatenate([r, v], axis=1), phi
+
+
+class OrbitEKF:
+    def __init__(
+        self,
+        pos_sigma_km: float = ORBIT_POS_SIGMA_KM,
+        vel_sigma_kms: float = ORBIT_VEL_SIGMA_KMS,
+        accel_psd: float = ORBIT_ACCEL_PSD,
+        max_step_s: float = ORBIT_MAX_STEP_S,
+        reinit_gap_s: float = ORBIT_REINIT_GAP_S,
+        initial_satellites: int = 16,
+    ):
+        if pos_sigma_km <= 0 or vel_sigma_kms <= 0 or max_step_s <= 0:
+            raise ValueError("measurement noise and substep must be positive")
+        self.R = np.diag([pos_sigma_km ** 2] * 3 + [vel_sigma_kms ** 2] * 3)
+        self.accel_psd = float(accel_psd)
+        self.max_step_s = float(max_step_s)
+        self.reinit_gap_s = float(reinit_gap_s)
+
+        self._lock = threading.Lock()
+        self._sats = SatelliteIndex(initial_satellites, self._grow)
+        self._x = np.zeros((initial_satellites, 6))
+        self._P = np.zeros((initial_satellites, 6, 6))
+        self._t = np.full(initial_satellites, np.nan)  # time of the last update; NaN = no track
+
+        # metrics
+        self._samples = 0
+        self._rounds = 0
+        self._tracks = 0
+
+    # ----- state arrays -----
+    def _grow(self, n_sats: int):
+        extra = n_sats - self._t.size
+        self._x = np.concatenate([self._x, np.zeros((extra, 6))])
+        self._P = np.concatenate([self._P, np.zeros((extra, 6, 6))])
+        self._t = np.concatenate([self._t, np.full(extra, np.nan)])
+
+    def process_noise(self, dt: np.ndarray) -> np.ndarray:
+        """(M, 6, 6) covariance of white-noise acceleration over dt (M,) seconds."""
+        dt = dt[:, None, None]
+        return self.accel_psd * np.block([
+            [dt ** 3 / 3.0 * np.eye(3), dt ** 2 / 2.0 * np.eye(3)],
+            [dt ** 2 / 2.0 * np.eye(3), dt * np.eye(3)],
+        ])
+
+    def rows(self, satellite_ids: Sequence[str]) -> np.ndarray:
+        """
+        State row of each id, registering new satellites: the index shared
+        with the per-satellite state kept next to the filter.
+        """
+        with self._lock:
+            return self._sats.rows(satellite_ids)
+
+    # ----- update -----
+    def update(
+        self,
+        satellite_ids: Sequence[str],
+        t: np.ndarray,
+        position: np.ndarray,
+        velocity: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Apply N measurements (t epoch seconds, position (N, 3) km,
+        velocity (N, 3) km/s) in order; returns the (N,) NIS of each,
+        NaN where a track starts or the measurement is not finite.
+        `rows`, from rows(satellite_ids), saves the lookup.
+        """
+        t = np.asarray(t, dtype=float).reshape(-1)
+        z = np.concatenate([
+            np.asarray(position, dtype=float).reshape(-1, 3),
+            np.asarray(velocity, dtype=float).reshape(-1, 3),
+        ], axis=1)
+        n = z.shape[0]
+        nis = np.full(n, np.nan)
+        if n == 0:
+            return nis
+
+        with self._lock:
+            sat = self._sats.rows(satellite_ids) if rows is None else np.asarray(rows)
+            for idx in satellite_rounds(sat):
+                nis[idx] = self._step(sat[idx], t[idx], z[idx])
+                self._rounds += 1
+            self._samples += n
+        return nis
+
+    def _step(self, rows: np.ndarray, t: np.ndarray, z: np.ndarray) -> np.ndarray:
+        """One measurement for each of `rows` (distinct satellites); returns their NIS."""
+        nis = np.full(rows.size, np.nan)
+        dt = t - self._t[rows]
+        valid = np.isfinite(z).all(axis=1) & np.isfinite(t)
+        start = valid & ~(np.abs(dt) <= self.reinit_gap_s)  # also no track yet (NaN)
+        track = valid & ~start
+
+        if start.any():
+            new = rows[start]
+            self._x[new] = z[start]
+            self._P[new] = self.R
+            self._t[new] = t[start]
+            self._tracks += new.size
+
+        if track.any():
+            rows, z, t = rows[track], z[track], t[track]
+            dt = np.maximum(dt[track], 0.0)  # a late sample updates without propagating back
+            # predict
+            x, phi = propagate(self._x[rows], dt, self.max_step_s)
+            P = phi @ self._P[rows] @ phi.transpose(0, 2, 1) + self.process_noise(dt)
+            # update
+            y = z - x
+            S = P + self.R
+            nis[track] = np.einsum("ni,ni->n", y, np.linalg.solve(S, y[:, :, None])[:, :, 0])
+            K = np.linalg.solve(S, P).transpose(0, 2, 1)  # P S^-1, both symmetric
+            I_K = np.eye(6) - K
+            self._x[rows] = x + np.einsum("nij,nj->ni", K, y)
+            self._P[rows] = I_K @ P @ I_K.transpose(0, 2, 1) + K @ self.R @ K.transpose(0, 2, 1)
+            self._t[rows] = np.maximum(self._t[rows], t)
+        return nis
+
+    def state(self, satellite_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Current (6,) state and (6, 6) covariance of a tracked satellite."""
+        with self._lock:
+            row = self._sats[satellite_id]
+            return self._x[row].copy(), self._P[row].copy()
 
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "satellites": len(self._sats),
+                "samples": self._samples,
+                "rounds": self._rounds,
+                "tracks_started": self._tracks,
+                "bytes": self._x.nbytes + self._P.nbytes + self._t.nbytes,
+            }
 
 
+# Shared orbit tracks of the detector pipeline (backend/services/pipeline.py)
+orbit_ekf = OrbitEKF()
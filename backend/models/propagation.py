@@ -1,4 +1,7 @@
 """File demonstrating the use of propagators (examples)
+
+These step one object at a time; the NumPy propagator for the whole fleet
+is backend/models/fleet_propagator.py.
 """
 import numpy as np
 
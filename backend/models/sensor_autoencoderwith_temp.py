@@ -4,10 +4,18 @@
 Simplified sensor + temperature anomaly detector for demo.
 
 Instead of a TensorFlow autoencoder, we use simple rule-based checks
-to compute an anomaly score between 0 and 1.
+to compute an anomaly score between 0 and 1. The thresholds are the
+"sensor" ruleset of backend/utils/thresholds.yaml.
 """
 
-from typing import Dict, Tuple
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+
+from backend.utils.thresholds import threshold_rules
+
+INPUTS = ("sensor_temp_c", "battery_level_pct", "comm_signal_db")
+threshold_rules.declare_inputs("sensor", INPUTS)
 
 
 def detect(features: Dict[str, float]) -> Tuple[float, str]:
@@ -25,50 +33,11 @@ def detect(features: Dict[str, float]) -> Tuple[float, str]:
         score (float): 0–1 anomaly score
         message (str): explanation
     """
-    temp = features.get("sensor_temp_c")
-    battery = features.get("battery_level_pct")
-    signal = features.get("comm_signal_db")
-
-    score = 0.0
-    reasons = []
-
-    # Temperature checks
-    if temp is not None:
-        if temp > 80:
-            score += 0.6
-            reasons.append(f"High temperature {temp:.1f} °C")
-        elif temp > 60:
-            score += 0.3
-            reasons.append(f"Elevated temperature {temp:.1f} °C")
-        elif temp < -20:
-            score += 0.4
-            reasons.append(f"Very low temperature {temp:.1f} °C")
-
-    # Battery checks
-    if battery is not None:
-        if battery < 15:
-            score += 0.4
-            reasons.append(f"Low battery {battery:.1f}%")
-        elif battery < 30:
-            score += 0.2
-            reasons.append(f"Weak battery {battery:.1f}%")
-
-    # Signal strength checks
-    if signal is not None:
-        # e.g. -120 dB = very weak, -50 dB = strong
-        if signal < -110:
-            score += 0.4
-            reasons.append(f"Very weak signal {signal:.1f} dB")
-        elif signal < -90:
-            score += 0.2
-            reasons.append(f"Weak signal {signal:.1f} dB")
+    # temperature > 80 / > 60 / < -20, battery < 15 / < 30, signal < -110 / < -90 dB
+    # (the "sensor" ruleset of backend/utils/thresholds.yaml)
+    return threshold_rules.get("sensor").explain(features)
 
-    # Cap score
-    if score == 0.0:
-        message = "Sensor & temperature nominal"
-    else:
-        if score > 1.0:
-            score = 1.0
-        message = "; ".join(reasons)
 
-    return score, message
+def score_batch(features: Mapping[str, np.ndarray]) -> np.ndarray:
+    """(N,) scores of rows given as {key: (N,) array}, keys as in detect(); NaN = no data."""
+    return threshold_rules.get("sensor").evaluate(features).score
@@ -0,0 +1,166 @@
+# backend/services/admission.py
+"""
+Admission control for the telemetry ingest path: fleet-wide and
+per-satellite limits on samples not yet flushed by the event writer, with
+the last `critical_reserve` of each limit kept for critical samples.
+"""
+
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from backend.services.persistence import event_writer
+from backend.core.config import (
+    ADMISSION_MAX_INFLIGHT,
+    ADMISSION_MAX_INFLIGHT_PER_SAT,
+    ADMISSION_CRITICAL_RESERVE,
+    ADMISSION_RETRY_AFTER_S,
+)
+
+
+class AdmissionRejected(Exception):
+    """Every sample of a request was shed. Carries the HTTP status and Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+
+def _rank_within_group(inverse: np.ndarray) -> np.ndarray:
+    """For each row, how many earlier rows share its group id."""
+    order = np.argsort(inverse, kind="stable")
+    counts = np.bincount(inverse)
+    starts = np.cumsum(counts) - counts
+    rank = np.empty_like(inverse)
+    rank[order] = np.arange(inverse.size) - np.repeat(starts, counts)
+    return rank
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_inflight: int = ADMISSION_MAX_INFLIGHT,
+        max_inflight_per_satellite: int = ADMISSION_MAX_INFLIGHT_PER_SAT,
+        critical_reserve: float = ADMISSION_CRITICAL_RESERVE,
+        retry_after_s: int = ADMISSION_RETRY_AFTER_S,
+    ):
+        self.max_inflight = max_inflight
+        self.max_per_sat = max_inflight_per_satellite
+        self.nominal_max = int(max_inflight * (1.0 - critical_reserve))
+        self.nominal_max_per_sat = int(max_inflight_per_satellite * (1.0 - critical_reserve))
+        self.retry_after = retry_after_s
+
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._per_sat: Counter = Counter()
+
+        # metrics
+        self._admitted = Counter()  # by lane
+        self._shed = Counter()      # by reason
+
+    def saturated(self) -> bool:
+        """True when not even a critical sample could be admitted (cheap pre-check)."""
+        return self._inflight >= self.max_inflight
+
+    def reject_saturated(self, n: int = 1) -> AdmissionRejected:
+        with self._lock:
+            self._shed["global_limit"] += n
+        return AdmissionRejected(503, "Ingest at capacity, retry later", self.retry_after)
+
+    def reject_shed(self) -> AdmissionRejected:
+        """The error for one row that admit() shed from a larger group (already counted)."""
+        if self._inflight >= self.nominal_max:
+            return AdmissionRejected(503, "Ingest at capacity, retry later", self.retry_after)
+        return AdmissionRejected(429, "Satellite in-flight limit exceeded, retry later", self.retry_after)
+
+    def admit(self, satellite_ids: Sequence[str], critical: np.ndarray) -> np.ndarray:
+        """
+        Reserve in-flight slots for a group of scored samples.
+
+        Returns a boolean mask of admitted rows. Critical rows are always
+        considered before nominal ones. Raises AdmissionRejected if no row
+        is admitted (429 for a per-satellite limit, 503 for the global one).
+        """
+        n = len(satellite_ids)
+        critical = np.asarray(critical, dtype=bool)
+        sats, inverse = np.unique(np.asarray(satellite_ids), return_inverse=True)
+        inverse = inverse.reshape(-1)
+        admitted = np.zeros(n, dtype=bool)
+
+        with self._lock:
+            used_per_sat = np.array([self._per_sat[s] for s in sats], dtype=np.int64)
+            used = self._inflight
+            hit_global_limit = False
+
+            for lane, mask in (("critical", critical), ("nominal", ~critical)):
+                if not mask.any():
+                    continue
+                sat_cap = self.max_per_sat if lane == "critical" else self.nominal_max_per_sat
+                global_cap = self.max_inflight if lane == "critical" else self.nominal_max
+
+                rows = np.nonzero(mask)[0]
+                rank = _rank_within_group(inverse[rows])
+                room_per_sat = np.maximum(sat_cap - used_per_sat, 0)
+                sat_ok = rank < room_per_sat[inverse[rows]]
+
+                room = max(global_cap - used, 0)
+                ok = sat_ok & (np.cumsum(sat_ok) <= room)
+                hit_global_limit |= int(ok.sum()) < int(sat_ok.sum())
+
+                taken = rows[ok]
+                admitted[taken] = True
+                used += taken.size
+                used_per_sat += np.bincount(inverse[taken], minlength=sats.size)
+                self._admitted[lane] += int(taken.size)
+
+            self._inflight = used
+            for sat, u in zip(sats.tolist(), used_per_sat.tolist()):
+                if u > 0:
+                    self._per_sat[sat] = u
+
+            shed = n - int(admitted.sum())
+            if shed:
+                reason = "global_limit" if hit_global_limit else "satellite_limit"
+                self._shed[reason] += shed
+
+        if n and not admitted.any():
+            if hit_global_limit:
+                raise AdmissionRejected(503, "Ingest at capacity, retry later", self.retry_after)
+            raise AdmissionRejected(429, "Satellite in-flight limit exceeded, retry later", self.retry_after)
+        return admitted
+
+    def release(self, rows: List[Dict[str, Any]]):
+        """Free the slots of persisted rows (event writer flush listener)."""
+        done = Counter(r["satellite_id"] for r in rows)
+        with self._lock:
+            self._inflight = max(self._inflight - len(rows), 0)
+            for sat, k in done.items():
+                left = self._per_sat[sat] - k
+                if left > 0:
+                    self._per_sat[sat] = left
+                else:
+                    del self._per_sat[sat]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "inflight": self._inflight,
+                "max_inflight": self.max_inflight,
+                "satellites_inflight": len(self._per_sat),
+                "max_satellite_inflight": max(self._per_sat.values(), default=0),
+                "admitted": dict(self._admitted),
+                "shed": dict(self._shed),
+            }
+
+
+# Shared controller used by the ingest routes; slots free up as rows are flushed
+admission = AdmissionController()
+event_writer.add_flush_listener(admission.release)
@@ -1,54 +1,72 @@
+from typing import Optional
+
 import numpy as np
 
-def compute_anomaly(features: np.ndarray) -> dict:
+from backend.services.preprocess import FEATURE_FIELDS
+from backend.services.feature_engineering import FEATURE_NAMES
+from backend.services.change_detectors import CHANGE_NAMES
+from backend.services.matrix_profile import DISCORD_NAMES
+from backend.inference.run_inference import MODEL_NAMES
+from backend.utils.thresholds import threshold_rules, RuleResult
+
+# Rules: the "telemetry" ruleset of backend/utils/thresholds.yaml, over the
+# feature vector columns (same order as preprocess):
+# 0-2 pos, 3-5 vel, 6 temp_payload, 7 temp_battery, 8 temp_bus, 9-11 sensors, 12 rssi, 13 snr, 14 packet_loss
+# plus, when given, the rolling-window columns of feature_engineering (FEATURE_NAMES)
+# and the CUSUM / Page-Hinkley / stuck columns of change_detectors (CHANGE_NAMES)
+# and the autoencoder columns of run_inference (MODEL_NAMES)
+# and the comms discord columns of matrix_profile (DISCORD_NAMES)
+TELEMETRY_RULESET = "telemetry"
+threshold_rules.declare_inputs(
+    TELEMETRY_RULESET, FEATURE_FIELDS + FEATURE_NAMES + CHANGE_NAMES + MODEL_NAMES + DISCORD_NAMES
+)
+
+
+def compute_anomaly(
+    features: np.ndarray,
+    rolling: Optional[np.ndarray] = None,
+    change: Optional[np.ndarray] = None,
+    model: Optional[np.ndarray] = None,
+    discords: Optional[np.ndarray] = None,
+) -> dict:
     """
-    Simple rule-based anomaly detection for hackathon prototype.
-    Replace with ML models later.
+    Rule-based anomaly detection for one 15-element feature vector:
+    {"severity", "issues", "score"}, exactly row 0 of compute_anomaly_batch.
     """
-# Index mapping (same as preprocess):
-# 0-2 pos, 3-5 vel, 6 temp_payload, 7 temp_battery, 8 temp_bus, 9-11 sensors, 12 rssi, 13 snr, 14 packet_loss
-
-
-    temp_payload = float(features[6])
-    temp_battery = float(features[7])
-    comms_packet_loss = float(features[14])
-
-
-    issues = []
-
-
-    if temp_payload > 70:
-        issues.append("HIGH_PAYLOAD_TEMPERATURE")
-
-
-    if temp_battery > 60:
-        issues.append("HIGH_BATTERY_TEMPERATURE")
-
-
-    if comms_packet_loss > 0.2:
-        issues.append("HIGH_PACKET_LOSS")
-
-
-    # Example sensor failure heuristic: large variance across sensors
-    sensor_vals = features[9:12]
-    if np.std(sensor_vals) > 50:
-        issues.append("SENSOR_INCONSISTENCY")
-
-
-    if not issues:
-        severity = "normal"
-    elif len(issues) == 1:
-        severity = "warning"
-    else:
-        severity = "critical"
-
-
-    # score normalization (simple)
-    score = min(1.0, len(issues) / 3.0)
-
-
-    return {
-        "severity": severity,
-        "issues": issues,
-        "score": score
-    }
\ No newline at end of file
+    if rolling is not None:
+        rolling = np.asarray(rolling, dtype=float).reshape(1, -1)
+    if change is not None:
+        change = np.asarray(change, dtype=float).reshape(1, -1)
+    if model is not None:
+        model = np.asarray(model, dtype=float).reshape(1, -1)
+    if discords is not None:
+        discords = np.asarray(discords, dtype=float).reshape(1, -1)
+    return compute_anomaly_batch(np.asarray(features, dtype=float)[None, :], rolling, change, model, discords)[0]
+
+
+def compute_anomaly_batch(
+    features: np.ndarray,
+    rolling: Optional[np.ndarray] = None,
+    change: Optional[np.ndarray] = None,
+    model: Optional[np.ndarray] = None,
+    discords: Optional[np.ndarray] = None,
+) -> RuleResult:
+    """
+    Score an (N, 15) feature matrix with the compiled telemetry rules.
+    `rolling` is the matching (N, len(FEATURE_NAMES)) output of
+    rolling_features.update(), `change` the (N, len(CHANGE_NAMES))
+    output of change_detectors.update(), `model` the (N, len(MODEL_NAMES))
+    output of run_models() and `discords` the (N, len(DISCORD_NAMES))
+    output of comms_discords.update(); without them, rules on their
+    columns never fire.
+
+    Every rule is a lookup on its column's threshold bucket, packed into one
+    issue bitmask per row; severity and score are lookups on the mask.
+    The result stays column-wise (issues, severity, score) until
+    to_dicts() / indexing renders compute_anomaly-style dicts.
+    """
+    return threshold_rules.get(TELEMETRY_RULESET).evaluate_matrix(
+        features,
+        FEATURE_FIELDS,
+        [(rolling, FEATURE_NAMES), (change, CHANGE_NAMES), (model, MODEL_NAMES), (discords, DISCORD_NAMES)],
+    )
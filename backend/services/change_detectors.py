@@ -0,0 +1,171 @@
+# backend/services/change_detectors.py
+"""
+Streaming change-point detectors per satellite and channel: CUSUM and
+Page-Hinkley statistics against a robust baseline, and a stuck-value
+counter, each O(1) per sample (details in docs/internals.md).
+"""
+
+import threading
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from backend.core.config import (
+    CHANGE_BASELINE_ALPHA,
+    CHANGE_STAT_MAX,
+    CHANGE_WARMUP,
+    CUSUM_K,
+    PH_DELTA,
+    PH_MEMORY,
+    STUCK_TOLERANCE,
+)
+from backend.services.preprocess import FEATURE_FIELDS, N_FEATURES
+from backend.utils.helpers import SatelliteIndex, satellite_rounds
+
+CHANGE_STATS = ("cusum", "ph", "stuck")
+CLIP_SIGMAS = 3.0
+MIN_STD = 1e-9  # relative to max(1, |mean|); a constant channel must not divide by zero
+
+# state slots, each (n_sats, channels)
+_COUNT, _MEAN, _VAR, _CUSUM_POS, _CUSUM_NEG, _PH_MEAN, _PH_POS, _PH_NEG, _PREV, _STUCK = range(10)
+_N_SLOTS = 10
+
+
+def change_names() -> Tuple[str, ...]:
+    """Column names of the output, stat-major, then channel."""
+    return tuple(f"{field}_{stat}" for stat in CHANGE_STATS for field in FEATURE_FIELDS)
+
+
+CHANGE_NAMES = change_names()
+
+
+class ChangeDetectors:
+    def __init__(
+        self,
+        baseline_alpha: float = CHANGE_BASELINE_ALPHA,
+        warmup: int = CHANGE_WARMUP,
+        cusum_k: float = CUSUM_K,
+        ph_delta: float = PH_DELTA,
+        ph_memory: int = PH_MEMORY,
+        stuck_tolerance: float = STUCK_TOLERANCE,
+        stat_max: float = CHANGE_STAT_MAX,
+        initial_satellites: int = 16,
+    ):
+        if not 0.0 < baseline_alpha < 1.0:
+            raise ValueError("baseline alpha must be in (0, 1)")
+        if warmup < 2 or ph_memory < 2:
+            raise ValueError("warm-up and Page-Hinkley memory must be at least 2 samples")
+        self.baseline_alpha = float(baseline_alpha)
+        self.warmup = int(warmup)
+        self.cusum_k = float(cusum_k)
+        self.ph_delta = float(ph_delta)
+        self.ph_memory = int(ph_memory)
+        self.stuck_tolerance = float(stuck_tolerance)
+        self.stat_max = float(stat_max)
+        self.names = CHANGE_NAMES
+        self.n_features = len(self.names)
+
+        self._lock = threading.Lock()
+        self._sats = SatelliteIndex(initial_satellites, self._grow)
+        self._state = np.zeros((initial_satellites, _N_SLOTS, N_FEATURES))
+
+        # metrics
+        self._samples = 0
+        self._rounds = 0
+
+    # ----- state arrays -----
+    def _grow(self, n_sats: int):
+        extra = n_sats - self._state.shape[0]
+        self._state = np.concatenate([self._state, np.zeros((extra,) + self._state.shape[1:])])
+
+    # ----- update -----
+    def update(self, satellite_ids: Sequence[str], features: np.ndarray) -> np.ndarray:
+        """
+        Apply N samples ((N, 15) features) in order and return the
+        (N, len(CHANGE_NAMES)) detector outputs after each of them.
+        """
+        features = np.asarray(features, dtype=float).reshape(-1, N_FEATURES)
+        n = features.shape[0]
+        out = np.empty((n, len(CHANGE_STATS), N_FEATURES))
+        if n == 0:
+            return out.reshape(0, self.n_features)
+
+        with self._lock:
+            sat = self._sats.rows(satellite_ids)
+            for idx in satellite_rounds(sat):
+                out[idx] = self._step(sat[idx], features[idx])
+                self._rounds += 1
+            self._samples += n
+        return out.reshape(n, self.n_features)
+
+    def _step(self, rows: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """One sample for each of `rows` (distinct satellites); returns (rows, stat, channel)."""
+        old = self._state[rows]
+        s = old.copy()
+        n_seq = s[:, _COUNT]                       # finite, non-stuck samples seen per lane
+        mean, var = s[:, _MEAN], s[:, _VAR]
+        first = n_seq == 0
+        warm = n_seq >= self.warmup
+
+        # standardized against the baseline before this sample
+        std = np.maximum(np.sqrt(var), MIN_STD * np.maximum(1.0, np.abs(mean)))
+        resid = x - mean
+        z = resid / std
+
+        # CUSUM
+        cap = self.stat_max
+        cusum_pos = np.where(warm, np.clip(s[:, _CUSUM_POS] + z - self.cusum_k, 0.0, cap), 0.0)
+        cusum_neg = np.where(warm, np.clip(s[:, _CUSUM_NEG] - z - self.cusum_k, 0.0, cap), 0.0)
+
+        # Page-Hinkley against its own running mean
+        ph_mean = s[:, _PH_MEAN] + (x - s[:, _PH_MEAN]) / np.minimum(n_seq + 1, self.ph_memory)
+        u = (x - ph_mean) / std
+        ph_pos = np.where(warm, np.clip(s[:, _PH_POS] + u - self.ph_delta, 0.0, cap), 0.0)
+        ph_neg = np.where(warm, np.clip(s[:, _PH_NEG] - u - self.ph_delta, 0.0, cap), 0.0)
+
+        # stuck run
+        prev = s[:, _PREV]
+        same = ~first & (np.abs(x - prev) <= self.stuck_tolerance * np.maximum(1.0, np.abs(prev)))
+        stuck = np.where(same, s[:, _STUCK] + 1.0, 0.0)
+
+        # baseline: running moments during warm-up, then a clipped EWMA;
+        # a repeated reading carries no information, a rising CUSUM holds it
+        g = np.maximum(s[:, _CUSUM_POS], s[:, _CUSUM_NEG])
+        hold = (g > self.stat_max / 2) & (g < self.stat_max)
+        a = np.where(same | hold, 0.0, np.maximum(1.0 / (n_seq + 1), self.baseline_alpha))
+        step = np.where(warm, np.clip(resid, -CLIP_SIGMAS * std, CLIP_SIGMAS * std), resid)
+        s[:, _MEAN] = mean + a * step
+        s[:, _VAR] = np.where(first, 0.0, (1.0 - a) * (var + a * step * step))
+
+        s[:, _CUSUM_POS], s[:, _CUSUM_NEG] = cusum_pos, cusum_neg
+        s[:, _PH_MEAN], s[:, _PH_POS], s[:, _PH_NEG] = ph_mean, ph_pos, ph_neg
+        s[:, _PREV], s[:, _STUCK] = x, stuck
+        s[:, _COUNT] = n_seq + ~same
+
+        # a NaN sample leaves the channel as it was
+        nan = np.isnan(x)
+        if nan.any():
+            s = np.where(nan[:, None, :], old, s)
+        self._state[rows] = s
+
+        res = np.empty((rows.size, len(CHANGE_STATS), N_FEATURES))
+        res[:, 0] = np.maximum(cusum_pos, cusum_neg)
+        res[:, 1] = np.maximum(ph_pos, ph_neg)
+        res[:, 2] = stuck
+        if nan.any():
+            res[nan[:, None, :].repeat(len(CHANGE_STATS), axis=1)] = np.nan
+        return res
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "satellites": len(self._sats),
+                "features": self.n_features,
+                "samples": self._samples,
+                "rounds": self._rounds,
+                "bytes": self._state.nbytes,
+            }
+
+
+# Shared detector state updated by the ingest routes
+change_detectors = ChangeDetectors()
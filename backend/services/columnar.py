@@ -0,0 +1,166 @@
+# backend/services/columnar.py
+"""
+Columnar (binary) telemetry payloads: NPZ, structured .npy, or an Arrow IPC
+stream (with pyarrow) carrying `timestamp`, `satellite_id` and the 15
+FEATURE_FIELDS, stacked straight into the (N, 15) feature matrix.
+"""
+
+import io
+from typing import Dict, Tuple
+
+import numpy as np
+
+from backend.services.preprocess import FEATURE_FIELDS, N_FEATURES
+from backend.utils.helpers import parse_timestamp
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow support is optional
+    pa = None
+
+NPZ_CONTENT_TYPE = "application/x-npz"
+NPY_CONTENT_TYPE = "application/x-npy"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+
+ID_FIELDS = ("timestamp", "satellite_id")
+
+
+class ColumnarFormatError(ValueError):
+    """Payload could not be decoded or failed dtype/shape validation."""
+
+
+class UnsupportedColumnarFormat(ColumnarFormatError):
+    """Content type is not a columnar format this server understands."""
+
+
+def supported_content_types() -> Tuple[str, ...]:
+    types = (NPZ_CONTENT_TYPE, NPY_CONTENT_TYPE)
+    if pa is not None:
+        types += (ARROW_CONTENT_TYPE,)
+    return types
+
+
+# ----- decoding -----
+def _read_npz(body: bytes) -> Dict[str, np.ndarray]:
+    try:
+        with np.load(io.BytesIO(body), allow_pickle=False) as npz:
+            return {name: npz[name] for name in npz.files}
+    except Exception as e:
+        raise ColumnarFormatError(f"invalid NPZ payload: {e}")
+
+
+def _read_npy(body: bytes) -> Dict[str, np.ndarray]:
+    try:
+        arr = np.load(io.BytesIO(body), allow_pickle=False)
+    except Exception as e:
+        raise ColumnarFormatError(f"invalid NPY payload: {e}")
+    if arr.dtype.names is None:
+        raise ColumnarFormatError("NPY payload must be a structured array with named fields")
+    return {name: arr[name] for name in arr.dtype.names}
+
+
+def _read_arrow(body: bytes) -> Dict[str, np.ndarray]:
+    if pa is None:
+        raise UnsupportedColumnarFormat("Arrow payloads require pyarrow on the server")
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except Exception as e:
+        raise ColumnarFormatError(f"invalid Arrow IPC payload: {e}")
+    return {
+        name: table.column(name).to_numpy()
+        for name in table.column_names
+    }
+
+
+_READERS = {
+    NPZ_CONTENT_TYPE: _read_npz,
+    NPY_CONTENT_TYPE: _read_npy,
+    ARROW_CONTENT_TYPE: _read_arrow,
+}
+
+
+def _as_strings(name: str, col: np.ndarray) -> np.ndarray:
+    if col.dtype.kind == "U":
+        return col
+    if col.dtype.kind == "S":
+        return np.char.decode(col, "utf-8")
+    if name == "timestamp" and col.dtype.kind == "M":
+        return np.datetime_as_string(col, timezone="UTC")
+    if col.dtype.kind == "O":  # e.g. Arrow strings
+        if not all(isinstance(v, str) for v in col):
+            raise ColumnarFormatError(f"column '{name}' must contain strings")
+        return col.astype(str)
+    raise ColumnarFormatError(f"column '{name}' must be a string column, got dtype {col.dtype}")
+
+
+def decode_columnar(body: bytes, content_type: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decode a columnar payload into (timestamps, satellite_ids, features).
+
+    timestamps and satellite_ids are 1-D string arrays of length N and
+    features is a float (N, 15) matrix in FEATURE_FIELDS order.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    reader = _READERS.get(media_type)
+    if reader is None:
+        raise UnsupportedColumnarFormat(
+            f"unsupported content type '{media_type}', expected one of {supported_content_types()}"
+        )
+    columns = reader(body)
+
+    missing = [f for f in ID_FIELDS + FEATURE_FIELDS if f not in columns]
+    if missing:
+        raise ColumnarFormatError(f"missing columns: {missing}")
+
+    n = None
+    for name in ID_FIELDS + FEATURE_FIELDS:
+        col = columns[name]
+        if col.ndim != 1:
+            raise ColumnarFormatError(f"column '{name}' must be 1-D, got shape {col.shape}")
+        if n is None:
+            n = col.shape[0]
+        elif col.shape[0] != n:
+            raise ColumnarFormatError(
+                f"column '{name}' has {col.shape[0]} rows, expected {n}"
+            )
+
+    features = np.empty((n, N_FEATURES), dtype=float)
+    for j, name in enumerate(FEATURE_FIELDS):
+        col = columns[name]
+        if col.dtype.kind not in "fiu":
+            raise ColumnarFormatError(f"column '{name}' must be numeric, got dtype {col.dtype}")
+        features[:, j] = col
+
+    finite = np.isfinite(features)
+    if not finite.all():
+        bad = FEATURE_FIELDS[int(np.argmin(finite.all(axis=0)))]
+        raise ColumnarFormatError(f"column '{bad}' contains NaN or infinite values")
+
+    timestamps = _as_strings("timestamp", columns["timestamp"])
+    for i, ts in enumerate(timestamps.tolist()):
+        try:
+            parse_timestamp(ts)
+        except ValueError:
+            raise ColumnarFormatError(f"column 'timestamp' row {i}: invalid ISO-8601 timestamp '{ts}'")
+    satellite_ids = _as_strings("satellite_id", columns["satellite_id"])
+    return timestamps, satellite_ids, features
+
+
+# ----- encoding (for producers / benchmarks) -----
+def encode_npz(columns: Dict[str, np.ndarray]) -> bytes:
+    """Pack column arrays into an application/x-npz payload."""
+    buf = io.BytesIO()
+    np.savez(buf, **{name: np.asarray(col) for name, col in columns.items()})
+    return buf.getvalue()
+
+
+def encode_npy(columns: Dict[str, np.ndarray]) -> bytes:
+    """Pack column arrays into an application/x-npy structured-array payload."""
+    cols = {name: np.asarray(col) for name, col in columns.items()}
+    n = len(next(iter(cols.values())))
+    arr = np.empty(n, dtype=[(name, col.dtype) for name, col in cols.items()])
+    for name, col in cols.items():
+        arr[name] = col
+    buf = io.BytesIO()
+    np.save(buf, arr, allow_pickle=False)
+    return buf.getvalue()
@@ -0,0 +1,351 @@
+# backend/services/feature_engineering.py
+"""
+Streaming rolling-window features per satellite: mean, std, min, max, EWMA
+and rate of change of every channel over each of FEATURE_WINDOWS, updated
+in O(1) per sample (details in docs/internals.md).
+"""
+
+import threading
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from backend.core.config import FEATURE_WINDOWS
+from backend.services.preprocess import FEATURE_FIELDS, N_FEATURES
+from backend.utils.helpers import SatelliteIndex, satellite_groups, satellite_rounds
+
+STATS = ("mean", "std", "min", "max", "ewma", "roc")
+RESYNC_EVERY = 4096  # samples per satellite between exact recomputations of the moments
+RUN_MIN_SAMPLES = 16  # samples of one satellite in a batch from which it is updated as a run
+EWMA_CHUNK = 64
+
+
+def feature_names(windows: Sequence[int] = FEATURE_WINDOWS) -> Tuple[str, ...]:
+    """Column names of the output, window-major, then stat, then channel."""
+    return tuple(f"{field}_{stat}_{w}" for w in windows for stat in STATS for field in FEATURE_FIELDS)
+
+
+FEATURE_NAMES = feature_names()
+
+
+def _sliding_extreme(E: np.ndarray, w: int, fn) -> np.ndarray:
+    """
+    fn (np.minimum / np.maximum) over the last w rows up to each row of E
+    (fewer at the start), in O(len(E)) with van Herk / Gil-Werman blocks.
+    """
+    M, C = E.shape
+    pad = -(-M // w) * w - M
+    fill = np.inf if fn is np.minimum else -np.inf
+    blocks = np.concatenate([E, np.full((pad, C), fill)]).reshape(-1, w, C)
+    prefix = fn.accumulate(blocks, axis=1).reshape(-1, C)
+    suffix = fn.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, C)
+    res = fn.accumulate(E, axis=0)                       # partial windows at the start
+    if M >= w:
+        i = np.arange(w - 1, M)
+        res[w - 1:] = fn(suffix[i - w + 1], prefix[i])
+    return res
+
+
+class _Deque:
+    """
+    Monotonic deques of one window for all (satellite, channel) lanes: ring
+    buffers of (sequence number, value), shaped (n_sats, channels, capacity)
+    with a power-of-two capacity >= window. head and tail are absolute
+    positions (slot = position & (capacity - 1)). Lanes are addressed flat
+    (row * channels + channel) so that every access is a 1-D take.
+    """
+
+    def __init__(self, n_sats: int, channels: int, window: int, keep_max: bool):
+        self.window = window
+        self.keep_max = keep_max
+        self.capacity = 1 << (window - 1).bit_length()
+        self.seq = np.zeros((n_sats, channels, self.capacity), dtype=np.int64)
+        self.val = np.zeros((n_sats, channels, self.capacity))
+        self.head = np.zeros((n_sats, channels), dtype=np.int64)
+        self.tail = np.zeros((n_sats, channels), dtype=np.int64)
+
+    def grow(self, n_sats: int):
+        extra = n_sats - self.seq.shape[0]
+        pad = lambda a: np.concatenate([a, np.zeros((extra,) + a.shape[1:], dtype=a.dtype)])
+        self.seq, self.val = pad(self.seq), pad(self.val)
+        self.head, self.tail = pad(self.head), pad(self.tail)
+
+    def push(self, lanes: np.ndarray, n_seq: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """Add sample n_seq with value x to each lane; returns the window extreme per lane."""
+        m = self.capacity - 1
+        seq, val = self.seq.reshape(-1), self.val.reshape(-1)
+        head_all, tail_all = self.head.reshape(-1), self.tail.reshape(-1)
+        base = lanes * self.capacity
+        head, tail = head_all[lanes], tail_all[lanes]
+
+        # expire the front if it slid out of the window (at most one per step)
+        head += (tail > head) & (seq.take(base + (head & m)) <= n_seq - self.window)
+
+        # pop dominated values from the back, only on lanes that still pop
+        active = np.flatnonzero(tail > head)
+        while active.size:
+            v = val.take(base[active] + ((tail[active] - 1) & m))
+            active = active[(v <= x[active]) if self.keep_max else (v >= x[active])]
+            tail[active] -= 1
+            active = active[tail[active] > head[active]]
+
+        slot = base + (tail & m)
+        seq[slot] = n_seq
+        val[slot] = x
+        head_all[lanes], tail_all[lanes] = head, tail + 1
+        return val.take(base + (head & m))
+
+    def rebuild(self, lanes: np.ndarray, seqs: np.ndarray, values: np.ndarray):
+        """
+        Reset the deques of `lanes` to the current window: `values` (cnt, lanes),
+        oldest first, with sequence numbers `seqs`. A sample stays iff it beats
+        every later one (strictly), which is what push() keeps.
+        """
+        fn = np.maximum if self.keep_max else np.minimum
+        fill = -np.inf if self.keep_max else np.inf
+        later = np.concatenate([fn.accumulate(values[::-1], axis=0)[::-1][1:], np.full((1, values.shape[1]), fill)])
+        kept = values > later if self.keep_max else values < later
+        slot = np.cumsum(kept, axis=0) - 1
+        i, lane = np.nonzero(kept)
+        base = lanes * self.capacity
+        self.seq.reshape(-1)[base[lane] + slot[i, lane]] = seqs[i]
+        self.val.reshape(-1)[base[lane] + slot[i, lane]] = values[i, lane]
+        self.head.reshape(-1)[lanes] = 0
+        self.tail.reshape(-1)[lanes] = kept.sum(axis=0)
+
+
+class RollingFeatures:
+    def __init__(self, windows: Sequence[int] = FEATURE_WINDOWS, initial_satellites: int = 16):
+        self.windows = tuple(int(w) for w in windows)
+        if not self.windows or min(self.windows) < 2:
+            raise ValueError("feature windows must be at least 2 samples")
+        self.names = feature_names(self.windows)
+        self.n_features = len(self.names)
+        self._lock = threading.Lock()
+        self._sats = SatelliteIndex(initial_satellites, self._grow)
+
+        self._hist_len = max(self.windows)
+        self._alpha = np.array([2.0 / (w + 1) for w in self.windows])
+        self._alloc(initial_satellites)
+
+        # metrics
+        self._samples = 0
+        self._rounds = 0
+        self._resyncs = 0
+
+    # ----- state arrays -----
+    def _alloc(self, n_sats: int):
+        C, H, K = N_FEATURES, self._hist_len, len(self.windows)
+        self._seq = np.zeros(n_sats, dtype=np.int64)          # samples seen per satellite
+        self._hist_x = np.zeros((n_sats, H, C))               # ring of the last H samples
+        self._hist_t = np.zeros((n_sats, H))
+        self._mean = np.zeros((n_sats, K, C))
+        self._m2 = np.zeros((n_sats, K, C))
+        self._ewma = np.zeros((n_sats, K, C))
+        self._max = [_Deque(n_sats, C, w, keep_max=True) for w in self.windows]
+        self._min = [_Deque(n_sats, C, w, keep_max=False) for w in self.windows]
+
+    def _grow(self, n_sats: int):
+        extra = n_sats - self._seq.shape[0]
+        pad = lambda a: np.concatenate([a, np.zeros((extra,) + a.shape[1:], dtype=a.dtype)])
+        self._seq, self._hist_x, self._hist_t = pad(self._seq), pad(self._hist_x), pad(self._hist_t)
+        self._mean, self._m2, self._ewma = pad(self._mean), pad(self._m2), pad(self._ewma)
+        for dq in self._max + self._min:
+            dq.grow(n_sats)
+
+    # ----- update -----
+    def update(self, satellite_ids: Sequence[str], t: np.ndarray, features: np.ndarray) -> np.ndarray:
+        """
+        Apply N samples (epoch seconds t, (N, 15) features) in order and
+        return the (N, n_features) rolling features after each of them.
+        """
+        features = np.asarray(features, dtype=float).reshape(-1, N_FEATURES)
+        t = np.asarray(t, dtype=float).reshape(-1)
+        n = features.shape[0]
+        out = np.empty((n, len(self.windows), len(STATS), N_FEATURES))
+        if n == 0:
+            return out.reshape(0, self.n_features)
+
+        with self._lock:
+            sat = self._sats.rows(satellite_ids)
+
+            # long runs of one satellite: vectorized over time
+            short = np.ones(n, dtype=bool)
+            for idx in satellite_groups(sat):
+                if idx.size >= RUN_MIN_SAMPLES:
+                    out[idx] = self._run(int(sat[idx[0]]), t[idx], features[idx])
+                    short[idx] = False
+
+            # the rest in rounds: the r-th sample of every satellite at once
+            for idx in satellite_rounds(sat, np.flatnonzero(short)):
+                res = np.empty((idx.size,) + out.shape[1:])
+                self._step(sat[idx], t[idx], features[idx], res)
+                out[idx] = res
+                self._rounds += 1
+            self._samples += n
+        return out.reshape(n, self.n_features)
+
+    def _step(self, rows: np.ndarray, t: np.ndarray, x: np.ndarray, out: np.ndarray):
+        """One sample for each of `rows` (distinct satellites); writes out[i, window, stat, channel]."""
+        H = self._hist_len
+        n_seq = self._seq[rows]
+
+        # values leaving each window, read before the ring slot is overwritten
+        leaving = [self._hist_x[rows, (n_seq - w) % H] for w in self.windows]
+        pos = n_seq % H
+        self._hist_x[rows, pos] = x
+        self._hist_t[rows, pos] = t
+
+        mean, m2 = self._mean[rows], self._m2[rows]
+        lanes = (rows[:, None] * N_FEATURES + np.arange(N_FEATURES)).reshape(-1)
+        lane_seq = np.repeat(n_seq, N_FEATURES)
+        lane_x = x.reshape(-1)
+        ewma = self._ewma[rows]
+        first = (n_seq == 0)[:, None]
+        for k, w in enumerate(self.windows):
+            full = (n_seq >= w)[:, None]
+            cnt = np.minimum(n_seq + 1, w)[:, None].astype(float)
+
+            # sliding Welford: replace the leaving value, or grow the window
+            old = leaving[k]
+            mu = mean[:, k]
+            mu_new = np.where(full, mu + (x - old) / w, mu + (x - mu) / cnt)
+            m2[:, k] += np.where(full, (x - old) * (x - mu_new + old - mu), (x - mu) * (x - mu_new))
+            mean[:, k] = mu_new
+            np.maximum(m2[:, k], 0.0, out=m2[:, k])
+
+            ewma[:, k] = np.where(first, x, ewma[:, k] + self._alpha[k] * (x - ewma[:, k]))
+
+            # rate of change against the oldest sample still in the window
+            oldest = np.maximum(n_seq - w + 1, 0) % H
+            dt = (t - self._hist_t[rows, oldest])[:, None]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                roc = np.where(dt > 0, (x - self._hist_x[rows, oldest]) / dt, np.nan)
+
+            o = out[:, k]
+            o[:, 0] = mu_new
+            o[:, 1] = np.sqrt(m2[:, k] / cnt)
+            o[:, 2] = self._min[k].push(lanes, lane_seq, lane_x).reshape(x.shape)
+            o[:, 3] = self._max[k].push(lanes, lane_seq, lane_x).reshape(x.shape)
+            o[:, 4] = ewma[:, k]
+            o[:, 5] = roc
+
+        n_seq = n_seq + 1
+        self._seq[rows] = n_seq
+        resync = n_seq % RESYNC_EVERY == 0
+        if resync.any():
+            self._resync(rows[resync], n_seq[resync], mean, m2, np.flatnonzero(resync))
+        self._mean[rows], self._m2[rows], self._ewma[rows] = mean, m2, ewma
+
+    def _run(self, row: int, t: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """
+        L consecutive samples of one satellite, vectorized over time: the
+        windows are computed over [history tail + run] with cumulative sums,
+        block-wise extremes and a chunked EWMA, then the per-window state
+        (ring, moments, deques, EWMA) is rebuilt from the last window.
+        Same results as L calls of _step, up to rounding.
+        """
+        H, C, L = self._hist_len, N_FEATURES, x.shape[0]
+        n0 = int(self._seq[row])
+        P = min(n0, H - 1)                                   # history samples to prepend
+        prev = (n0 - P + np.arange(P)) % H
+        E = np.concatenate([self._hist_x[row, prev], x])     # (P + L, C)
+        ET = np.concatenate([self._hist_t[row, prev], t])
+        end = P + np.arange(L)                               # index in E of each new sample
+        out = np.empty((L, len(self.windows), len(STATS), C))
+
+        # shifted cumulative sums for the windowed moments
+        ref = E.mean(axis=0)
+        D = E - ref
+        S1 = np.concatenate([np.zeros((1, C)), np.cumsum(D, axis=0)])
+        S2 = np.concatenate([np.zeros((1, C)), np.cumsum(D * D, axis=0)])
+        for k, w in enumerate(self.windows):
+            start = np.maximum(end - w + 1, 0)
+            cnt = (end - start + 1)[:, None].astype(float)
+            s1 = S1[end + 1] - S1[start]
+            mean_d = s1 / cnt
+            var = np.maximum((S2[end + 1] - S2[start]) / cnt - mean_d * mean_d, 0.0)
+
+            dt = (ET[end] - ET[start])[:, None]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                roc = np.where(dt > 0, (E[end] - E[start]) / dt, np.nan)
+
+            o = out[:, k]
+            o[:, 0] = mean_d + ref
+            o[:, 1] = np.sqrt(var)
+            o[:, 2] = _sliding_extreme(E, w, np.minimum)[end]
+            o[:, 3] = _sliding_extreme(E, w, np.maximum)[end]
+            o[:, 4] = self._ewma_run(row, k, x, first=n0 == 0)
+            o[:, 5] = roc
+
+        # state after the run
+        n_seq = n0 + L
+        keep = min(L, H)
+        pos = (n_seq - keep + np.arange(keep)) % H
+        self._hist_x[row, pos] = x[L - keep:]
+        self._hist_t[row, pos] = t[L - keep:]
+        self._seq[row] = n_seq
+        lanes = row * C + np.arange(C)
+        for k, w in enumerate(self.windows):
+            cnt = min(n_seq, w)
+            last = E[len(E) - cnt:]                          # the current window, oldest first
+            mu = last.mean(axis=0)
+            self._mean[row, k] = mu
+            self._m2[row, k] = ((last - mu) ** 2).sum(axis=0)
+            self._ewma[row, k] = out[-1, k, 4]
+            seqs = n_seq - cnt + np.arange(cnt)
+            self._min[k].rebuild(lanes, seqs, last)
+            self._max[k].rebuild(lanes, seqs, last)
+        return out
+
+    def _ewma_run(self, row: int, k: int, x: np.ndarray, first: bool) -> np.ndarray:
+        # e_j = d^(j+1) e_prev + sum_i a d^(j-i) x_i within chunks of EWMA_CHUNK samples,
+        # carried across chunks; the first sample ever starts the average at x_0
+        a = self._alpha[k]
+        d = 1.0 - a
+        L, C = x.shape
+        B = EWMA_CHUNK
+        nb = -(-L // B)
+        xp = np.zeros((nb * B, C))
+        xp[:L] = x
+        j = np.arange(B)
+        weights = np.where(j[:, None] >= j[None, :], a * d ** (j[:, None] - j[None, :]).clip(0), 0.0)
+        decay = d ** (j + 1)
+        partial = weights @ xp.reshape(nb, B, C)
+        e = x[0].copy() if first else self._ewma[row, k].copy()
+        for n in range(nb):
+            partial[n] += decay[:, None] * e
+            e = partial[n, -1]
+        return partial.reshape(nb * B, C)[:L]
+
+    def _resync(self, rows: np.ndarray, n_seq: np.ndarray, mean: np.ndarray, m2: np.ndarray, at: np.ndarray):
+        # exact moments from the history ring; O(window) once every RESYNC_EVERY samples
+        H = self._hist_len
+        for k, w in enumerate(self.windows):
+            ok = n_seq >= w
+            if not ok.any():
+                continue
+            r, a = rows[ok], at[ok]
+            slots = (n_seq[ok, None] - 1 - np.arange(w)) % H      # the last w samples
+            vals = self._hist_x[r[:, None], slots]                 # (n, w, C)
+            mean[a, k] = vals.mean(axis=1)
+            m2[a, k] = ((vals - mean[a, k][:, None]) ** 2).sum(axis=1)
+        self._resyncs += rows.size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            nbytes = sum(a.nbytes for a in (self._seq, self._hist_x, self._hist_t, self._mean, self._m2, self._ewma))
+            nbytes += sum(a.nbytes for dq in self._max + self._min for a in (dq.seq, dq.val, dq.head, dq.tail))
+            return {
+                "satellites": len(self._sats),
+                "windows": list(self.windows),
+                "features": self.n_features,
+                "samples": self._samples,
+                "rounds": self._rounds,
+                "resyncs": self._resyncs,
+                "bytes": nbytes,
+            }
+
+
+# Shared rolling state updated by the ingest routes
+rolling_features = RollingFeatures()
@@ -0,0 +1,117 @@
+# backend/services/feed.py
+"""
+Push feed of new anomaly records.
+
+Every record added to in-memory state is published here once, serialized
+to JSON once, and fanned out to subscribers whose filters match. Each
+subscriber has a bounded queue; a subscriber that falls behind loses its
+oldest undelivered records (counted in `dropped`) instead of growing memory.
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.core.config import FEED_QUEUE_MAX
+
+
+class Subscription:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        satellite_ids: Optional[Iterable[str]] = None,
+        severities: Optional[Iterable[str]] = None,
+        maxsize: int = FEED_QUEUE_MAX,
+    ):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Tuple[int, str]]" = asyncio.Queue(maxsize=maxsize)
+        self.satellite_ids = set(satellite_ids) if satellite_ids else None
+        self.severities = {s.lower() for s in severities} if severities else None
+        self.dropped = 0
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        if self.satellite_ids is not None and record.get("satellite_id") not in self.satellite_ids:
+            return False
+        if self.severities is not None:
+            severity = record.get("anomaly", {}).get("severity", "normal")
+            if severity not in self.severities:
+                return False
+        return True
+
+    def _offer(self, events: List[Tuple[int, str]]):
+        # runs on the subscriber's event loop
+        for event in events:
+            if self.queue.full():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(event)
+
+
+class AnomalyFeed:
+    def __init__(self, maxsize: int = FEED_QUEUE_MAX):
+        self.maxsize = maxsize
+        self._subs: set = set()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._published = 0
+
+    def subscribe(
+        self,
+        satellite_ids: Optional[Iterable[str]] = None,
+        severities: Optional[Iterable[str]] = None,
+    ) -> Subscription:
+        """Register a subscriber; must be called from its event loop."""
+        sub = Subscription(asyncio.get_running_loop(), satellite_ids, severities, self.maxsize)
+        with self._lock:
+            self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subs.discard(sub)
+
+    def publish(self, records: List[Dict[str, Any]]):
+        """Fan new anomaly records out to matching subscribers (thread-safe)."""
+        with self._lock:
+            first = self._seq + 1
+            self._seq += len(records)
+            self._published += len(records)
+            subs = list(self._subs)
+        if not subs or not records:
+            return
+
+        events = [(first + i, r, None) for i, r in enumerate(records)]
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        for sub in subs:
+            matched = []
+            for k, (seq, record, payload) in enumerate(events):
+                if not sub.matches(record):
+                    continue
+                if payload is None:  # serialize each record at most once
+                    payload = json.dumps(record, default=str)
+                    events[k] = (seq, record, payload)
+                matched.append((seq, payload))
+            if not matched:
+                continue
+            if sub.loop is running:
+                sub._offer(matched)
+            else:
+                sub.loop.call_soon_threadsafe(sub._offer, matched)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subs = list(self._subs)
+            return {
+                "subscribers": len(subs),
+                "published": self._published,
+                "dropped": sum(s.dropped for s in subs),
+            }
+
+
+# Shared feed, published to by backend/services/state.py
+anomaly_feed = AnomalyFeed()
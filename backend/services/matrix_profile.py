@@ -0,0 +1,316 @@
+# backend/services/matrix_profile.py
+"""
+Streaming matrix-profile discords on the comms channels: each new sample
+is scored by the scaled distance from its last MP_SUBSEQ samples to their
+nearest earlier match in the window, updated in O(window) per sample
+(derivation in docs/internals.md).
+"""
+
+import threading
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from backend.core.config import MP_REFRESH, MP_SUBSEQ, MP_WINDOW
+from backend.services.preprocess import FEATURE_FIELDS, N_FEATURES
+from backend.utils.helpers import SatelliteIndex, satellite_groups, satellite_rounds
+
+DISCORD_CHANNELS = ("comms_rssi", "comms_snr", "comms_packet_loss")
+RUN_MIN_SAMPLES = 64  # samples of one satellite in a batch from which it is updated as a run
+RUN_CHUNK = 256       # new samples per block of a run (the block holds chunk x window products)
+MIN_NOISE_STD = 1e-12  # noise level of a constant channel, so that scores stay finite
+
+def discord_names(channels: Sequence[str] = DISCORD_CHANNELS) -> Tuple[str, ...]:
+    return tuple(f"{c}_discord" for c in channels)
+
+
+DISCORD_NAMES = discord_names()
+
+
+# ----- MASS building blocks, over the last axis (leading axes are independent series) -----
+def sliding_dot_product(query: np.ndarray, series: np.ndarray) -> np.ndarray:
+    """
+    Dot products of `query` (..., m) with every length-m subsequence of
+    `series` (..., n): (..., n - m + 1), with one FFT of length n. The
+    circular correlation is exact for every start whose subsequence does
+    not wrap around, which is all of them.
+    """
+    n, m = series.shape[-1], query.shape[-1]
+    padded = np.zeros(series.shape[:-1] + (n,))
+    padded[..., :m] = query
+    corr = np.fft.irfft(np.fft.rfft(series, n) * np.conj(np.fft.rfft(padded, n)), n)
+    return corr[..., :n - m + 1]
+
+
+def sliding_moments(series: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum of squares and variance of every length-m subsequence of `series` (..., n)."""
+    c1 = np.zeros(series.shape[:-1] + (series.shape[-1] + 1,))
+    c2 = np.zeros_like(c1)
+    np.cumsum(series, axis=-1, out=c1[..., 1:])
+    np.cumsum(series * series, axis=-1, out=c2[..., 1:])
+    s1, s2 = c1[..., m:] - c1[..., :-m], c2[..., m:] - c2[..., :-m]
+    return s2, np.maximum(s2 / m - (s1 / m) ** 2, 0.0)
+
+
+def distance_profile(query: np.ndarray, series: np.ndarray) -> np.ndarray:
+    """Euclidean distances of `query` (m,) to every length-m subsequence of `series` (n,): (n - m + 1,)."""
+    query, series = np.asarray(query, dtype=float), np.asarray(series, dtype=float)
+    centre = series.mean()
+    query, series = query - centre, series - centre
+    sq, _ = sliding_moments(series, query.size)
+    return np.sqrt(np.maximum(query @ query + sq - 2.0 * sliding_dot_product(query, series), 0.0))
+
+
+class MatrixProfileDiscords:
+    def __init__(
+        self,
+        window: int = MP_WINDOW,
+        subsequence: int = MP_SUBSEQ,
+        refresh: int = MP_REFRESH,
+        channels: Sequence[str] = DISCORD_CHANNELS,
+        initial_satellites: int = 16,
+    ):
+        self.m = int(subsequence)
+        self.window = int(window)
+        self.exclusion = self.m // 2
+        if self.m < 2 or self.window < 2 * self.m + self.exclusion:
+            raise ValueError("subsequence must be >= 2 samples and the window at least 2.5 subsequences")
+        self.refresh = max(1, int(refresh))
+        self.channels = np.array([FEATURE_FIELDS.index(c) for c in channels], dtype=np.int64)
+        self.names = discord_names(channels)
+        self.n_features = len(self.names)
+        self.n_slots = self.window - self.m + 1
+        self.min_samples = self.m + self.exclusion  # one non-trivial neighbour
+
+        self._lock = threading.Lock()
+        self._sats = SatelliteIndex(initial_satellites, self._grow)
+        self._alloc(initial_satellites)
+
+        # metrics
+        self._samples = 0
+        self._rounds = 0
+        self._runs = 0
+        self._refreshes = 0
+
+    # ----- state arrays -----
+    def _alloc(self, n_sats: int):
+        c = len(self.channels)
+        self._hist = np.zeros((n_sats, c, self.window))   # right-aligned, relative to _centre
+        self._qt = np.zeros((n_sats, c, self.n_slots))    # query . subsequence, per start slot
+        self._sq = np.zeros((n_sats, c, self.n_slots))    # |subsequence|^2
+        self._var_sum = np.zeros((n_sats, c))             # within-subsequence variances of the complete ones
+        self._centre = np.zeros((n_sats, c))
+        self._count = np.zeros((n_sats, c), dtype=np.int64)  # finite samples seen
+        self._fresh = np.zeros((n_sats, c), dtype=np.int64)  # samples since the last refresh
+
+    def _arrays(self) -> Tuple[np.ndarray, ...]:
+        return self._hist, self._qt, self._sq, self._var_sum, self._centre, self._count, self._fresh
+
+    def _grow(self, n_sats: int):
+        old = self._arrays()
+        self._alloc(n_sats)
+        for new, arr in zip(self._arrays(), old):
+            new[:arr.shape[0]] = arr
+
+    # ----- update -----
+    def update(self, satellite_ids: Sequence[str], features: np.ndarray) -> np.ndarray:
+        """
+        Apply N samples ((N, 15) features) in order and return the
+        (N, len(DISCORD_NAMES)) discord scores of the subsequences they end.
+        """
+        features = np.asarray(features, dtype=float).reshape(-1, N_FEATURES)
+        n = features.shape[0]
+        out = np.full((n, self.n_features), np.nan)
+        if n == 0:
+            return out
+        x = features[:, self.channels]
+
+        with self._lock:
+            sat = self._sats.rows(satellite_ids)
+
+            # long runs of one satellite: vectorized over time
+            stepped = np.ones(n, dtype=bool)
+            for idx in satellite_groups(sat):
+                if idx.size >= RUN_MIN_SAMPLES:
+                    out[idx] = self._run(int(sat[idx[0]]), x[idx])
+                    stepped[idx] = False
+                    self._runs += 1
+
+            # the rest in rounds, ordered by state row so that a whole fleet is one contiguous block
+            for idx in satellite_rounds(sat, np.flatnonzero(stepped)):
+                out[idx] = self._round(sat[idx], x[idx])
+                self._rounds += 1
+            self._samples += n
+        return out
+
+    def _round(self, rows: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """
+        One sample for each of `rows` (distinct satellites, ascending), x
+        (rows, channels). Updates the state in place when the rows are one
+        contiguous block, else through a gathered copy.
+        """
+        block = slice(int(rows[0]), int(rows[-1]) + 1)
+        if rows.size == block.stop - block.start:
+            return self._step(*(a[block] for a in self._arrays()), x)
+        lanes = [a[rows] for a in self._arrays()]
+        score = self._step(*lanes, x)
+        for a, lane in zip(self._arrays(), lanes):
+            a[rows] = lane
+        return score
+
+    def _step(self, hist, qt, sq, var_sum, centre, count, fresh, x: np.ndarray) -> np.ndarray:
+        """Apply x (lanes, channels) to the given lanes of state, in place; returns the scores."""
+        m, w = self.m, self.window
+        finite = np.isfinite(x)
+        nan = ~finite
+        if nan.any():  # a NaN sample leaves the channel as it was
+            saved = [a[nan].copy() for a in (hist, qt, sq)]
+
+        fill = (count == 0) & finite
+        centre[fill] = x[fill]
+        v = np.where(finite, x - centre, 0.0)
+        old_count = count.copy()
+        count += finite
+        fresh += finite
+
+        # STOMPI: remove the products of the two samples leaving every dot product,
+        # shift the window by one, then add the products of the two entering
+        buf = np.empty_like(qt)
+        np.multiply(hist[..., w - m, None], hist[..., :self.n_slots], out=buf)
+        qt -= buf
+        leaving_var = hist[..., :m].var(axis=-1)
+        hist[..., :-1] = hist[..., 1:]
+        hist[..., -1] = v
+        np.multiply(v[..., None], hist[..., m - 1:], out=buf)
+        qt += buf
+
+        query = hist[..., w - m:]
+        sq[..., :-1] = sq[..., 1:]
+        sq[..., -1] = np.einsum("...k,...k->...", query, query)
+        # the slot that left was complete once the window was full; the new one once m samples are in
+        var_sum += np.where(finite & (count >= m), query.var(axis=-1), 0.0)
+        var_sum -= np.where(finite & (old_count >= w), leaving_var, 0.0)
+
+        # exact recomputation every `refresh` samples
+        stale = fresh >= self.refresh
+        if stale.any():
+            hist[stale], qt[stale], sq[stale], var_sum[stale], shift = self._rebuild(hist[stale], count[stale])
+            centre[stale] += shift
+            fresh[stale] = 0
+            self._refreshes += int(stale.sum())
+
+        score = self._left_profile(qt, sq, var_sum, count, buf)
+        if nan.any():
+            hist[nan], qt[nan], sq[nan] = saved
+            score[nan] = np.nan
+        return score
+
+    def _left_profile(self, qt, sq, var_sum, count, buf: np.ndarray) -> np.ndarray:
+        """Scaled distance of the last slot to its nearest neighbour left of the exclusion zone."""
+        m, last = self.m, self.n_slots - 1
+        left = last - self.exclusion + 1
+        d2 = buf[..., :left]
+        np.multiply(qt[..., :left], -2.0, out=d2)
+        d2 += sq[..., :left]
+        d2 += sq[..., last, None]
+        # slots before the first complete subsequence hold zero padding
+        short = count < self.window
+        if short.any():
+            first = self.window - count[short]
+            d2[short] = np.where(np.arange(left) < first[:, None], np.inf, d2[short])
+        nearest = np.sqrt(np.maximum(d2.min(axis=-1), 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            noise = var_sum / (np.minimum(count, self.window) - m + 1)
+        score = nearest / np.sqrt(2.0 * m * np.maximum(noise, MIN_NOISE_STD ** 2))
+        score[count < self.min_samples] = np.nan
+        return score
+
+    def _rebuild(self, hist: np.ndarray, count: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Re-centred window, exact QT (FFT), |s|^2 and variance sum of lanes
+        hist (lanes, W) with `count` samples, plus the centre shift.
+        """
+        m, w = self.m, self.window
+        first = w - np.minimum(count, w)
+        valid = np.arange(w) >= first[:, None]
+        shift = np.where(valid, hist, 0.0).sum(axis=1) / np.maximum(np.minimum(count, w), 1)
+        hist = np.where(valid, hist - shift[:, None], 0.0)
+        qt = sliding_dot_product(hist[:, w - m:], hist)
+        sq, var = sliding_moments(hist, m)
+        var_sum = np.where(np.arange(self.n_slots) >= first[:, None], var, 0.0).sum(axis=1)
+        return hist, qt, sq, var_sum, shift
+
+    def _run(self, row: int, x: np.ndarray) -> np.ndarray:
+        """
+        All samples x (k, channels) of one satellite at once. NaN samples
+        are skipped per channel, as in _step.
+        """
+        out = np.full(x.shape, np.nan)
+        for c in range(x.shape[1]):
+            finite = np.flatnonzero(np.isfinite(x[:, c]))
+            if finite.size:
+                out[finite, c] = self._run_channel(row, c, x[finite, c])
+        return out
+
+    def _run_channel(self, row: int, c: int, x: np.ndarray) -> np.ndarray:
+        m, w, excl = self.m, self.window, self.exclusion
+        k = x.size
+        count = int(self._count[row, c])
+        if count == 0:
+            self._centre[row, c] = x[0]
+        # the series: current window, then the run; complete from position w - count
+        e = np.concatenate([self._hist[row, c], x - self._centre[row, c]])
+        first = w - min(count, w)
+        sq, var = sliding_moments(e, m)
+        var_cum = np.r_[0.0, np.cumsum(np.where(np.arange(var.size) >= first, var, 0.0))]
+
+        out = np.empty(k)
+        lags = np.arange(w - m, excl - 1, -1)  # column j is lag w - m - j
+        past = np.lib.stride_tricks.sliding_window_view(e, lags.size)
+        for lo in range(0, k, RUN_CHUNK):
+            hi = min(k, lo + RUN_CHUNK)
+            # sample i ends the query starting at q = w + i - m + 1, whose dot products
+            # are sums of e[u] * e[u - lag] over u in [q, q + m - 1]
+            u = np.arange(w - m + 1 + lo, w + hi)
+            cum = np.zeros((u.size + 1, lags.size))
+            np.cumsum(e[u, None] * past[u - (w - m)], axis=0, out=cum[1:])
+            qt = cum[m:] - cum[:-m]                     # (hi - lo, lags): query . subsequence at q - lag
+            q = np.arange(w + lo - m + 1, w + hi - m + 1)
+            starts = q[:, None] - lags
+            d2 = sq[q, None] + sq[starts] - 2.0 * qt
+            d2[starts < first] = np.inf
+            # noise level of the window ending at each sample: complete slots in [q - (w - m), q]
+            lo_slot = np.maximum(first, q - (w - m))
+            noise = (var_cum[q + 1] - var_cum[lo_slot]) / np.maximum(q + 1 - lo_slot, 1)
+            nearest = np.sqrt(np.maximum(d2.min(axis=1), 0.0))
+            out[lo:hi] = nearest / np.sqrt(2.0 * m * np.maximum(noise, MIN_NOISE_STD ** 2))
+        out[count + np.arange(1, k + 1) < self.min_samples] = np.nan
+
+        # the state after the run, rebuilt as on a refresh
+        total = np.array([count + k])
+        hist, qt, sq, var_sum, shift = self._rebuild(e[None, -w:], total)
+        self._hist[row, c], self._qt[row, c], self._sq[row, c] = hist[0], qt[0], sq[0]
+        self._var_sum[row, c] = var_sum[0]
+        self._centre[row, c] += shift[0]
+        self._count[row, c] = total[0]
+        self._fresh[row, c] = 0
+        self._refreshes += 1
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "satellites": len(self._sats),
+                "channels": [FEATURE_FIELDS[c] for c in self.channels],
+                "window": self.window,
+                "subsequence": self.m,
+                "samples": self._samples,
+                "rounds": self._rounds,
+                "runs": self._runs,
+                "refreshes": self._refreshes,
+                "bytes": sum(a.nbytes for a in self._arrays()),
+            }
+
+
+# Shared discord state updated by the ingest routes
+comms_discords = MatrixProfileDiscords()
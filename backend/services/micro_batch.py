@@ -0,0 +1,163 @@
+# backend/services/micro_batch.py
+"""
+Dynamic micro-batching for per-request work on the event loop: concurrent
+submit() calls are collected until `max_batch` items wait or the oldest has
+waited `max_wait_ms`, then `process(items)` runs once for all of them.
+Everything runs on the loop thread, so the queue needs no locks.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from backend.core.config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS
+from backend.core.logger import logger
+
+# histogram bucket upper bounds; the last bucket is everything above
+WAIT_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    """Counts per bucket (upper bounds inclusive, plus an overflow bucket), sum, count and max."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = np.asarray(bounds, dtype=float)
+        self.counts = np.zeros(self.bounds.size + 1, dtype=np.int64)
+        self.total = 0.0
+        self.n = 0
+        self.max = 0.0
+
+    def add(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float).reshape(-1)
+        self.counts += np.bincount(np.searchsorted(self.bounds, values, side="left"), minlength=self.counts.size)
+        self.total += float(values.sum())
+        self.n += values.size
+        self.max = max(self.max, float(values.max(initial=0.0)))
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the max in the overflow bucket)."""
+        if not self.n:
+            return 0.0
+        i = int(np.searchsorted(np.cumsum(self.counts), q * self.n, side="left"))
+        return float(self.bounds[i]) if i < self.bounds.size else self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b:g}" for b in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "buckets": dict(zip(labels, self.counts.tolist())),
+            "count": self.n,
+            "sum": self.total,
+            "mean": self.total / self.n if self.n else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class _Pending:
+    def __init__(self):
+        self.items: List[Any] = []
+        self.futures: List[asyncio.Future] = []
+        self.enqueued: List[float] = []
+        self.timer = None
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        process: Callable[[List[Any]], List[Any]],
+        max_batch: int = MICRO_BATCH_MAX_SIZE,
+        max_wait_ms: float = MICRO_BATCH_MAX_WAIT_MS,
+        name: str = "micro-batch",
+    ):
+        if max_batch < 1 or max_wait_ms < 0:
+            raise ValueError("max_batch must be >= 1 and max_wait_ms >= 0")
+        self.process = process
+        self.max_batch = int(max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._pending: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+        # metrics (read from other threads by stats())
+        self._lock = threading.Lock()
+        sizes = [2 ** i for i in range(self.max_batch.bit_length()) if 2 ** i < self.max_batch]
+        self._batch_sizes = Histogram(sizes + [self.max_batch])
+        self._waits_ms = Histogram(WAIT_BUCKETS_MS)
+        self._full_flushes = 0
+        self._timed_flushes = 0
+        self._failures = 0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue one item and wait for its entry of `process`'s result. An entry
+        that is an exception is raised here only; if `process` itself raises,
+        every item of the batch gets that exception.
+        """
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(loop)
+        if pending is None:
+            pending = self._pending[loop] = _Pending()
+
+        fut = loop.create_future()
+        pending.items.append(item)
+        pending.futures.append(fut)
+        pending.enqueued.append(time.perf_counter())
+        if len(pending.items) >= self.max_batch:
+            self._flush(pending, full=True)
+        elif pending.timer is None:
+            pending.timer = loop.call_later(self.max_wait, self._flush, pending, False)
+        return await fut
+
+    def _flush(self, pending: _Pending, full: bool):
+        if pending.timer is not None:
+            pending.timer.cancel()
+            pending.timer = None
+        items, futures, enqueued = pending.items, pending.futures, pending.enqueued
+        pending.items, pending.futures, pending.enqueued = [], [], []
+        if not items:
+            return
+
+        start = time.perf_counter()
+        try:
+            results = self.process(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.error(f"{self.name} batch of {len(items)} failed: {e}")
+            results = [e] * len(items)
+            with self._lock:
+                self._failures += 1
+
+        for fut, res in zip(futures, results):
+            if fut.done():  # the request was cancelled meanwhile
+                continue
+            if isinstance(res, BaseException):
+                fut.set_exception(res)
+            else:
+                fut.set_result(res)
+
+        with self._lock:
+            self._batch_sizes.add([len(items)])
+            self._waits_ms.add((start - np.asarray(enqueued)) * 1000.0)
+            if full:
+                self._full_flushes += 1
+            else:
+                self._timed_flushes += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self._batch_sizes.n,
+                "items": int(self._batch_sizes.total),
+                "full_flushes": self._full_flushes,
+                "timed_flushes": self._timed_flushes,
+                "failures": self._failures,
+                "batch_size": self._batch_sizes.to_dict(),
+                "queue_wait_ms": self._waits_ms.to_dict(),
+            }
@@ -0,0 +1,662 @@
+# backend/services/partitions.py
+"""
+Time-partitioned storage of anomaly events: one partition per UTC day
+(SQLite shard file or PostgreSQL table), archived to compressed columnar
+files after ANOMALY_RETENTION_DAYS. See docs/internals.md.
+"""
+
+import fcntl
+import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Float, Identity, Index, Integer, MetaData, String, Table,
+    delete, func, inspect, select, text, tuple_,
+)
+from sqlalchemy.schema import CreateIndex, CreateTable, DropTable
+
+from backend.core.config import (
+    ANOMALY_PARTITION_DIR,
+    ANOMALY_ARCHIVE_DIR,
+    ANOMALY_ARCHIVE_FORMAT,
+    ANOMALY_RETENTION_DAYS,
+    ANOMALY_RETENTION_INTERVAL_S,
+)
+from backend.core.database import engine as main_engine, make_engine, bulk_insert
+from backend.core.logger import logger
+from backend.core.models import AnomalyEvent
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+EPOCH = date(1970, 1, 1)
+ID_BITS = 32
+QUIET_S = 60            # don't archive a shard written to this recently
+MIGRATE_CHUNK = 20000
+ARCHIVE_CACHE_SIZE = 4  # decoded archive days kept in memory
+
+_SHARD = re.compile(r"^anomalies-(\d{4}-\d{2}-\d{2})\.db$")
+_TABLE = re.compile(r"^anomalies_p(\d{8})$")
+_ARCHIVE = re.compile(r"^anomalies-(\d{4}-\d{2}-\d{2})\.(parquet|npz)$")
+
+COLUMNS = ("id", "timestamp", "satellite_id", "severity", "issues", "score")
+
+
+class PartitionWriteError(Exception):
+    """Some day partitions could not be written; `remaining` holds their rows."""
+
+    def __init__(self, remaining: List[Dict[str, Any]], cause: Exception):
+        super().__init__(f"{len(remaining)} rows not written: {cause}")
+        self.remaining = remaining
+
+
+def day_of(ts: datetime) -> int:
+    """Days since 1970-01-01 of a naive UTC datetime."""
+    return (ts.date() - EPOCH).days
+
+
+def _day_str(day: int) -> str:
+    return (EPOCH + timedelta(days=day)).isoformat()
+
+
+def _parse_day(s: str) -> int:
+    return (date.fromisoformat(s) - EPOCH).days
+
+
+def _partition_table(name: str, start: int) -> Table:
+    # same columns and keyset indexes as AnomalyEvent, ids starting at `start`
+    return Table(
+        name,
+        MetaData(),
+        Column("id", BigInteger().with_variant(Integer, "sqlite"), Identity(start=start), primary_key=True),
+        Column("satellite_id", String),
+        Column("severity", String),
+        Column("issue", String, key="issues"),
+        Column("score", Float),
+        Column("timestamp", DateTime),
+        Index(f"ix_{name}_ts_id", "timestamp", "id"),
+        Index(f"ix_{name}_sat_ts_id", "satellite_id", "timestamp", "id"),
+        Index(f"ix_{name}_sev_ts_id", "severity", "timestamp", "id"),
+        sqlite_autoincrement=True,
+    )
+
+
+class _ShardMoved(Exception):
+    """The shard file was archived and moved aside while this engine had it open."""
+
+
+class _Partition:
+    def __init__(self, day: int, engine, table: Table, path: Optional[str] = None):
+        self.day = day
+        self.engine = engine
+        self.table = table
+        self.path = path  # shard file (SQLite only)
+        self.inode: Optional[int] = None  # of the file `engine` opened (SQLite only)
+
+
+# ----- archive files -----
+def _rows_to_columns(rows) -> Dict[str, np.ndarray]:
+    rows = list(rows)
+    return {
+        "id": np.array([r.id for r in rows], dtype=np.int64),
+        "timestamp": np.array([r.timestamp for r in rows], dtype="datetime64[us]").view(np.int64),
+        "satellite_id": np.array([r.satellite_id or "" for r in rows], dtype=str),
+        "severity": np.array([r.severity or "" for r in rows], dtype=str),
+        "issues": np.array([r.issues or "" for r in rows], dtype=str),
+        "score": np.array([r.score if r.score is not None else np.nan for r in rows], dtype=float),
+    }
+
+
+def _write_archive(base: str, cols: Dict[str, np.ndarray], fmt: str) -> str:
+    path = f"{base}.{fmt}"
+    tmp = path + ".tmp"
+    if fmt == "parquet":
+        table = pa.table({
+            "id": pa.array(cols["id"]),
+            "timestamp": pa.array(cols["timestamp"].view("datetime64[us]")),
+            "satellite_id": pa.array(cols["satellite_id"].tolist(), pa.string()),
+            "severity": pa.array(cols["severity"].tolist(), pa.string()),
+            "issues": pa.array(cols["issues"].tolist(), pa.string()),
+            "score": pa.array(cols["score"]),
+        })
+        pq.write_table(table, tmp, compression="zstd")
+    else:
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **cols)
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def _read_archive(path: str) -> Dict[str, np.ndarray]:
+    if path.endswith(".parquet"):
+        table = pq.read_table(path)
+        return {
+            "id": table["id"].to_numpy().astype(np.int64),
+            "timestamp": table["timestamp"].to_numpy().astype("datetime64[us]").view(np.int64),
+            "satellite_id": np.array(table["satellite_id"].to_pylist(), dtype=str),
+            "severity": np.array(table["severity"].to_pylist(), dtype=str),
+            "issues": np.array(table["issues"].to_pylist(), dtype=str),
+            "score": table["score"].to_numpy().astype(float),
+        }
+    with np.load(path, allow_pickle=False) as z:
+        return {name: z[name] for name in COLUMNS}
+
+
+def _columns(table: Table):
+    # the old AnomalyEvent table names its issues column "issue"; partitions key it "issues"
+    issues = table.c.issues if "issues" in table.c else table.c.issue
+    return (table.c.id, table.c.timestamp, table.c.satellite_id, table.c.severity,
+            issues.label("issues"), table.c.score), issues
+
+
+def _us(ts: datetime) -> int:
+    return int(np.datetime64(ts, "us").view(np.int64))
+
+
+class PartitionedAnomalyStore:
+    def __init__(
+        self,
+        engine=main_engine,
+        partition_dir: str = ANOMALY_PARTITION_DIR,
+        archive_dir: str = ANOMALY_ARCHIVE_DIR,
+        retention_days: int = ANOMALY_RETENTION_DAYS,
+        archive_format: str = ANOMALY_ARCHIVE_FORMAT,
+        legacy_table: Table = AnomalyEvent.__table__,
+    ):
+        self.engine = engine
+        self.sharded = engine.dialect.name == "sqlite"
+        self.partition_dir = os.path.abspath(partition_dir)
+        self.archive_dir = os.path.abspath(archive_dir)
+        self.retention_days = retention_days
+        if archive_format == "auto":
+            archive_format = "parquet" if pq is not None else "npz"
+        if archive_format == "parquet" and pq is None:
+            raise RuntimeError("ANOMALY_ARCHIVE_FORMAT=parquet needs pyarrow")
+        self.archive_format = archive_format
+        self.legacy = legacy_table
+
+        self._lock = threading.Lock()
+        self._partitions: Dict[int, _Partition] = {}
+        self._archive_cache: "OrderedDict[Tuple[str, float], Dict[str, np.ndarray]]" = OrderedDict()
+        self._legacy_pending = True  # cleared once the old table is known to be empty
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # metrics
+        self._rows_written = 0
+        self._archived_days = 0
+        self._migrated_rows = 0
+
+        if self.sharded:
+            os.makedirs(self.partition_dir, exist_ok=True)
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+    # ----- partitions -----
+    def _open(self, day: int) -> _Partition:
+        part = self._partitions.get(day)
+        if part is not None and self._current(part):
+            return part
+        if part is not None:  # archived and moved aside by another worker
+            self._forget(part)
+        # late events for an archived day continue after its archived ids
+        start = day << ID_BITS
+        archived = self.archive_days().get(day)
+        if archived is not None:
+            start = max(start, int(self._load_archive(archived)["id"].max(initial=start - 1)) + 1)
+        with self._lock:
+            part = self._partitions.get(day)
+            if part is not None:
+                return part
+            if self.sharded:
+                path = os.path.join(self.partition_dir, f"anomalies-{_day_str(day)}.db")
+                eng = make_engine(f"sqlite:///{path}")
+                part = _Partition(day, eng, _partition_table("anomalies", start), path)
+            else:
+                name = f"anomalies_p{_day_str(day).replace('-', '')}"
+                part = _Partition(day, self.engine, _partition_table(name, start))
+            self._create(part, start)
+            if self.sharded:
+                part.inode = os.stat(part.path).st_ino
+            self._partitions[day] = part
+            return part
+
+    def _current(self, part: _Partition) -> bool:
+        """False once the shard file `part` opened is no longer the one at its path."""
+        if not self.sharded:
+            return True
+        try:
+            return os.stat(part.path).st_ino == part.inode
+        except FileNotFoundError:
+            return False
+
+    def _forget(self, part: _Partition):
+        with self._lock:
+            if self._partitions.get(part.day) is part:
+                del self._partitions[part.day]
+        if self.sharded:
+            part.engine.dispose()
+
+    def _lock_shard(self, conn, part: _Partition, mode: str = "IMMEDIATE"):
+        """
+        Take the shard's write lock, then make sure the file is still the
+        live one: archive_day() moves a shard aside while holding this lock,
+        so a writer that was waiting for it must not insert into the old file.
+        """
+        conn.exec_driver_sql(f"BEGIN {mode}")
+        if not self._current(part):
+            raise _ShardMoved(part.path)
+
+    def _write_partition(self, day: int, write):
+        """Run write(conn, part) in one transaction on the day's partition, reopening a moved shard once."""
+        for attempt in range(2):
+            part = self._open(day)
+            try:
+                with part.engine.begin() as conn:
+                    if self.sharded:
+                        self._lock_shard(conn, part)
+                    write(conn, part)
+                return
+            except _ShardMoved:
+                self._forget(part)
+                if attempt:
+                    raise
+
+    def _create(self, part: _Partition, start: int):
+        # IF NOT EXISTS: other workers may create the same partition concurrently
+        with part.engine.begin() as conn:
+            conn.execute(CreateTable(part.table, if_not_exists=True))
+            for index in part.table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+            if self.sharded:
+                conn.execute(
+                    text(
+                        "INSERT INTO sqlite_sequence (name, seq) SELECT :name, :seq "
+                        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)"
+                    ),
+                    {"name": part.table.name, "seq": start - 1},
+                )
+
+    def hot_days(self) -> List[int]:
+        if self.sharded:
+            names = os.listdir(self.partition_dir)
+            days = [_parse_day(m.group(1)) for m in map(_SHARD.match, names) if m]
+        else:
+            names = inspect(self.engine).get_table_names()
+            days = [
+                _parse_day(f"{s[:4]}-{s[4:6]}-{s[6:]}")
+                for s in (m.group(1) for m in map(_TABLE.match, names) if m)
+            ]
+        return sorted(days)
+
+    def archive_days(self) -> Dict[int, str]:
+        out = {}
+        for f in os.listdir(self.archive_dir):
+            m = _ARCHIVE.match(f)
+            if m:
+                out[_parse_day(m.group(1))] = os.path.join(self.archive_dir, f)
+        return out
+
+    @staticmethod
+    def _move_aside(part: _Partition) -> str:
+        """Rename a shard and its WAL files out of the partition namespace (caller holds its lock)."""
+        aside = part.path[:-len(".db")] + ".archived.db"
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.replace(part.path + suffix, aside + suffix)
+            except FileNotFoundError:
+                pass
+        return aside
+
+    @staticmethod
+    def _remove_shard_files(path: str):
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+
+    # ----- writes -----
+    def write(self, rows: List[Dict[str, Any]]):
+        """
+        Insert AnomalyEvent column dicts, one transaction per day partition.
+        Raises PartitionWriteError with the rows of the days that failed.
+        """
+        by_day: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for r in rows:
+            by_day[day_of(r["timestamp"])].append(r)
+
+        failed: List[Dict[str, Any]] = []
+        error = None
+        for day, chunk in by_day.items():
+            try:
+                self._write_partition(day, lambda conn, part: bulk_insert(conn, part.table, chunk))
+            except Exception as e:
+                failed.extend(chunk)
+                error = e
+                # the partition may have been dropped by another worker; re-create on retry
+                stale = self._partitions.get(day)
+                if stale is not None:
+                    self._forget(stale)
+        with self._lock:
+            self._rows_written += len(rows) - len(failed)
+        if failed:
+            raise PartitionWriteError(failed, error)
+
+    # ----- reads -----
+    def _select(self, table: Table, limit: int, before, satellite_id, severity, issue, t_from, t_to):
+        columns, issues = _columns(table)
+        q = select(*columns)
+        if satellite_id is not None:
+            q = q.where(table.c.satellite_id == satellite_id)
+        if severity is not None:
+            q = q.where(table.c.severity == severity)
+        if issue is not None:
+            literal = issue.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            q = q.where(("," + issues + ",").like(f"%,{literal},%", escape="\\"))
+        if t_from is not None:
+            q = q.where(table.c.timestamp >= t_from)
+        if t_to is not None:
+            q = q.where(table.c.timestamp < t_to)
+        if before is not None:
+            q = q.where(tuple_(table.c.timestamp, table.c.id) < tuple_(*before))
+        return q.order_by(table.c.timestamp.desc(), table.c.id.desc()).limit(limit)
+
+    def _load_archive(self, path: str) -> Dict[str, np.ndarray]:
+        key = (path, os.path.getmtime(path))
+        with self._lock:
+            cols = self._archive_cache.get(key)
+            if cols is not None:
+                self._archive_cache.move_to_end(key)
+                return cols
+        cols = _read_archive(path)
+        with self._lock:
+            self._archive_cache[key] = cols
+            while len(self._archive_cache) > ARCHIVE_CACHE_SIZE:
+                self._archive_cache.popitem(last=False)
+        return cols
+
+    def _query_archive(self, path, limit, before, satellite_id, severity, issue, t_from, t_to):
+        cols = self._load_archive(path)
+        ts, ids = cols["timestamp"], cols["id"]
+        mask = np.ones(len(ids), dtype=bool)
+        if satellite_id is not None:
+            mask &= cols["satellite_id"] == satellite_id
+        if severity is not None:
+            mask &= cols["severity"] == severity
+        if issue is not None:
+            mask &= np.char.find(np.char.add(np.char.add(",", cols["issues"]), ","), f",{issue},") >= 0
+        if t_from is not None:
+            mask &= ts >= _us(t_from)
+        if t_to is not None:
+            mask &= ts < _us(t_to)
+        if before is not None:
+            b_ts, b_id = _us(before[0]), before[1]
+            mask &= (ts < b_ts) | ((ts == b_ts) & (ids < b_id))
+        sel = np.nonzero(mask)[0]
+        sel = sel[np.lexsort((-ids[sel], -ts[sel]))][:limit]
+        return [
+            {
+                "id": int(ids[i]),
+                "timestamp": datetime.fromtimestamp(ts[i] / 1e6, tz=timezone.utc).replace(tzinfo=None),
+                "satellite_id": str(cols["satellite_id"][i]),
+                "severity": str(cols["severity"][i]),
+                "issues": str(cols["issues"][i]),
+                "score": None if np.isnan(cols["score"][i]) else float(cols["score"][i]),  # NULL in the partition
+            }
+            for i in sel.tolist()
+        ]
+
+    def history(
+        self,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None,
+        satellite_id: Optional[str] = None,
+        severity: Optional[str] = None,
+        issue: Optional[str] = None,
+        t_from: Optional[datetime] = None,
+        t_to: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Up to `limit` events, newest first by (timestamp, id), strictly below
+        `before` when given, with naive-UTC `t_from` <= timestamp < `t_to`.
+        Only the partitions/archives of days inside the range are touched.
+        """
+        filters = (before, satellite_id, severity, issue, t_from, t_to)
+        hot = set(self.hot_days())
+        archives = self.archive_days()
+        lo = day_of(t_from) if t_from is not None else None
+        hi = day_of(t_to - timedelta(microseconds=1)) if t_to is not None else None
+        if before is not None:
+            hi = day_of(before[0]) if hi is None else min(hi, day_of(before[0]))
+
+        out: List[Dict[str, Any]] = []
+        for day in sorted(hot | set(archives), reverse=True):
+            if (hi is not None and day > hi) or (lo is not None and day < lo):
+                continue
+            need = limit - len(out)
+            if need <= 0:
+                break
+            rows = []
+            if day in hot:
+                part = self._open(day)
+                with part.engine.connect() as conn:
+                    rows = [r._asdict() for r in conn.execute(self._select(part.table, need, *filters))]
+            if day in archives:
+                # late events for an archived day, or an archive being written: merge both
+                seen = {r["id"] for r in rows}
+                extra = [r for r in self._query_archive(archives[day], need, *filters) if r["id"] not in seen]
+                if extra:
+                    rows = sorted(rows + extra, key=lambda r: (r["timestamp"], r["id"]), reverse=True)[:need]
+            out.extend(rows)
+
+        if self._legacy_pending:
+            with self.engine.connect() as conn:
+                legacy = [r._asdict() for r in conn.execute(self._select(self.legacy, limit, *filters))]
+            if legacy:
+                out = sorted(out + legacy, key=lambda r: (r["timestamp"], r["id"]), reverse=True)[:limit]
+        return out
+
+    # ----- rollup backfill -----
+    def snapshot(self) -> Dict[Any, int]:
+        """Max id per hot partition (and of the old table): the rows a backfill should read."""
+        snap: Dict[Any, int] = {}
+        for day in self.hot_days():
+            part = self._open(day)
+            with part.engine.connect() as conn:
+                snap[day] = conn.execute(select(func.max(part.table.c.id))).scalar() or 0
+        with self.engine.connect() as conn:
+            snap["legacy"] = conn.execute(select(func.max(self.legacy.c.id))).scalar() or 0
+        return snap
+
+    def iter_columns(self, since: datetime, snapshot: Dict[Any, int], chunk: int = 20000) -> Iterator[Dict[str, np.ndarray]]:
+        """Column chunks of every event at or after `since` that `snapshot` covers."""
+        for day, path in sorted(self.archive_days().items()):
+            if day < day_of(since) or day in snapshot:
+                continue  # hot in the snapshot: read from the partition below
+            cols = self._load_archive(path)
+            keep = cols["timestamp"] >= _us(since)
+            yield {k: v[keep] for k, v in cols.items()}
+
+        days = sorted(k for k in snapshot if k != "legacy" and k >= day_of(since))
+        sources = [(self._open(d).engine, self._open(d).table, snapshot[d]) for d in days]
+        sources.append((self.engine, self.legacy, snapshot.get("legacy", 0)))
+        for eng, table, max_id in sources:
+            if not max_id:
+                continue
+            q = (select(*_columns(table)[0])
+                 .where(table.c.timestamp >= since, table.c.id <= max_id))
+            with eng.connect() as conn:
+                result = conn.execution_options(yield_per=chunk).execute(q)
+                for rows in result.partitions(chunk):
+                    yield _rows_to_columns(rows)
+
+    # ----- retention -----
+    def migrate_legacy(self) -> int:
+        """Move rows of the old unpartitioned table into day partitions, keeping ids."""
+        moved = 0
+        t = self.legacy
+        while not self._stop.is_set():
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    select(*_columns(t)[0]).order_by(t.c.id).limit(MIGRATE_CHUNK)
+                ).fetchall()
+            if not rows:
+                self._legacy_pending = False
+                break
+            by_day: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+            for r in rows:
+                # timestamp defaults to utcnow, so it is only NULL if written by hand
+                by_day[day_of(r.timestamp or datetime.utcnow())].append(r._asdict())
+            for day, chunk in by_day.items():
+                def move(conn, part, chunk=chunk):
+                    # delete first so a rerun after a crash does not duplicate rows
+                    conn.execute(delete(part.table).where(part.table.c.id.in_([r["id"] for r in chunk])))
+                    bulk_insert(conn, part.table, chunk)
+                self._write_partition(day, move)
+            with self.engine.begin() as conn:
+                conn.execute(delete(t).where(t.c.id <= rows[-1].id))
+            moved += len(rows)
+        with self._lock:
+            self._migrated_rows += moved
+        if moved:
+            logger.info(f"Moved {moved} anomaly events from '{t.name}' into day partitions")
+        return moved
+
+    def archive_day(self, day: int) -> Optional[str]:
+        """
+        Write a hot partition to its archive file (merging an existing one),
+        then drop it, all under one lock: a PostgreSQL table stays locked
+        from the read to the DROP; a SQLite shard is read under BEGIN
+        EXCLUSIVE and moved aside before the lock is released. A concurrent
+        insert waits, sees the partition gone and lands in a new one.
+        Returns the archive path, None if the day is no longer hot.
+        """
+        part = self._open(day)
+        t = part.table
+        aside = None
+        with part.engine.begin() as conn:
+            if self.sharded:
+                try:
+                    self._lock_shard(conn, part, "EXCLUSIVE")
+                except _ShardMoved:
+                    return None
+            else:
+                conn.execute(text(f"LOCK TABLE {conn.dialect.identifier_preparer.quote(t.name)} IN ACCESS EXCLUSIVE MODE"))
+            rows = conn.execute(
+                select(*_columns(t)[0]).order_by(t.c.timestamp, t.c.id)
+            ).fetchall()
+            path, n = self._write_day_archive(day, rows)
+            if self.sharded:
+                aside = self._move_aside(part)
+            else:
+                conn.execute(DropTable(t, if_exists=True))
+
+        self._forget(part)
+        if aside is not None:
+            self._remove_shard_files(aside)
+        with self._lock:
+            self._archived_days += 1
+        logger.info(f"Archived {n} anomaly events of {_day_str(day)} to {path}")
+        return path
+
+    def _write_day_archive(self, day: int, rows) -> Tuple[str, int]:
+        cols = _rows_to_columns(rows)
+
+        existing = self.archive_days().get(day)
+        if existing is not None:  # late events for an archived day
+            old = _read_archive(existing)
+            fresh = ~np.isin(old["id"], cols["id"])
+            cols = {k: np.concatenate([old[k][fresh], cols[k]]) for k in COLUMNS}
+            order = np.lexsort((cols["id"], cols["timestamp"]))
+            cols = {k: v[order] for k, v in cols.items()}
+
+        base = os.path.join(self.archive_dir, f"anomalies-{_day_str(day)}")
+        path = _write_archive(base, cols, self.archive_format)
+        if existing is not None and existing != path:
+            os.remove(existing)
+        return path, len(cols["id"])
+
+    def _quiet(self, day: int) -> bool:
+        if not self.sharded:
+            return True
+        path = os.path.join(self.partition_dir, f"anomalies-{_day_str(day)}.db")
+        mtimes = [os.path.getmtime(p) for p in (path, path + "-wal") if os.path.exists(p)]
+        return not mtimes or datetime.now().timestamp() - max(mtimes) > QUIET_S
+
+    def run_retention(self, now: Optional[datetime] = None) -> int:
+        """
+        One maintenance pass: migrate the old table, then archive every
+        partition older than the retention period. Skipped if another
+        process is running one. Returns the number of archived days.
+        """
+        lock_fd = os.open(os.path.join(self.archive_dir, ".retention.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+            if self._legacy_pending:
+                self.migrate_legacy()
+            cutoff = day_of(now or datetime.utcnow()) - self.retention_days
+            archived = 0
+            for day in self.hot_days():
+                if self._stop.is_set():
+                    break
+                if day < cutoff and self._quiet(day) and self.archive_day(day):
+                    archived += 1
+            return archived
+        finally:
+            os.close(lock_fd)  # releases the flock
+
+    def start_maintenance(self, wait_for: Optional[threading.Thread] = None,
+                          interval_s: float = ANOMALY_RETENTION_INTERVAL_S) -> threading.Thread:
+        """Run run_retention() every `interval_s` in a background thread (after `wait_for` ends)."""
+        def loop():
+            if wait_for is not None:
+                wait_for.join()
+            while not self._stop.is_set():
+                try:
+                    self.run_retention()
+                except Exception as e:
+                    logger.error(f"Anomaly retention pass failed: {e}")
+                self._stop.wait(interval_s)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="anomaly-retention", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop_maintenance(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def stats(self) -> Dict[str, Any]:
+        hot = self.hot_days()
+        archives = self.archive_days()
+        return {
+            "backend": "sqlite-shards" if self.sharded else "tables",
+            "hot_partitions": len(hot),
+            "oldest_hot_day": _day_str(hot[0]) if hot else None,
+            "archived_days": len(archives),
+            "archive_bytes": sum(os.path.getsize(p) for p in archives.values()),
+            "archive_format": self.archive_format,
+            "retention_days": self.retention_days,
+            "rows_written": self._rows_written,
+            "migrated_rows": self._migrated_rows,
+            "legacy_pending": self._legacy_pending,
+        }
+
+
+# Shared store: the event writer inserts through it, /anomalies/history reads through it
+anomaly_store = PartitionedAnomalyStore()
@@ -0,0 +1,283 @@
+# backend/services/persistence.py
+"""
+Write-behind persistence for AnomalyEvent rows: ingest enqueues and returns,
+a background thread writes group commits of `batch_size` rows (or after
+`flush_interval_ms`), and rows the store keeps rejecting are spilled to
+disk and replayed until written.
+"""
+
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from backend.core.config import (
+    PERSIST_BATCH_SIZE,
+    PERSIST_FLUSH_INTERVAL_MS,
+    PERSIST_QUEUE_MAX,
+    PERSIST_SPILL_DIR,
+    PERSIST_REPLAY_INTERVAL_S,
+)
+from backend.services.partitions import anomaly_store, PartitionWriteError
+from backend.core.logger import logger
+
+_STOP = object()
+
+
+class PersistenceQueueFull(Exception):
+    """Raised when the write-behind queue cannot take more rows."""
+
+
+class EventWriter:
+    def __init__(
+        self,
+        store=anomaly_store,
+        batch_size: int = PERSIST_BATCH_SIZE,
+        flush_interval_ms: float = PERSIST_FLUSH_INTERVAL_MS,
+        max_queue: int = PERSIST_QUEUE_MAX,
+        max_retries: int = 3,
+        spill_dir: str = PERSIST_SPILL_DIR,
+        replay_interval_s: float = PERSIST_REPLAY_INTERVAL_S,
+    ):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.spill_dir = spill_dir
+        self.replay_interval = replay_interval_s
+
+        # queue items are lists of rows, so a batch request costs one put()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pending = 0  # rows enqueued but not yet written
+        self._flush_listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self._unspilled: List[Dict[str, Any]] = []  # rows the spill file could not take either
+        self._next_replay = 0.0  # monotonic; 0 = replay leftovers of a previous run first
+
+        # metrics
+        self._flushes = 0
+        self._rows_written = 0
+        self._rows_spilled = 0
+        self._rows_replayed = 0
+        self._last_flush_size = 0
+        self._flush_ms = deque(maxlen=1024)
+
+    # ----- lifecycle -----
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Flush every queued row, then stop the writer thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        logger.info(f"Event writer stopped ({self._rows_written} rows written)")
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything enqueued so far is committed (or timeout)."""
+        deadline = time.monotonic() + timeout
+        while self._pending > 0:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def add_flush_listener(self, fn: Callable[[List[Dict[str, Any]]], None]):
+        """Call fn(rows) on the writer thread after each flush (committed or spilled)."""
+        self._flush_listeners.append(fn)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    # ----- producer side -----
+    def submit(self, rows: List[Dict[str, Any]]):
+        """Enqueue AnomalyEvent column dicts for persistence."""
+        if not rows:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        with self._lock:
+            if self._pending + len(rows) > self.max_queue:
+                raise PersistenceQueueFull(
+                    f"persistence queue full ({self._pending} rows pending)"
+                )
+            self._pending += len(rows)
+        self._queue.put(rows)
+
+    # ----- writer thread -----
+    def _run(self):
+        buffer: List[Dict[str, Any]] = []
+        deadline = None
+        stopping = False
+
+        while True:
+            if self._next_replay <= time.monotonic() and not buffer:
+                self._replay()
+            wake = deadline if deadline is not None else self._next_replay if self._spilled() else None
+            timeout = None if wake is None else max(0.0, wake - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+            elif item is not None:
+                if not buffer:
+                    deadline = time.monotonic() + self.flush_interval
+                buffer.extend(item)
+
+            # drain whatever else is already waiting without blocking
+            while not stopping and len(buffer) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    buffer.extend(item)
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if buffer and (len(buffer) >= self.batch_size or due or stopping):
+                while buffer:
+                    chunk, buffer = buffer[:self.batch_size], buffer[self.batch_size:]
+                    self._write(chunk)
+                deadline = None
+
+            if stopping:
+                return
+
+    def _store_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write rows with retries; returns the rows that still failed."""
+        remaining = rows
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.store.write(remaining)
+                return []
+            except PartitionWriteError as e:
+                remaining = e.remaining  # retry only the day partitions that failed
+                logger.error(f"Event writer flush failed (attempt {attempt}/{self.max_retries}): {e}")
+            except Exception as e:
+                logger.error(f"Event writer flush failed (attempt {attempt}/{self.max_retries}): {e}")
+            time.sleep(0.05 * attempt)
+        return remaining
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        start = time.perf_counter()
+        remaining = self._store_rows(rows)
+        if remaining:
+            self._spill(remaining)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        with self._lock:
+            self._pending -= len(rows)
+            self._flushes += 1
+            self._last_flush_size = len(rows)
+            self._flush_ms.append(elapsed_ms)
+            self._rows_written += len(rows) - len(remaining)
+            self._rows_spilled += len(remaining)
+
+        for fn in self._flush_listeners:
+            try:
+                fn(rows)
+            except Exception as e:
+                logger.error(f"Event writer flush listener failed: {e}")
+
+    # ----- spill -----
+    def _spilled(self) -> bool:
+        return bool(self._unspilled) or bool(self._spill_files())
+
+    def _spill_files(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.spill_dir, "spill-*.jsonl")))
+
+    def _spill(self, rows: List[Dict[str, Any]]):
+        """Persist rows the store would not take to a new spill file; kept in memory if that fails too."""
+        path = os.path.join(self.spill_dir, f"spill-{time.time_ns():020d}.jsonl")
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(path + ".tmp", "w") as f:
+                for r in rows:
+                    f.write(json.dumps({**r, "timestamp": r["timestamp"].isoformat()}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+            logger.warning(f"Event writer spilled {len(rows)} rows to {path}")
+        except Exception as e:
+            logger.error(f"Event writer could not spill {len(rows)} rows, keeping them in memory: {e}")
+            self._unspilled.extend(rows)
+        if self._next_replay <= time.monotonic():
+            self._next_replay = time.monotonic() + self.replay_interval
+
+    def _replay(self):
+        """Write spilled rows back, oldest file first; stop at the first file the store still rejects."""
+        self._next_replay = time.monotonic() + self.replay_interval
+        if self._unspilled:
+            rows, self._unspilled = self._unspilled, []
+            remaining = self._store_rows(rows)
+            if remaining:
+                self._spill(remaining)
+            with self._lock:
+                self._rows_replayed += len(rows) - len(remaining)
+
+        for path in self._spill_files():
+            try:
+                with open(path) as f:
+                    rows = [json.loads(line) for line in f if line.strip()]
+            except (OSError, ValueError) as e:
+                logger.error(f"Event writer cannot read spill file {path}: {e}")
+                continue
+            for r in rows:
+                r["timestamp"] = datetime.fromisoformat(r["timestamp"])
+
+            remaining = self._store_rows(rows)
+            if len(remaining) == len(rows):
+                return  # store still failing; try again next interval
+            if remaining:
+                self._spill(remaining)
+            os.remove(path)
+            with self._lock:
+                self._rows_replayed += len(rows) - len(remaining)
+            logger.info(f"Event writer replayed {len(rows) - len(remaining)} spilled rows from {path}")
+
+    # ----- metrics -----
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lat = np.array(self._flush_ms) if self._flush_ms else None
+            return {
+                "queue_depth": self._pending,
+                "flushes": self._flushes,
+                "rows_written": self._rows_written,
+                "rows_spilled": self._rows_spilled,
+                "rows_replayed": self._rows_replayed,
+                "spill_files": len(self._spill_files()),
+                "last_flush_size": self._last_flush_size,
+                "avg_flush_size": (self._rows_written + self._rows_spilled) / self._flushes if self._flushes else 0.0,
+                "flush_latency_ms": {
+                    "p50": float(np.percentile(lat, 50)) if lat is not None else 0.0,
+                    "p99": float(np.percentile(lat, 99)) if lat is not None else 0.0,
+                    "max": float(lat.max()) if lat is not None else 0.0,
+                },
+            }
+
+
+# Shared writer used by the ingest routes
+event_writer = EventWriter()
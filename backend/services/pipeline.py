@@ -0,0 +1,365 @@
+# backend/services/pipeline.py
+"""
+DAG-scheduled detector pipeline: features -> orbit / sensor / comms
+detectors in parallel, each with a timeout -> fusion of whatever finished
+in time (see docs/internals.md).
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.core.config import ORBIT_REINIT_GAP_S, PIPELINE_EXECUTOR, PIPELINE_TIMEOUT_MS, PIPELINE_WORKERS
+from backend.core.logger import logger
+from backend.models import comms_seq_model, orbit_kalman, sensor_autoencoderwith_temp
+from backend.models.fleet_propagator import R_EARTH, propagate
+from backend.models.fusion import fusion_anomaly_batch
+from backend.services.micro_batch import Histogram
+from backend.services.preprocess import FEATURE_FIELDS, N_FEATURES
+from backend.utils.helpers import satellite_rounds
+
+INPUT = "input"
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class PipelineError(ValueError):
+    """The node graph is not a DAG, or refers to unknown nodes."""
+
+
+class Node:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        deps: Sequence[str] = (INPUT,),
+        timeout_ms: Optional[float] = None,
+        inline: bool = False,
+        partial: bool = False,
+    ):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout_ms = timeout_ms  # pooled nodes only; None = no limit
+        self.inline = inline
+        self.partial = partial        # run with None for missing dependencies instead of skipping
+
+        # metrics
+        self.runs = 0
+        self.late = 0
+        self.failures = 0
+        self.skipped = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+
+
+class PipelineRun:
+    """Outcome of one run: node outputs, plus the nodes that were late, failed or skipped."""
+
+    __slots__ = ("outputs", "late", "failed", "skipped", "elapsed_ms")
+
+    def __init__(self):
+        self.outputs: Dict[str, Any] = {}
+        self.late: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.skipped: List[str] = []
+        self.elapsed_ms = 0.0
+
+    def __getitem__(self, name: str) -> Any:
+        return self.outputs.get(name)
+
+
+class DetectorPipeline:
+    def __init__(self, nodes: Sequence[Node], executor: str = PIPELINE_EXECUTOR, workers: int = PIPELINE_WORKERS):
+        self.nodes: Dict[str, Node] = {}
+        for node in nodes:
+            if node.name in self.nodes or node.name == INPUT:
+                raise PipelineError(f"duplicate node name '{node.name}'")
+            self.nodes[node.name] = node
+        for node in nodes:
+            unknown = [d for d in node.deps if d != INPUT and d not in self.nodes]
+            if unknown:
+                raise PipelineError(f"node '{node.name}' depends on unknown nodes {unknown}")
+        self.order = self._topological_order()
+        self.children: Dict[str, List[str]] = {name: [] for name in [INPUT] + self.order}
+        for name in self.order:
+            for dep in set(self.nodes[name].deps):
+                self.children[dep].append(name)
+
+        if executor not in ("thread", "process"):
+            raise ValueError(f"executor must be 'thread' or 'process', not '{executor}'")
+        self.executor_kind = executor
+        self.workers = int(workers)
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._runs = 0
+        self._partial_runs = 0
+
+    def _topological_order(self) -> List[str]:
+        indegree = {name: sum(d != INPUT for d in node.deps) for name, node in self.nodes.items()}
+        order = [name for name, k in indegree.items() if k == 0]
+        for name in order:  # grows while we iterate
+            for other, node in self.nodes.items():
+                if name in node.deps:
+                    indegree[other] -= node.deps.count(name)
+                    if indegree[other] == 0:
+                        order.append(other)
+        if len(order) != len(self.nodes):
+            raise PipelineError(f"cycle among nodes {sorted(set(self.nodes) - set(order))}")
+        return order
+
+    @property
+    def executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.executor_kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pipeline")
+            return self._executor
+
+    # ----- running -----
+    def run(self, inputs: Any) -> PipelineRun:
+        """Run every node once on `inputs`; returns when all nodes are resolved (done, late, failed or skipped)."""
+        start = time.perf_counter()
+        result = PipelineRun()
+        result.outputs[INPUT] = inputs
+        waiting = {name: len(set(self.nodes[name].deps)) for name in self.order}
+        pending: Dict[Future, Tuple[str, float, float]] = {}  # future -> (node, submitted, deadline)
+
+        def resolved(name: str):
+            for child in self.children[name]:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    launch(child)
+
+        def finish(name: str, t0: float, value: Any = None, error: Optional[BaseException] = None):
+            node = self.nodes[name]
+            elapsed = (time.perf_counter() - t0) * 1000.0
+            with self._stats_lock:
+                node.runs += 1
+                node.latency_ms.add([elapsed])
+                if error is not None:
+                    node.failures += 1
+            if error is None:
+                result.outputs[name] = value
+            else:
+                result.failed[name] = f"{type(error).__name__}: {error}"
+                logger.error(f"Pipeline node '{name}' failed: {error}")
+            resolved(name)
+
+        def launch(name: str):
+            node = self.nodes[name]
+            missing = [d for d in node.deps if d not in result.outputs]
+            if missing and not node.partial:
+                result.skipped.append(name)
+                with self._stats_lock:
+                    node.skipped += 1
+                resolved(name)
+                return
+            args = [result.outputs.get(d) for d in node.deps]
+            t0 = time.perf_counter()
+            if node.inline:
+                try:
+                    value = node.fn(*args)
+                except Exception as e:
+                    finish(name, t0, error=e)
+                else:
+                    finish(name, t0, value)
+                return
+            deadline = math.inf if node.timeout_ms is None else t0 + node.timeout_ms / 1000.0
+            pending[self.executor.submit(node.fn, *args)] = (name, t0, deadline)
+
+        resolved(INPUT)
+        while pending:
+            next_deadline = min(deadline for _, _, deadline in pending.values())
+            timeout = None if next_deadline == math.inf else max(0.0, next_deadline - time.perf_counter())
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name, t0, _ = pending.pop(fut)
+                error = fut.exception()
+                finish(name, t0, None if error else fut.result(), error)
+            now = time.perf_counter()
+            for fut, (name, t0, deadline) in list(pending.items()):
+                if deadline <= now and not fut.done():
+                    del pending[fut]
+                    fut.cancel()  # only helps if it has not started yet
+                    result.late.append(name)
+                    with self._stats_lock:
+                        self.nodes[name].late += 1
+                    logger.warning(f"Pipeline node '{name}' late after {self.nodes[name].timeout_ms} ms")
+                    resolved(name)
+
+        del result.outputs[INPUT]
+        result.elapsed_ms = (time.perf_counter() - start) * 1000.0
+        with self._stats_lock:
+            self._runs += 1
+            self._partial_runs += bool(result.late or result.failed or result.skipped)
+        return result
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "executor": self.executor_kind,
+                "workers": self.workers,
+                "runs": self._runs,
+                "partial_runs": self._partial_runs,
+                "nodes": {
+                    name: {
+                        "deps": list(node.deps),
+                        "inline": node.inline,
+                        "timeout_ms": node.timeout_ms,
+                        "runs": node.runs,
+                        "late": node.late,
+                        "failures": node.failures,
+                        "skipped": node.skipped,
+                        "latency_ms": node.latency_ms.to_dict(),
+                    }
+                    for name, node in ((n, self.nodes[n]) for n in self.order)
+                },
+            }
+
+
+# ----- default detector DAG -----
+CONTACT_GAP_ALPHA = 0.1  # EWMA weight of the newest gap in the average contact gap
+
+_POS = [FEATURE_FIELDS.index(f) for f in ("position_x", "position_y", "position_z")]
+_VEL = [FEATURE_FIELDS.index(f) for f in ("velocity_x", "velocity_y", "velocity_z")]
+_COL = {f: i for i, f in enumerate(FEATURE_FIELDS)}
+_STATE_WIDTH = 10
+
+
+class DetectorFeatures:
+    """
+    The features node: detector input columns for a batch of samples, and
+    the per-satellite state behind them (orbit EKF, last position and
+    velocity, altitude / inclination blend, last contact, average contact
+    gap). Rows are the EKF's; samples of one satellite are applied in order.
+    """
+
+    def __init__(self, orbit_ekf: Optional[orbit_kalman.OrbitEKF] = None, initial_satellites: int = 16):
+        self.orbit_ekf = orbit_ekf if orbit_ekf is not None else orbit_kalman.OrbitEKF()
+        self._lock = threading.Lock()
+        self._satellites = 0
+        # altitude, inclination (tracked), last contact time, average gap (s),
+        # last position (3) and velocity (3); NaN = none yet
+        self._state = np.full((initial_satellites, _STATE_WIDTH), np.nan)
+
+    def _fit(self, sat: np.ndarray):
+        """Grow the state to hold rows up to sat.max() (doubling)."""
+        n = int(sat.max()) + 1
+        self._satellites = max(self._satellites, n)
+        if n > self._state.shape[0]:
+            extra = max(n, 2 * self._state.shape[0]) - self._state.shape[0]
+            self._state = np.concatenate([self._state, np.full((extra, _STATE_WIDTH), np.nan)])
+
+    def __call__(self, inputs: Mapping[str, Any]) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        inputs: {"satellite_ids": N ids, "t": (N,) epoch seconds,
+        "features": (N, 15) telemetry}. Returns {detector: {column: (N,)}}.
+        """
+        features = np.asarray(inputs["features"], dtype=float).reshape(-1, N_FEATURES)
+        t = np.asarray(inputs["t"], dtype=float)
+        n = features.shape[0]
+
+        r, v = features[:, _POS], features[:, _VEL]
+        altitude = np.linalg.norm(r, axis=1) - R_EARTH
+        h = np.cross(r, v)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            inclination = np.degrees(np.arccos(np.clip(h[:, 2] / np.linalg.norm(h, axis=1), -1.0, 1.0)))
+
+        prev = np.full((n, _STATE_WIDTH), np.nan)
+        tracked = np.full(n, np.nan)  # inclination blend after each sample
+        residual = np.full(n, np.nan)
+        sat = self.orbit_ekf.rows(inputs["satellite_ids"])
+        with self._lock:
+            if n:
+                self._fit(sat)
+            for idx in satellite_rounds(sat):
+                rows = sat[idx]
+                s = self._state[rows]
+                prev[idx] = s
+                # orbit tracker: kalman_predict's blend, starting from the first observation
+                obs = np.column_stack([altitude[idx], inclination[idx]])
+                s[:, :2] = np.where(np.isnan(s[:, :2]), obs, 0.7 * s[:, :2] + 0.3 * obs)
+                tracked[idx] = s[:, 1]
+                gap = t[idx] - s[:, 2]
+                s[:, 3] = np.where(np.isnan(s[:, 3]), gap, (1 - CONTACT_GAP_ALPHA) * s[:, 3] + CONTACT_GAP_ALPHA * gap)
+                # position residual: the previous sample propagated to this one
+                known = np.isfinite(s[:, 4:]).all(axis=1) & (np.abs(gap) <= ORBIT_REINIT_GAP_S)
+                if known.any():
+                    predicted = propagate(s[known, 4:], gap[known])
+                    residual[idx[known]] = np.linalg.norm(r[idx[known]] - predicted[:, :3], axis=1)
+                s[:, 2] = t[idx]
+                s[:, 4:7], s[:, 7:] = r[idx], v[idx]
+                self._state[rows] = s
+        nis = self.orbit_ekf.update(inputs["satellite_ids"], t, r, v, rows=sat)
+
+        loss = features[:, _COL["comms_packet_loss"]]
+        nan = np.full(n, np.nan)
+        return {
+            "orbit": {
+                "altitude_prev": prev[:, 0],
+                "altitude_now": altitude,
+                # the blend against its previous value: the inclination
+                # of one raw sample is off by degrees (velocity noise)
+                "inclination_prev": prev[:, 1],
+                "inclination_now": tracked,
+                "nis": nis,
+                "position_residual_km": residual,
+            },
+            "sensor": {
+                "sensor_temp_c": features[:, _COL["temp_payload"]],
+                "battery_level_pct": nan,  # not in the telemetry schema
+                "comm_signal_db": features[:, _COL["comms_rssi"]],
+            },
+            "comms": {
+                "avg_contact_gap_min": prev[:, 3] / 60.0,
+                "last_gap_min": (t - prev[:, 2]) / 60.0,
+                "packets_per_min": nan,  # not in the telemetry schema
+                "error_rate_pct": 100.0 * loss,
+                "downlink_success_ratio": 1.0 - loss,
+            },
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"satellites": self._satellites}
+
+
+# pooled nodes: module-level so that the process pool can pickle them
+def orbit_node(features: Mapping[str, Any]) -> np.ndarray:
+    return orbit_kalman.score_batch(features["orbit"])
+
+
+def sensor_node(features: Mapping[str, Any]) -> np.ndarray:
+    return sensor_autoencoderwith_temp.score_batch(features["sensor"])
+
+
+def comms_node(features: Mapping[str, Any]) -> np.ndarray:
+    return comms_seq_model.score_batch(features["comms"])
+
+
+def fusion_node(orbit: Optional[np.ndarray], sensor: Optional[np.ndarray], comms: Optional[np.ndarray]):
+    return fusion_anomaly_batch(orbit, sensor, comms)
+
+
+detector_features = DetectorFeatures(orbit_kalman.orbit_ekf)
+
+# Shared pipeline of the /fusion routes
+detector_pipeline = DetectorPipeline([
+    Node("features", detector_features, inline=True),
+    Node("orbit", orbit_node, deps=("features",), timeout_ms=PIPELINE_TIMEOUT_MS),
+    Node("sensor", sensor_node, deps=("features",), timeout_ms=PIPELINE_TIMEOUT_MS),
+    Node("comms", comms_node, deps=("features",), timeout_ms=PIPELINE_TIMEOUT_MS),
+    Node("fusion", fusion_node, deps=("orbit", "sensor", "comms"), inline=True, partial=True),
+])
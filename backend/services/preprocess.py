@@ -1,25 +1,51 @@
 import numpy as np
-from backend.core.schemas import Telemetry
+from operator import attrgetter, itemgetter
+from typing import Any, Mapping, Sequence
 
-def preprocess_telemetry(data: Telemetry) -> np.ndarray:
+# Column order of the feature vector (same as anomaly_engine expects):
+# 0-2 pos, 3-5 vel, 6 temp_payload, 7 temp_battery, 8 temp_bus, 9-11 sensors, 12 rssi, 13 snr, 14 packet_loss
+FEATURE_FIELDS = (
+    "position_x",
+    "position_y",
+    "position_z",
+    "velocity_x",
+    "velocity_y",
+    "velocity_z",
+    "temp_payload",
+    "temp_battery",
+    "temp_bus",
+    "sensor1_value",
+    "sensor2_value",
+    "sensor3_value",
+    "comms_rssi",
+    "comms_snr",
+    "comms_packet_loss",
+)
+N_FEATURES = len(FEATURE_FIELDS)
+
+_get_items = itemgetter(*FEATURE_FIELDS)
+_get_attrs = attrgetter(*FEATURE_FIELDS)
+
+
+def _feature_values(data: Any) -> tuple:
+    if isinstance(data, Mapping):
+        return _get_items(data)
+    return _get_attrs(data)
+
+
+def preprocess_telemetry(data: Any) -> np.ndarray:
     """
-Convert Telemetry object into numeric feature vector.
+Convert a telemetry sample (dict or Telemetry object) into numeric feature vector.
 Keep ordering consistent with anomaly_engine expectations.
 """
-    return np.array([
-        data.position_x,
-        data.position_y,
-        data.position_z,
-        data.velocity_x,
-        data.velocity_y,
-        data.velocity_z,
-        data.temp_payload,
-        data.temp_battery,
-        data.temp_bus,
-        data.sensor1_value,
-        data.sensor2_value,
-        data.sensor3_value,
-        data.comms_rssi,
-        data.comms_snr,
-        data.comms_packet_loss,
-    ], dtype=float)
\ No newline at end of file
+    return np.array(_feature_values(data), dtype=float)
+
+
+def preprocess_telemetry_batch(samples: Sequence[Any]) -> np.ndarray:
+    """
+Stack many telemetry samples into one (N, 15) feature matrix,
+row i being exactly preprocess_telemetry(samples[i]).
+"""
+    if not samples:
+        return np.empty((0, N_FEATURES), dtype=float)
+    return np.array([_feature_values(s) for s in samples], dtype=float)
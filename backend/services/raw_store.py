@@ -0,0 +1,274 @@
+# backend/services/raw_store.py
+"""
+Append-only, memory-mapped store for the raw 15-channel feature vectors:
+one columnar segment file per satellite per UTC day, crash-safe through a
+double-buffered header (file format in docs/internals.md).
+"""
+
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Sequence, Tuple
+from urllib.parse import quote
+
+import numpy as np
+
+from backend.core.config import RAW_STORE_DIR, RAW_SEGMENT_CAPACITY, RAW_OPEN_SEGMENTS
+from backend.services.preprocess import N_FEATURES
+
+MAGIC = b"SATRAW01"
+VERSION = 1
+N_COLS = 1 + N_FEATURES          # timestamp + features
+HEADER_SIZE = 4096               # keeps the column data page aligned
+SLOT_SIZE = 64
+_SLOT = struct.Struct("<8sIIQQQI")  # magic, version, n_cols, capacity, seq, rows, flags
+FLAG_UNSORTED = 1
+DAY_S = 86400
+
+
+class SegmentCorrupt(Exception):
+    """Neither header slot of a segment file is valid."""
+
+
+class Segment:
+    def __init__(self, path: str, capacity: int = RAW_SEGMENT_CAPACITY):
+        self.path = path
+        if not os.path.exists(path):
+            self._create(path, capacity)
+
+        self._file = open(path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE)
+        self.capacity, self.rows, self.flags, self._seq = self._read_header()
+        self.cols = np.ndarray(
+            (N_COLS, self.capacity), dtype="<f8", buffer=self._mm, offset=HEADER_SIZE
+        )
+
+    # ----- header -----
+    @staticmethod
+    def _pack(capacity: int, seq: int, rows: int, flags: int) -> bytes:
+        body = _SLOT.pack(MAGIC, VERSION, N_COLS, capacity, seq, rows, flags)
+        return body + struct.pack("<I", zlib.crc32(body))
+
+    @classmethod
+    def _create(cls, path: str, capacity: int):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.truncate(HEADER_SIZE + N_COLS * capacity * 8)
+            f.write(cls._pack(capacity, 0, 0, 0))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)  # the file only appears once its header is valid
+
+    def _read_header(self) -> Tuple[int, int, int, int]:
+        best = None
+        for slot in range(2):
+            raw = self._mm[slot * SLOT_SIZE: slot * SLOT_SIZE + _SLOT.size + 4]
+            body, (crc,) = raw[:_SLOT.size], struct.unpack("<I", raw[_SLOT.size:])
+            if zlib.crc32(body) != crc:
+                continue
+            magic, version, n_cols, capacity, seq, rows, flags = _SLOT.unpack(body)
+            if magic != MAGIC or n_cols != N_COLS or rows > capacity:
+                continue
+            if best is None or seq > best[3]:
+                best = (capacity, rows, flags, seq)
+        if best is None:
+            raise SegmentCorrupt(f"no valid header in {self.path}")
+        return best
+
+    def _write_header(self):
+        self._seq += 1
+        off = (self._seq % 2) * SLOT_SIZE
+        self._mm[off: off + _SLOT.size + 4] = self._pack(self.capacity, self._seq, self.rows, self.flags)
+
+    # ----- data -----
+    @property
+    def room(self) -> int:
+        return self.capacity - self.rows
+
+    @property
+    def time_ordered(self) -> bool:
+        return not self.flags & FLAG_UNSORTED
+
+    def append(self, t: np.ndarray, features: np.ndarray) -> int:
+        """Append up to `room` rows; returns how many were written."""
+        k = min(len(t), self.room)
+        if k == 0:
+            return 0
+        n = self.rows
+        self.cols[0, n:n + k] = t[:k]
+        self.cols[1:, n:n + k] = features[:k].T
+
+        if self.time_ordered and (
+            (n > 0 and t[0] < self.cols[0, n - 1]) or (k > 1 and np.any(np.diff(t[:k]) < 0))
+        ):
+            self.flags |= FLAG_UNSORTED
+
+        # publish the rows only after their data is in place
+        self.rows = n + k
+        self._write_header()
+        return k
+
+    def range(self, t0: float, t1: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows with t0 <= t < t1 as (t[k], features[k, 15]); views when time-ordered."""
+        t = self.cols[0, :self.rows]
+        if self.time_ordered:
+            i0, i1 = np.searchsorted(t, [t0, t1], side="left")
+            return t[i0:i1], self.cols[1:, i0:i1].T
+        mask = (t >= t0) & (t < t1)
+        return t[mask], self.cols[1:, :self.rows][:, mask].T
+
+    def sync(self):
+        self._mm.flush()
+
+    def close(self):
+        # NumPy views do not pin the mapping against mmap.close(), so it is not
+        # closed here: it is unmapped once the last view returned by range() is gone
+        self._mm.flush()
+        self._file.close()
+        self.cols = self._mm = None
+
+
+class RawTelemetryStore:
+    def __init__(self, root: str = RAW_STORE_DIR, capacity: int = RAW_SEGMENT_CAPACITY,
+                 max_open: int = RAW_OPEN_SEGMENTS):
+        self.root = os.path.abspath(root)
+        self.capacity = capacity
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._segments: "OrderedDict[str, Segment]" = OrderedDict()  # LRU of open segments
+        self._writers: Dict[Tuple[str, int], Segment] = {}  # (satellite, day) -> open chunk
+
+    # ----- paths -----
+    def _sat_dir(self, satellite_id: str) -> str:
+        # one-to-one: "%" is escaped too, and dots so that "." / ".." stay plain names
+        return os.path.join(self.root, quote(satellite_id, safe="").replace(".", "%2E") or "%")
+
+    @staticmethod
+    def _day_name(day: int) -> str:
+        return datetime.fromtimestamp(day * DAY_S, tz=timezone.utc).strftime("%Y-%m-%d")
+
+    def _day_chunks(self, satellite_id: str, day: int) -> List[str]:
+        d = self._sat_dir(satellite_id)
+        prefix = self._day_name(day) + "-"
+        if not os.path.isdir(d):
+            return []
+        return sorted(
+            os.path.join(d, f) for f in os.listdir(d)
+            if f.startswith(prefix) and f.endswith(".seg")
+        )
+
+    def _open(self, path: str) -> Segment:
+        seg = self._segments.get(path)
+        if seg is not None:
+            self._segments.move_to_end(path)
+            return seg
+        seg = self._segments[path] = Segment(path, self.capacity)
+        if len(self._segments) > self.max_open:
+            writing = {id(w) for w in self._writers.values()}
+            for old in [p for p, s in self._segments.items() if id(s) not in writing and s is not seg]:
+                self._segments.pop(old).close()
+                if len(self._segments) <= self.max_open:
+                    break
+        return seg
+
+    def _writer(self, satellite_id: str, day: int) -> Segment:
+        seg = self._writers.get((satellite_id, day))
+        if seg is not None and seg.room:
+            return seg
+        if seg is None:
+            self._evict_before(satellite_id, day - 1)
+        chunks = self._day_chunks(satellite_id, day)
+        if chunks and self._open(chunks[-1]).room:
+            seg = self._open(chunks[-1])
+        else:
+            os.makedirs(self._sat_dir(satellite_id), exist_ok=True)
+            name = f"{self._day_name(day)}-{len(chunks):04d}.seg"
+            seg = self._open(os.path.join(self._sat_dir(satellite_id), name))
+        self._writers[(satellite_id, day)] = seg
+        return seg
+
+    def _evict_before(self, satellite_id: str, day: int):
+        # drop old days from the caches; mappings still referenced by views stay alive
+        for key in [k for k in self._writers if k[0] == satellite_id and k[1] < day]:
+            seg = self._writers.pop(key)
+            if self._segments.pop(seg.path, None) is not None:
+                seg.close()
+
+    # ----- writes -----
+    def append(self, satellite_id: str, t: np.ndarray, features: np.ndarray):
+        """Append rows of one satellite (t in epoch seconds, features (k, 15))."""
+        t = np.asarray(t, dtype=float)
+        features = np.asarray(features, dtype=float).reshape(-1, N_FEATURES)
+        days = (t // DAY_S).astype(np.int64)
+        with self._lock:
+            for day in np.unique(days):
+                sel = days == day
+                tt, ff = t[sel], features[sel]
+                while tt.size:
+                    k = self._writer(satellite_id, int(day)).append(tt, ff)
+                    tt, ff = tt[k:], ff[k:]
+
+    def append_batch(self, satellite_ids: Sequence[str], t: np.ndarray, features: np.ndarray):
+        """Append a mixed-fleet batch, grouped so each satellite is one slice write."""
+        if len(satellite_ids) == 0:
+            return
+        sats, inverse = np.unique(np.asarray(satellite_ids), return_inverse=True)
+        inverse = inverse.reshape(-1)
+        if sats.size == 1:
+            self.append(str(sats[0]), t, features)
+            return
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=sats.size))[:-1]
+        t, features = np.asarray(t)[order], np.asarray(features)[order]
+        for sat, tt, ff in zip(sats.tolist(), np.split(t, bounds), np.split(features, bounds)):
+            self.append(sat, tt, ff)
+
+    # ----- reads -----
+    def iter_range(self, satellite_id: str, t0: float, t1: float) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield zero-copy (t, features) pieces, one per segment, for t0 <= t < t1."""
+        if t1 <= t0:
+            return
+        d = self._sat_dir(satellite_id)
+        if not os.path.isdir(d):
+            return
+        # one listing of the days that exist, however wide the range
+        first = self._day_name(int(t0 // DAY_S))
+        last = self._day_name(int(np.ceil(t1 / DAY_S)) - 1)
+        paths = sorted(
+            os.path.join(d, f) for f in os.listdir(d)
+            if f.endswith(".seg") and first <= f[:10] <= last
+        )
+        for path in paths:
+            with self._lock:
+                t, x = self._open(path).range(t0, t1)
+            if t.size:
+                yield t, x
+
+    def read_range(self, satellite_id: str, t0: float, t1: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(t, features) for t0 <= t < t1; views if one segment covers it, else a copy."""
+        pieces = list(self.iter_range(satellite_id, t0, t1))
+        if not pieces:
+            return np.empty(0), np.empty((0, N_FEATURES))
+        if len(pieces) == 1:
+            return pieces[0]
+        return np.concatenate([p[0] for p in pieces]), np.concatenate([p[1] for p in pieces])
+
+    def sync(self):
+        with self._lock:
+            for seg in self._segments.values():
+                seg.sync()
+
+    def close(self):
+        with self._lock:
+            for seg in self._segments.values():
+                seg.close()
+            self._segments.clear()
+            self._writers.clear()
+
+
+# Shared store written by the ingest routes
+raw_store = RawTelemetryStore()
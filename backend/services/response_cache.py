@@ -0,0 +1,126 @@
+# backend/services/response_cache.py
+"""
+Versioned cache for the anomaly read endpoints: every write bumps one
+version, which makes all cached bodies stale at once. ETags are derived
+from (region nonce, version, key), so unchanged polls get a 304 for free,
+from any worker when the version is shared.
+"""
+
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+import numpy as np
+
+from backend.core.config import RESPONSE_CACHE_MAX_ENTRIES, SHARED_STATE_ENABLED, SHARED_STATE_NAME
+from backend.services.persistence import event_writer
+from backend.services.shm import open_region
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        shared: bool = SHARED_STATE_ENABLED,
+        name: str = f"{SHARED_STATE_NAME}-cache-version",
+    ):
+        self.max_entries = max_entries
+        # [0] = write version, [1] = nonce drawn by whichever process created the region,
+        # so tags from before a restart (version back at 0) never match
+        self._region = open_region(name, 16, "response-cache-version/1", shared)
+        self._counter = np.ndarray((2,), dtype="<u8", buffer=self._region.buf)
+        with self._region.lock():
+            if self._counter[1] == 0:
+                self._counter[1] = (uuid.uuid4().int & 0xFFFFFFFF) | 1
+        self._boot = f"{int(self._counter[1]):08x}"
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+
+        # metrics
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._evictions = 0
+
+    @property
+    def version(self) -> int:
+        return int(self._counter[0])
+
+    def bump(self, *_):
+        """Invalidate every cached response (accepts and ignores listener args)."""
+        with self._region.lock():
+            self._counter[0] += 1
+
+    @staticmethod
+    def key(endpoint: str, params: Dict[str, Any]) -> str:
+        return endpoint + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params) if params[k] is not None)
+
+    def etag(self, key: str, version: Optional[int] = None) -> str:
+        v = self.version if version is None else version
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        return f'"{self._boot}-{v}-{digest}"'
+
+    def not_modified(self, key: str, if_none_match: Optional[str]) -> bool:
+        """True if the client's tag still names the current version of `key`."""
+        if not if_none_match:
+            return False
+        etag = self.etag(key)
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            with self._lock:
+                self._not_modified += 1
+            return True
+        return False
+
+    def get_or_render(self, key: str, compute: Callable[[], Any]) -> Tuple[bytes, str]:
+        """
+        JSON body and ETag for `key` at the current version; `compute` runs
+        only on a miss. A bump that lands while computing leaves the entry
+        tagged with the older version, so the next request recomputes.
+        """
+        version = self.version
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1], self.etag(key, version)
+            self._misses += 1
+
+        body = json.dumps(
+            jsonable_encoder(compute()), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return body, self.etag(key, version)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            requests = lookups + self._not_modified
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "not_modified": self._not_modified,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                # share of requests served without touching the endpoint's data
+                "served_from_cache_rate": round((self._hits + self._not_modified) / requests, 4) if requests else None,
+            }
+
+
+# Shared cache for the anomaly routes; every event writer flush changes /history
+response_cache = ResponseCache()
+event_writer.add_flush_listener(response_cache.bump)
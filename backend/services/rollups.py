@@ -0,0 +1,272 @@
+# backend/services/rollups.py
+"""
+Incremental 1-minute / 1-hour / 1-day rollups of anomaly events per
+satellite, in fixed-size rings whose old buckets age out on their own.
+Issue counters follow the issue names of the active telemetry rules.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.core.config import ROLLUP_MINUTE_BUCKETS, ROLLUP_HOUR_BUCKETS, ROLLUP_DAY_BUCKETS
+from backend.core.logger import logger
+from backend.services.anomaly_engine import TELEMETRY_RULESET
+from backend.services.response_cache import response_cache
+from backend.utils.helpers import SatelliteIndex
+from backend.utils.thresholds import threshold_rules
+
+SEVERITIES = ("normal", "warning", "critical")
+SEVERITY_CODES = {name: i for i, name in enumerate(SEVERITIES)}
+
+# (name, bucket width in seconds, ring capacity), finest first
+RESOLUTIONS = (
+    ("1m", 60, ROLLUP_MINUTE_BUCKETS),
+    ("1h", 3600, ROLLUP_HOUR_BUCKETS),
+    ("1d", 86400, ROLLUP_DAY_BUCKETS),
+)
+
+_EMPTY = np.iinfo(np.int64).min
+
+
+class _Ring:
+    """Buckets of one resolution for all satellites: arrays shaped (n_sats, capacity, ...)."""
+
+    def __init__(self, width: int, capacity: int, n_sats: int, n_issues: int = 0):
+        self.width = width
+        self.capacity = capacity
+        self.ids = np.full((n_sats, capacity), _EMPTY, dtype=np.int64)
+        self.count = np.zeros((n_sats, capacity), dtype=np.uint32)
+        self.max_score = np.zeros((n_sats, capacity), dtype=np.float32)
+        self.sum_score = np.zeros((n_sats, capacity), dtype=np.float64)
+        self.severity = np.zeros((n_sats, capacity, len(SEVERITIES)), dtype=np.uint32)
+        self.issues = np.zeros((n_sats, capacity, n_issues), dtype=np.uint32)
+
+    def grow(self, n_sats: int):
+        extra = n_sats - self.ids.shape[0]
+        pad = lambda a, fill: np.concatenate([a, np.full((extra,) + a.shape[1:], fill, dtype=a.dtype)])
+        self.ids = pad(self.ids, _EMPTY)
+        self.count = pad(self.count, 0)
+        self.max_score = pad(self.max_score, 0)
+        self.sum_score = pad(self.sum_score, 0)
+        self.severity = pad(self.severity, 0)
+        self.issues = pad(self.issues, 0)
+
+    def grow_issues(self, n_issues: int):
+        extra = n_issues - self.issues.shape[2]
+        self.issues = np.concatenate([self.issues, np.zeros(self.issues.shape[:2] + (extra,), dtype=np.uint32)], axis=2)
+
+    def add(self, sat_idx, t, score, severity, issue_flags):
+        bucket = np.floor_divide(t, self.width).astype(np.int64)
+        flat = sat_idx * self.capacity + bucket % self.capacity
+
+        ids = self.ids.reshape(-1)
+        old = ids[flat]
+        np.maximum.at(ids, flat, bucket)
+        reset = np.unique(flat[ids[flat] != old])
+        if reset.size:
+            for a in (self.count, self.max_score, self.sum_score):
+                a.reshape(-1)[reset] = 0
+            self.severity.reshape(-1, len(SEVERITIES))[reset] = 0
+            self.issues.reshape(-1, self.issues.shape[2])[reset] = 0
+
+        # events older than what their slot now holds fell out of the ring
+        keep = ids[flat] == bucket
+        if not keep.all():
+            flat, score, severity, issue_flags = flat[keep], score[keep], severity[keep], issue_flags[keep]
+
+        np.add.at(self.count.reshape(-1), flat, 1)
+        np.add.at(self.sum_score.reshape(-1), flat, score)
+        np.maximum.at(self.max_score.reshape(-1), flat, score.astype(np.float32))
+        np.add.at(self.severity.reshape(-1, len(SEVERITIES)), (flat, severity), 1)
+        np.add.at(self.issues.reshape(-1, self.issues.shape[2]), flat, issue_flags.astype(np.uint32))
+
+    def oldest_bucket(self, row: int) -> Optional[int]:
+        ids = self.ids[row]
+        valid = ids[ids != _EMPTY]
+        if valid.size == 0:
+            return None
+        return int(valid.max()) - self.capacity + 1
+
+    def points(self, row: int, t0: float, t1: float, issue_names: Sequence[str]) -> List[Dict[str, Any]]:
+        b0, b1 = int(t0 // self.width), int(np.ceil(t1 / self.width))
+        buckets = np.arange(max(b0, b1 - self.capacity), b1, dtype=np.int64)
+        slots = buckets % self.capacity
+        hit = (self.ids[row, slots] == buckets) & (self.count[row, slots] > 0)
+        buckets, slots = buckets[hit], slots[hit]
+
+        count = self.count[row, slots]
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(int(b) * self.width, tz=timezone.utc).isoformat(),
+                "count": int(n),
+                "max_score": float(mx),
+                "mean_score": float(sm / n),
+                "severity": dict(zip(SEVERITIES, sev)),
+                "issues": {name: k for name, k in zip(issue_names, iss) if k},
+            }
+            for b, n, mx, sm, sev, iss in zip(
+                buckets.tolist(),
+                count.tolist(),
+                self.max_score[row, slots].tolist(),
+                self.sum_score[row, slots].tolist(),
+                self.severity[row, slots].tolist(),
+                self.issues[row, slots].tolist(),
+            )
+        ]
+
+
+class RollupStore:
+    def __init__(self, resolutions=RESOLUTIONS, initial_satellites: int = 16):
+        self._lock = threading.Lock()
+        self._names = [name for name, _, _ in resolutions]
+        self._rings = [_Ring(width, cap, initial_satellites) for _, width, cap in resolutions]
+        self._sats = SatelliteIndex(initial_satellites, self._grow)
+        self.issue_names: List[str] = []  # counter order; only ever appended to
+        self._issue_index: Dict[str, int] = {}
+        self._rules_version: Optional[int] = None
+
+    def _grow(self, n_sats: int):
+        for ring in self._rings:
+            ring.grow(n_sats)
+
+    def _add_issue_names(self, names):
+        """Counters for names not seen yet (caller holds the lock)."""
+        new = [name for name in dict.fromkeys(names) if name not in self._issue_index]
+        if not new:
+            return
+        for name in new:
+            self._issue_index[name] = len(self.issue_names)
+            self.issue_names.append(name)
+        for ring in self._rings:
+            ring.grow_issues(len(self.issue_names))
+
+    def _follow_rules(self):
+        version = threshold_rules.version
+        if version != self._rules_version:
+            self._add_issue_names(threshold_rules.get(TELEMETRY_RULESET).issue_names)
+            self._rules_version = version
+
+    def add(
+        self,
+        satellite_ids: Sequence[str],
+        t: np.ndarray,
+        score: np.ndarray,
+        severity: np.ndarray,
+        issues: Sequence[Sequence[str]],
+    ):
+        """
+        Fold a batch of events into every resolution.
+
+        t: epoch seconds, score: float, severity: codes into SEVERITIES,
+        issues: the issue names of each event.
+        """
+        if len(satellite_ids) == 0:
+            return
+        t = np.asarray(t, dtype=float)
+        score = np.asarray(score, dtype=float)
+        severity = np.asarray(severity, dtype=np.int64)
+        with self._lock:
+            self._follow_rules()
+            self._add_issue_names(name for names in issues for name in names)
+            hits = [(i, self._issue_index[name]) for i, names in enumerate(issues) for name in names]
+            issue_flags = np.zeros((len(t), len(self.issue_names)), dtype=bool)
+            if hits:
+                issue_flags[tuple(np.array(hits).T)] = True
+            sat_idx = self._sats.rows(satellite_ids)
+            for ring in self._rings:
+                ring.add(sat_idx, t, score, severity, issue_flags)
+
+    def add_records(self, records: List[Dict[str, Any]], t: np.ndarray):
+        """Fold /telemetry-style records (anomaly dicts) with their epoch times."""
+        n = len(records)
+        self.add(
+            [r["satellite_id"] for r in records],
+            t,
+            np.fromiter((r["anomaly"]["score"] for r in records), dtype=float, count=n),
+            np.fromiter((SEVERITY_CODES[r["anomaly"]["severity"]] for r in records), dtype=np.int64, count=n),
+            [r["anomaly"]["issues"] for r in records],
+        )
+
+    def start_backfill(self, store) -> threading.Thread:
+        """
+        Rebuild buckets from stored events (a PartitionedAnomalyStore) in a
+        background thread. Must be called before ingest starts: only rows
+        that exist now are read, so events ingested meanwhile are not
+        counted twice.
+        """
+        snapshot = store.snapshot()
+        thread = threading.Thread(
+            target=self.backfill, args=(store, snapshot), name="rollup-backfill", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def backfill(self, store, snapshot):
+        """Fold the stored events covered by `snapshot` into the buckets."""
+        horizon = max(width * cap for _, width, cap in RESOLUTIONS)
+        since = datetime.utcnow() - timedelta(seconds=horizon)
+        start = time.perf_counter()
+        total = 0
+        for cols in store.iter_columns(since, snapshot):
+            self._add_columns(cols)
+            total += len(cols["id"])
+        response_cache.bump()
+        logger.info(f"Rollups backfilled from {total} events in {time.perf_counter() - start:.2f}s")
+
+    def _add_columns(self, cols: Dict[str, np.ndarray]):
+        n = len(cols["id"])
+        if n == 0:
+            return
+        # split each distinct issues string once
+        combos, inverse = np.unique(cols["issues"], return_inverse=True)
+        split = [[name for name in c.split(",") if name] for c in combos.tolist()]
+        self.add(
+            cols["satellite_id"],
+            cols["timestamp"] / 1e6,
+            np.nan_to_num(cols["score"]),
+            np.array([SEVERITY_CODES.get(s, 0) for s in cols["severity"].tolist()], dtype=np.int64),
+            [split[k] for k in inverse.reshape(-1).tolist()],
+        )
+
+    def query(self, satellite_id: str, t0: float, t1: float, max_points: int = 500) -> Dict[str, Any]:
+        """
+        Buckets of one satellite over [t0, t1) at the finest resolution whose
+        bucket count fits `max_points` and whose ring still reaches back to t0
+        (falling back to the coarsest resolution). Empty buckets are omitted.
+        """
+        with self._lock:
+            row = self._sats.get(satellite_id)
+            chosen = len(self._rings) - 1
+            for i, ring in enumerate(self._rings):
+                n_buckets = int(np.ceil(t1 / ring.width)) - int(t0 // ring.width)
+                oldest = ring.oldest_bucket(row) if row is not None else None
+                covered = oldest is None or t0 // ring.width >= oldest
+                if n_buckets <= max_points and covered:
+                    chosen = i
+                    break
+
+            ring = self._rings[chosen]
+            points = ring.points(row, t0, t1, self.issue_names) if row is not None else []
+
+        return {
+            "resolution": self._names[chosen],
+            "bucket_seconds": ring.width,
+            "points": points[-max_points:],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            nbytes = sum(
+                a.nbytes
+                for ring in self._rings
+                for a in (ring.ids, ring.count, ring.max_score, ring.sum_score, ring.severity, ring.issues)
+            )
+            return {"satellites": len(self._sats), "issues": len(self.issue_names), "bytes": nbytes}
+
+
+# Shared rollups updated by the ingest routes
+rollups = RollupStore()
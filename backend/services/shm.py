@@ -0,0 +1,115 @@
+# backend/services/shm.py
+"""
+Memory regions for in-memory state: LocalRegion for one process, or a
+SharedRegion in POSIX shared memory attached by every uvicorn worker.
+"""
+
+import fcntl
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+HEADER_SIZE = 64  # layout signature
+
+# lock fds held by this process, by name (see claim_single_process)
+_claims = {}
+
+
+class SharedRegionMismatch(Exception):
+    """An existing region was created with a different layout."""
+
+
+class _SharedMemory(shared_memory.SharedMemory):
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            pass  # NumPy views into the region outlive it at interpreter exit
+
+
+class LocalRegion:
+    def __init__(self, size: int):
+        self.buf = memoryview(bytearray(size))
+        self._tlock = threading.Lock()
+
+    @contextmanager
+    def lock(self):
+        with self._tlock:
+            yield
+
+    def close(self):
+        pass
+
+
+class SharedRegion:
+    def __init__(self, name: str, size: int, signature: str):
+        self.name = name
+        self._tlock = threading.Lock()
+        self._lock_fd = os.open(
+            os.path.join(tempfile.gettempdir(), f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600
+        )
+        sig = signature.encode()
+        if len(sig) > HEADER_SIZE:
+            raise ValueError("region signature too long")
+        sig = sig.ljust(HEADER_SIZE, b"\0")
+
+        with self.lock():
+            try:
+                shm = _SharedMemory(name=name, create=True, size=HEADER_SIZE + size)
+                shm.buf[:HEADER_SIZE] = sig
+            except FileExistsError:
+                shm = _SharedMemory(name=name)
+                if bytes(shm.buf[:HEADER_SIZE]) != sig or shm.size < HEADER_SIZE + size:
+                    found = bytes(shm.buf[:HEADER_SIZE]).rstrip(b"\0").decode(errors="replace")
+                    shm.close()
+                    raise SharedRegionMismatch(
+                        f"shared memory '{name}' has layout '{found}', expected '{signature}'; "
+                        f"stop every worker and remove /dev/shm/{name}"
+                    )
+            # the resource tracker would unlink the region when this process exits,
+            # pulling it from under the other workers
+            resource_tracker.unregister(shm._name, "shared_memory")
+
+        self._shm = shm
+        self.buf = shm.buf[HEADER_SIZE:HEADER_SIZE + size]
+
+    @contextmanager
+    def lock(self):
+        with self._tlock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def close(self):
+        try:
+            self.buf.release()
+            self._shm.close()
+        except BufferError:
+            pass  # arrays over the region are still alive; released with them
+        os.close(self._lock_fd)
+
+
+def open_region(name: str, size: int, signature: str, shared: bool):
+    """A SharedRegion named `name` if `shared`, else a LocalRegion."""
+    return SharedRegion(name, size, signature) if shared else LocalRegion(size)
+
+
+def claim_single_process(name: str) -> bool:
+    """
+    Take the host-wide lock `name` for the life of this process. True if
+    this process holds it (again), False if another process already does.
+    """
+    if name in _claims:
+        return True
+    fd = os.open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return False
+    _claims[name] = fd
+    return True
@@ -1,11 +1,296 @@
 # backend/services/state.py
-from collections import deque
+"""
+In-memory anomaly state: the most recent records per satellite and
+fleet-wide, in compact rings that every uvicorn worker can share
+(see docs/internals.md).
+"""
 
-LATEST_ANOMALIES = deque(maxlen=200)
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.core.config import (
+    STATE_PER_SAT_CAPACITY,
+    STATE_FLEET_CAPACITY,
+    STATE_MAX_SATELLITES,
+    SHARED_STATE_ENABLED,
+    SHARED_STATE_NAME,
+)
+from backend.core.logger import logger
+from backend.services.anomaly_engine import TELEMETRY_RULESET
+from backend.services.feed import anomaly_feed
+from backend.services.rollups import SEVERITIES, SEVERITY_CODES
+from backend.services.shm import open_region
+from backend.utils.helpers import parse_timestamp, epoch_seconds
+from backend.utils.thresholds import threshold_rules
+
+RECORD_DTYPE = np.dtype([
+    ("sat", "<u4"),       # index into the satellite name table
+    ("t", "<f8"),         # epoch seconds
+    ("score", "<f8"),
+    ("severity", "u1"),   # index into SEVERITIES
+    ("issues", "<u4"),    # bit i set = issue name i
+])
+NAME_DTYPE = "S64"
+MAX_ISSUES = 32           # bits in the issue mask
+
+# meta words
+SEQ, N_SATS, N_ISSUES, FLEET_TOTAL = range(4)
+META_WORDS = 8
+
+READ_RETRIES = 100
+
+
+def _ring_extend(buf: np.ndarray, total: int, rows: np.ndarray) -> int:
+    """Write rows after `total` records into ring `buf`; returns the new total."""
+    capacity = len(buf)
+    n = len(rows)
+    if n >= capacity:
+        rows = rows[n - capacity:]
+    start = (total + n - len(rows)) % capacity
+    first = min(len(rows), capacity - start)
+    buf[start:start + first] = rows[:first]
+    buf[:len(rows) - first] = rows[first:]
+    return total + n
+
+
+def _ring_latest(buf: np.ndarray, total: int, n: int) -> np.ndarray:
+    """Up to n newest rows of a ring, newest first (a copy of just those rows)."""
+    capacity = len(buf)
+    k = min(n, total, capacity)
+    return buf[(total - 1 - np.arange(k)) % capacity]
+
+
+class AnomalyState:
+    def __init__(
+        self,
+        per_sat_capacity: int = STATE_PER_SAT_CAPACITY,
+        fleet_capacity: int = STATE_FLEET_CAPACITY,
+        max_satellites: int = STATE_MAX_SATELLITES,
+        shared: bool = SHARED_STATE_ENABLED,
+        name: str = f"{SHARED_STATE_NAME}-anomalies",
+    ):
+        self.per_sat_capacity = per_sat_capacity
+        self.fleet_capacity = fleet_capacity
+        self.max_satellites = max_satellites
+
+        layout = [
+            ("meta", np.dtype("<u8"), (META_WORDS,)),
+            ("sat_table", np.dtype(NAME_DTYPE), (max_satellites,)),
+            ("issue_table", np.dtype(NAME_DTYPE), (MAX_ISSUES,)),
+            ("sat_totals", np.dtype("<u8"), (max_satellites,)),
+            ("fleet", RECORD_DTYPE, (fleet_capacity,)),
+            ("rings", RECORD_DTYPE, (max_satellites, per_sat_capacity)),
+        ]
+        size = sum(dt.itemsize * int(np.prod(shape)) for _, dt, shape in layout)
+        signature = f"anomaly-state/1/{per_sat_capacity}/{fleet_capacity}/{max_satellites}"
+        self._region = open_region(name, size, signature, shared)
+        self.shared = shared
+
+        offset = 0
+        for field, dt, shape in layout:
+            setattr(self, "_" + field, np.ndarray(shape, dtype=dt, buffer=self._region.buf, offset=offset))
+            offset += dt.itemsize * int(np.prod(shape))
+
+        # per-process caches of the append-only name tables
+        self._cache_lock = threading.Lock()
+        self._sats: Dict[str, int] = {}
+        self._sat_names: List[str] = []
+        self._issues: Dict[str, int] = {}
+        self._issue_names: List[str] = []
+        self._decoded: Dict[int, List[str]] = {}
+        self._overflow_warned = False
+        self._retries = 0
+
+        with self._region.lock():
+            for issue in threshold_rules.get(TELEMETRY_RULESET).issue_names:
+                self._issue_bit(issue)
+
+    # ----- name tables -----
+    def _refresh_names(self):
+        with self._cache_lock:
+            for i in range(len(self._sat_names), int(self._meta[N_SATS])):
+                name = self._sat_table[i].decode()
+                self._sats[name] = i
+                self._sat_names.append(name)
+            for i in range(len(self._issue_names), int(self._meta[N_ISSUES])):
+                name = self._issue_table[i].decode()
+                self._issues[name] = i
+                self._issue_names.append(name)
+
+    def _sat_index(self, satellite_id: str) -> Optional[int]:
+        """Index of a satellite, registering it if new (caller holds the region lock)."""
+        i = self._sats.get(satellite_id)
+        if i is not None:
+            return i
+        self._refresh_names()  # another worker may have registered it
+        i = self._sats.get(satellite_id)
+        if i is not None:
+            return i
+        raw = satellite_id.encode()
+        n = int(self._meta[N_SATS])
+        if n >= self.max_satellites or len(raw) > np.dtype(NAME_DTYPE).itemsize:
+            if not self._overflow_warned:
+                logger.warning(
+                    f"Anomaly state: cannot track satellite {satellite_id!r} "
+                    f"(table of {self.max_satellites} full or id too long); its records are not kept in memory"
+                )
+                self._overflow_warned = True
+            return None
+        self._sat_table[n] = raw
+        self._sat_totals[n] = 0
+        self._meta[N_SATS] = n + 1
+        self._refresh_names()
+        return n
+
+    def _issue_bit(self, name: str) -> Optional[int]:
+        bit = self._issues.get(name)
+        if bit is None:
+            self._refresh_names()
+            bit = self._issues.get(name)
+        if bit is None:
+            n = int(self._meta[N_ISSUES])
+            if n >= MAX_ISSUES:
+                return None  # mask full; the record keeps its known issues
+            self._issue_table[n] = name.encode()[:np.dtype(NAME_DTYPE).itemsize]
+            self._meta[N_ISSUES] = n + 1
+            self._refresh_names()
+            bit = n
+        return bit
+
+    def _issue_mask(self, issues: List[str]) -> int:
+        mask = 0
+        for name in issues:
+            bit = self._issue_bit(name)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def _issue_list(self, mask: int) -> List[str]:
+        names = self._decoded.get(mask)
+        if names is None:
+            names = [n for i, n in enumerate(self._issue_names) if mask >> i & 1]
+            if mask >> len(self._issue_names) == 0:  # fully decodable, safe to memoize
+                self._decoded[mask] = names
+        return list(names)
+
+    def _to_dicts(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        if len(rows) and (int(rows["sat"].max()) >= len(self._sat_names) or
+                          int(rows["issues"].max()) >> len(self._issue_names)):
+            self._refresh_names()
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(t, tz=timezone.utc).isoformat(),
+                "satellite_id": self._sat_names[sat],
+                "anomaly": {
+                    "severity": SEVERITIES[sev],
+                    "issues": self._issue_list(issues),
+                    "score": score,
+                },
+            }
+            for sat, t, score, sev, issues in zip(
+                rows["sat"].tolist(), rows["t"].tolist(), rows["score"].tolist(),
+                rows["severity"].tolist(), rows["issues"].tolist(),
+            )
+        ]
+
+    # ----- writes -----
+    def add(self, records: List[Dict[str, Any]], t: Optional[np.ndarray] = None):
+        """Append /telemetry-style records; t (epoch seconds) is derived from their timestamps if omitted."""
+        n = len(records)
+        if n == 0:
+            return
+        if t is None:
+            t = [epoch_seconds(parse_timestamp(r["timestamp"])) for r in records]
+        rows = np.empty(n, dtype=RECORD_DTYPE)
+        rows["t"] = t
+        rows["score"] = [r["anomaly"]["score"] for r in records]
+        rows["severity"] = [SEVERITY_CODES[r["anomaly"]["severity"]] for r in records]
+
+        with self._region.lock():
+            sats = [self._sat_index(r["satellite_id"]) for r in records]
+            if None in sats:
+                keep = np.array([s is not None for s in sats])
+                rows, records = rows[keep], [r for r, k in zip(records, keep) if k]
+                sats = [s for s in sats if s is not None]
+                if not records:
+                    return
+            rows["sat"] = sats
+            rows["issues"] = [self._issue_mask(r["anomaly"]["issues"]) for r in records]
+
+            if len(rows) > 1:
+                order = np.argsort(rows["sat"], kind="stable")
+                grouped = rows[order]
+                sat_ids, starts = np.unique(grouped["sat"], return_index=True)
+                groups = zip(sat_ids.tolist(), np.split(grouped, starts[1:]))
+            else:
+                groups = [(int(rows["sat"][0]), rows)]
+
+            meta = self._meta
+            meta[SEQ] += 1  # odd: write in progress
+            meta[FLEET_TOTAL] = _ring_extend(self._fleet, int(meta[FLEET_TOTAL]), rows)
+            for sat, chunk in groups:
+                self._sat_totals[sat] = _ring_extend(self._rings[sat], int(self._sat_totals[sat]), chunk)
+            meta[SEQ] += 1  # even: consistent again
+
+    # ----- reads -----
+    def _read(self, read):
+        """Run `read` (which copies out of the rings) until no write overlapped it."""
+        meta = self._meta
+        for _ in range(READ_RETRIES):
+            seq = int(meta[SEQ])
+            if seq & 1:
+                time.sleep(0)
+                continue
+            rows = read()
+            if int(meta[SEQ]) == seq:
+                return rows
+            self._retries += 1
+        with self._region.lock():  # a stream of writes kept interleaving; take the slow path
+            return read()
+
+    def latest(self, limit: int, satellite_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        if satellite_id is None:
+            rows = self._read(lambda: _ring_latest(self._fleet, int(self._meta[FLEET_TOTAL]), limit))
+        else:
+            sat = self._sats.get(satellite_id)
+            if sat is None:
+                self._refresh_names()
+                sat = self._sats.get(satellite_id)
+            if sat is None:
+                return []
+            rows = self._read(lambda: _ring_latest(self._rings[sat], int(self._sat_totals[sat]), limit))
+        return self._to_dicts(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "shared": self.shared,
+            "satellites": int(self._meta[N_SATS]),
+            "max_satellites": self.max_satellites,
+            "per_satellite_capacity": self.per_sat_capacity,
+            "fleet_capacity": self.fleet_capacity,
+            "records": int(self._meta[FLEET_TOTAL]),
+            "bytes": len(self._region.buf),
+            "read_retries": self._retries,
+        }
+
+    def close(self):
+        self._region.close()
+
+
+STATE = AnomalyState()
 
 def add_anomaly_record(record: dict):
-    LATEST_ANOMALIES.append(record)
+    STATE.add([record])
+    anomaly_feed.publish([record])
+
+def add_anomaly_records(records: list, t: Optional[np.ndarray] = None):
+    STATE.add(records, t)
+    anomaly_feed.publish(records)
 
-def get_latest_anomalies():
+def get_latest_anomalies(limit: int = 200, satellite_id: Optional[str] = None):
     # newest first
-    return list(LATEST_ANOMALIES)[::-1]
+    return STATE.latest(limit, satellite_id)
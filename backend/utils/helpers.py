@@ -0,0 +1,87 @@
+# backend/utils/helpers.py
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def parse_timestamp(ts: str) -> datetime:
+    """
+    Parse an ISO-8601 telemetry timestamp (accepts a trailing 'Z')
+    into a naive UTC datetime, the convention of our DateTime columns.
+    """
+    dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def epoch_seconds(dt: datetime) -> float:
+    """Seconds since the Unix epoch; naive datetimes are taken as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+# ----- per-satellite state rows -----
+class SatelliteIndex:
+    """
+    Satellite id -> row of an owner's per-satellite state arrays, assigned
+    in order of first appearance. When a new satellite does not fit,
+    grow(n) is called with the new capacity (at least double). Not
+    thread-safe: owners call it under their own lock.
+    """
+
+    def __init__(self, capacity: int, grow: Callable[[int], None]):
+        self.capacity = capacity
+        self._grow = grow
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, satellite_id: str) -> int:
+        return self._rows[satellite_id]
+
+    def get(self, satellite_id: str) -> Optional[int]:
+        return self._rows.get(satellite_id)
+
+    def rows(self, satellite_ids: Sequence[str]) -> np.ndarray:
+        """State row of each id (registering new ones), one lookup per distinct id."""
+        sats, inverse = np.unique(np.asarray(satellite_ids), return_inverse=True)
+        rows = np.empty(sats.size, dtype=np.int64)
+        for i, sat in enumerate(sats.tolist()):
+            row = self._rows.get(sat)
+            if row is None:
+                row = self._rows[sat] = len(self._rows)
+            rows[i] = row
+        if len(self._rows) > self.capacity:
+            self.capacity = max(len(self._rows), 2 * self.capacity)
+            self._grow(self.capacity)
+        return rows[inverse.reshape(-1)]
+
+
+def satellite_groups(rows: np.ndarray) -> List[np.ndarray]:
+    """Batch positions of each satellite (by state row), in batch order."""
+    order = np.argsort(rows, kind="stable")
+    sorted_rows = rows[order]
+    return np.split(order, np.flatnonzero(sorted_rows[1:] != sorted_rows[:-1]) + 1)
+
+
+def satellite_rounds(rows: np.ndarray, positions: Optional[np.ndarray] = None) -> List[np.ndarray]:
+    """
+    `positions` of a batch (all by default) split into rounds: round r
+    holds the r-th sample of every satellite, ordered by state row, so
+    that samples of one satellite are applied in batch order.
+    """
+    positions = np.arange(rows.size) if positions is None else np.asarray(positions)
+    if positions.size == 0:
+        return []
+    order = positions[np.argsort(rows[positions], kind="stable")]
+    sorted_rows = rows[order]
+    starts = np.flatnonzero(np.r_[True, sorted_rows[1:] != sorted_rows[:-1]])
+    counts = np.diff(np.r_[starts, order.size])
+    rank = np.arange(order.size) - np.repeat(starts, counts)
+    by_rank = np.argsort(rank, kind="stable")
+    bounds = np.searchsorted(rank[by_rank], np.arange(counts.max() + 1))
+    return [order[by_rank[lo:hi]] for lo, hi in zip(bounds[:-1], bounds[1:])]
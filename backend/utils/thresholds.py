@@ -0,0 +1,514 @@
+# backend/utils/thresholds.py
+"""
+Declarative threshold rules (file format in docs/threshold_rules.md),
+compiled into fused vectorized evaluators and hot-reloaded when the rule
+file changes.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.core.config import THRESHOLD_RULES_FILE, THRESHOLD_RULES_CHECK_S
+from backend.core.logger import logger
+
+try:
+    import yaml
+except ImportError:  # JSON rule files still work
+    yaml = None
+
+OPS = (">", ">=", "<", "<=")
+MAX_ISSUES = 64
+MASK_LUT_MAX_ISSUES = 12  # score/severity by whole-mask lookup up to 4096 entries
+FUSED_COMPARE_MAX = 8  # thresholds per column evaluated by comparisons, not searchsorted
+
+
+class RuleFormatError(ValueError):
+    """A rule file or ruleset definition is invalid."""
+
+
+# ----- derived columns -----
+def _sequential_mean(cols: List[np.ndarray]) -> np.ndarray:
+    acc = cols[0] + 0.0
+    for c in cols[1:]:
+        acc += c
+    acc /= len(cols)
+    return acc
+
+
+def _std(cols: List[np.ndarray]) -> np.ndarray:
+    # same operation order as np.std over a short row, so thresholds agree exactly
+    mean = _sequential_mean(cols)
+    var = np.zeros_like(mean)
+    for c in cols:
+        d = c - mean
+        var += d * d
+    var /= len(cols)
+    return np.sqrt(var, out=var)
+
+
+def _ratio(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return a / b
+
+
+_DERIVED_OPS = {
+    "mean": (None, _sequential_mean),
+    "std": (None, _std),
+    "min": (None, lambda cols: np.minimum.reduce(cols)),
+    "max": (None, lambda cols: np.maximum.reduce(cols)),
+    "sum": (None, lambda cols: np.add.reduce(cols)),
+    "diff": (2, lambda cols: cols[0] - cols[1]),
+    "absdiff": (2, lambda cols: np.abs(cols[0] - cols[1])),
+    "ratio": (2, lambda cols: _ratio(cols[0], cols[1])),
+}
+
+
+# ----- compiled form -----
+class _ColumnPlan:
+    """Every level on one column, fused into lookup tables over threshold buckets."""
+
+    __slots__ = ("column", "thresholds", "mask_lut", "score_lut", "count_lut", "_nan_check")
+
+    def __init__(self, column: str, levels: List[Tuple[int, str, float, int, float]], mask_dtype: np.dtype):
+        # levels: (rule index, op, value, bit, score) in definition order
+        self.column = column
+        self.thresholds = np.unique(np.array([lv[2] for lv in levels], dtype=float))
+        m = self.thresholds.size
+
+        # Bucket b = #(T < x) + #(T <= x): even b = strictly between thresholds,
+        # odd b = equal to T[b // 2]; 2m + 1 is reserved for NaN (matches nothing).
+        n_buckets = 2 * m + 2
+        self.mask_lut = np.zeros(n_buckets, dtype=mask_dtype)
+        self.score_lut = np.zeros(n_buckets, dtype=float)
+        self.count_lut = np.zeros(n_buckets, dtype=np.uint8)
+        for b in range(2 * m + 1):
+            kl = b // 2
+            kr = b - kl
+            fired = set()
+            for rule, op, value, bit, score in levels:
+                if rule in fired:
+                    continue
+                j = int(np.searchsorted(self.thresholds, value))
+                hit = {">": j < kl, ">=": j < kr, "<": j >= kr, "<=": j >= kl}[op]
+                if hit:
+                    fired.add(rule)
+                    self.mask_lut[b] |= 1 << bit
+                    self.score_lut[b] += score
+                    self.count_lut[b] += 1
+
+        # NaN lands in bucket 0 (compared) or 2m (searched); only re-route it
+        # when that bucket fires something
+        nan_bucket = 0 if m <= FUSED_COMPARE_MAX else 2 * m
+        self._nan_check = bool(self.mask_lut[nan_bucket])
+
+    def apply(self, x: np.ndarray) -> np.ndarray:
+        """Bucket index of every value of x."""
+        if self.thresholds.size <= FUSED_COMPARE_MAX:
+            # a few thresholds: straight comparisons beat a binary search
+            x = np.ascontiguousarray(x)
+            b = np.zeros(x.shape, dtype=np.uint8)
+            for t in self.thresholds.tolist():
+                b += (x > t).view(np.uint8)
+                b += (x >= t).view(np.uint8)
+        else:
+            b = np.searchsorted(self.thresholds, x, "left")
+            b += np.searchsorted(self.thresholds, x, "right")
+        if self._nan_check:
+            nan = np.isnan(x)
+            if nan.any():
+                b[nan] = self.mask_lut.size - 1
+        return b
+
+
+class RuleSet:
+    """One compiled ruleset; evaluate() scores any number of rows at once."""
+
+    def __init__(self, name: str, spec: Mapping[str, Any]):
+        if not isinstance(spec, Mapping):
+            raise RuleFormatError(f"ruleset '{name}' must be a mapping")
+        self.name = name
+        self.nominal_message = str(spec.get("nominal_message", "nominal"))
+
+        # derived columns, computed in order (later ones may use earlier ones)
+        self.derived: List[Tuple[str, Any, List[str]]] = []
+        for col, d in (spec.get("derived") or {}).items():
+            op = d.get("op") if isinstance(d, Mapping) else None
+            if op not in _DERIVED_OPS:
+                raise RuleFormatError(f"{name}.derived.{col}: op must be one of {sorted(_DERIVED_OPS)}")
+            of = d.get("of")
+            of = [of] if isinstance(of, str) else list(of or [])
+            arity = _DERIVED_OPS[op][0]
+            if not of or (arity and len(of) != arity):
+                raise RuleFormatError(f"{name}.derived.{col}: '{op}' takes {arity or 'one or more'} columns")
+            self.derived.append((col, _DERIVED_OPS[op][1], of))
+
+        # rules -> levels, one issue bit per level
+        self.issue_names: List[str] = []
+        self.messages: List[Optional[str]] = []
+        self.issue_columns: List[str] = []
+        self.issue_scores: List[float] = []
+        per_column: Dict[str, List[Tuple[int, str, float, int, float]]] = {}
+        rules = spec.get("rules") or []
+        if not isinstance(rules, list):
+            raise RuleFormatError(f"{name}.rules must be a list")
+        for r, rule in enumerate(rules):
+            where = f"{name}.rules[{r}]"
+            column = rule.get("column") if isinstance(rule, Mapping) else None
+            if not isinstance(column, str):
+                raise RuleFormatError(f"{where}: 'column' is required")
+            levels = rule.get("levels", [rule])
+            for k, level in enumerate(levels):
+                op, value = level.get("op"), level.get("value")
+                if op not in OPS:
+                    raise RuleFormatError(f"{where}.levels[{k}]: op must be one of {OPS}")
+                if not isinstance(value, (int, float)) or isinstance(value, bool) or math.isnan(value):
+                    raise RuleFormatError(f"{where}.levels[{k}]: 'value' must be a number")
+                issue = str(level.get("issue") or rule.get("issue") or rule.get("name") or "")
+                if not issue or issue in self.issue_names:
+                    raise RuleFormatError(f"{where}.levels[{k}]: issue name missing or not unique: '{issue}'")
+                score = float(level.get("score", 0.0))
+                bit = len(self.issue_names)
+                self.issue_names.append(issue)
+                self.messages.append(level.get("message"))
+                self.issue_columns.append(column)
+                self.issue_scores.append(score)
+                per_column.setdefault(column, []).append((r, op, float(value), bit, score))
+        if len(self.issue_names) > MAX_ISSUES:
+            raise RuleFormatError(f"ruleset '{name}' has {len(self.issue_names)} issues (max {MAX_ISSUES})")
+        self.mask_dtype = np.dtype(
+            next(t for t, bits in ((np.uint8, 8), (np.uint16, 16), (np.uint32, 32), (np.uint64, 64))
+                 if len(self.issue_names) <= bits)
+        )
+        self.plans = [_ColumnPlan(col, levels, self.mask_dtype) for col, levels in per_column.items()]
+
+        cap = (spec.get("score") or {}).get("cap", 1.0)
+        self.score_cap = None if cap is None else float(cap)
+
+        sev = spec.get("severity")
+        if sev:
+            by = sev.get("by", "issues")
+            if by not in ("issues", "score"):
+                raise RuleFormatError(f"{name}.severity.by must be 'issues' or 'score'")
+            tiers = sorted((float(v), str(k)) for k, v in (sev.get("tiers") or {}).items())
+            self.severity_by = by
+            self.severity_names = (str(sev.get("normal", "normal")),) + tuple(k for _, k in tiers)
+            self._tier_values = np.array([v for v, _ in tiers], dtype=float)
+        else:
+            self.severity_by = None
+            self.severity_names = ("normal",)
+            self._tier_values = np.empty(0)
+
+        # small rulesets: score and severity as a function of the full mask
+        self._score_by_mask = self._severity_by_mask = None
+        if len(self.issue_names) <= MASK_LUT_MAX_ISSUES:
+            masks = np.arange(1 << len(self.issue_names))
+            scores = np.zeros(masks.size)
+            for bit, s in enumerate(self.issue_scores):
+                scores += np.where(masks >> bit & 1, s, 0.0)
+            counts = np.array([bin(m).count("1") for m in masks.tolist()], dtype=float)
+            self._score_by_mask = self._cap(scores)
+            self._severity_by_mask = self._severity(counts, self._score_by_mask)
+
+    @property
+    def columns(self) -> List[str]:
+        """Input columns the ruleset reads (derived ones excluded)."""
+        derived = {d[0] for d in self.derived}
+        needed = [c for _, _, of in self.derived for c in of] + [p.column for p in self.plans]
+        return [c for c in dict.fromkeys(needed) if c not in derived]
+
+    def _cap(self, scores: np.ndarray) -> np.ndarray:
+        return scores if self.score_cap is None else np.minimum(self.score_cap, scores)
+
+    def _severity(self, counts: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        v = counts if self.severity_by == "issues" else scores
+        return np.searchsorted(self._tier_values, v, "right").astype(np.uint8)
+
+    # ----- evaluation -----
+    def evaluate(self, columns: Mapping[str, Any], n: Optional[int] = None) -> "RuleResult":
+        """
+        Score rows given as {column name: values}. Values are arrays of one
+        length (or scalars, broadcast); a missing column or None means
+        "no data" and matches no rule.
+        """
+        if n is None:
+            sizes = [np.size(v) for v in columns.values() if v is not None and np.ndim(v)]
+            n = sizes[0] if sizes else 1
+        cols: Dict[str, np.ndarray] = {}
+
+        def col(name: str) -> np.ndarray:
+            if name not in cols:
+                v = columns.get(name)
+                cols[name] = np.full(n, np.nan) if v is None else np.broadcast_to(np.asarray(v, dtype=float), (n,))
+            return cols[name]
+
+        for name, fn, of in self.derived:
+            cols[name] = fn([col(c) for c in of])
+
+        mask = np.zeros(n, dtype=self.mask_dtype)
+        score = count = None
+        if self._score_by_mask is None:
+            score = np.zeros(n)
+            count = np.zeros(n)
+        for plan in self.plans:
+            b = plan.apply(col(plan.column))
+            mask |= plan.mask_lut[b]
+            if score is not None:
+                score += plan.score_lut[b]
+                count += plan.count_lut[b]
+
+        if score is None:
+            score = self._score_by_mask[mask]
+            severity = self._severity_by_mask[mask]
+        else:
+            score = self._cap(score)
+            severity = self._severity(count, score)
+        return RuleResult(self, mask, score, severity, cols)
+
+    def evaluate_matrix(
+        self,
+        features: np.ndarray,
+        names: Sequence[str],
+        extras: Sequence[Tuple[Optional[np.ndarray], Sequence[str]]] = (),
+    ) -> "RuleResult":
+        """
+        Score the rows of a 2-D matrix whose columns are `names`, optionally
+        with more matrices of the same rows: `extras` is a sequence of
+        (matrix, column names). A matrix of None makes its columns "no data".
+        Only the columns the rules read are touched.
+        """
+        blocks = [(np.asarray(features, dtype=float), names)]
+        absent = set()
+        for extra, extra_names in extras:
+            if extra is None:
+                absent.update(extra_names)
+            else:
+                blocks.append((np.asarray(extra, dtype=float), extra_names))
+        n = blocks[0][0].shape[0]
+        index = {}
+        for b, (block, block_names) in enumerate(blocks):
+            if block.ndim != 2 or block.shape != (n, len(block_names)):
+                raise ValueError(f"expected an ({n}, {len(block_names)}) matrix, got shape {block.shape}")
+            index.update({c: (b, j) for j, c in enumerate(block_names)})
+        missing = [c for c in self.columns if c not in index and c not in absent]
+        if missing:
+            raise RuleFormatError(f"ruleset '{self.name}' reads columns not in the matrix: {missing}")
+        return self.evaluate(
+            {c: blocks[index[c][0]][0][:, index[c][1]] for c in self.columns if c in index}, n=n
+        )
+
+    def explain(self, row: Mapping[str, Any]) -> Tuple[float, str]:
+        """(score, message) of a single sample, for the per-sample detectors."""
+        result = self.evaluate(row, n=1)
+        return float(result.score[0]), result.message(0)
+
+
+class RuleResult:
+    """
+    Column-wise outcome of RuleSet.evaluate:
+    - issues:   (N,) unsigned ints, bit i set = ruleset.issue_names[i]
+    - score:    (N,) float64
+    - severity: (N,) uint8 code into ruleset.severity_names
+
+    Per-row names, dicts and messages are only built on request.
+    """
+
+    __slots__ = ("ruleset", "issues", "score", "severity", "_columns")
+
+    def __init__(self, ruleset: RuleSet, issues: np.ndarray, score: np.ndarray,
+                 severity: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.ruleset = ruleset
+        self.issues = issues
+        self.score = score
+        self.severity = severity
+        self._columns = columns
+
+    def __len__(self) -> int:
+        return self.issues.shape[0]
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return {
+            "severity": self.ruleset.severity_names[self.severity[i]],
+            "issues": self.issue_list(int(self.issues[i])),
+            "score": float(self.score[i]),
+        }
+
+    def issue_list(self, mask: int) -> List[str]:
+        names = self.ruleset.issue_names
+        return [names[bit] for bit in range(len(names)) if mask >> bit & 1]
+
+    def issue_flags(self) -> np.ndarray:
+        """(N, n_issues) bool, column i = rows with issue i."""
+        bits = np.arange(len(self.ruleset.issue_names), dtype=self.issues.dtype)
+        return (self.issues[:, None] >> bits) & 1 == 1
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """{"severity", "issues", "score"} per row."""
+        names = self.ruleset.severity_names
+        lists: Dict[int, Tuple[str, ...]] = {}
+        out = []
+        for m, sev, score in zip(self.issues.tolist(), self.severity.tolist(), self.score.tolist()):
+            if m not in lists:
+                lists[m] = tuple(self.issue_list(m))
+            out.append({"severity": names[sev], "issues": list(lists[m]), "score": score})
+        return out
+
+    def message(self, i: int) -> str:
+        """Level messages of row i joined with "; ", or the ruleset's nominal message."""
+        mask = int(self.issues[i])
+        if not mask:
+            return self.ruleset.nominal_message
+        row = {name: float(v[i]) for name, v in self._columns.items()}
+        parts = []
+        for bit, issue in enumerate(self.ruleset.issue_names):
+            if mask >> bit & 1:
+                template = self.ruleset.messages[bit] or issue
+                parts.append(template.format(value=row[self.ruleset.issue_columns[bit]], **row))
+        return "; ".join(parts)
+
+
+def compile_rules(spec: Mapping[str, Any]) -> Dict[str, RuleSet]:
+    """Compile a parsed rule file ({ruleset name: definition}) into RuleSets."""
+    if not isinstance(spec, Mapping):
+        raise RuleFormatError("rule file must map ruleset names to definitions")
+    rulesets = {}
+    for name, body in spec.items():
+        try:
+            rulesets[str(name)] = RuleSet(str(name), body)
+        except RuleFormatError:
+            raise
+        except Exception as e:  # e.g. a non-numeric score or tier
+            raise RuleFormatError(f"ruleset '{name}': {type(e).__name__}: {e}") from e
+    return rulesets
+
+
+def check_inputs(rulesets: Mapping[str, RuleSet], inputs: Mapping[str, Sequence[str]]):
+    """Raise RuleFormatError if a ruleset is missing or reads a column its caller does not provide."""
+    for name, columns in inputs.items():
+        if name not in rulesets:
+            raise RuleFormatError(f"ruleset '{name}' is missing")
+        unknown = [c for c in rulesets[name].columns if c not in columns]
+        if unknown:
+            raise RuleFormatError(f"ruleset '{name}' reads unknown columns {unknown}")
+
+
+def load_rules(path: str) -> Dict[str, RuleSet]:
+    """Parse and compile a YAML (.yaml/.yml) or JSON rule file."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:  # JSON is valid YAML, so JSON-styled files still load
+                spec = json.loads(text)
+            else:
+                spec = yaml.safe_load(text)
+        else:
+            spec = json.loads(text)
+    except Exception as e:
+        raise RuleFormatError(f"{path}: {e}") from e
+    return compile_rules(spec or {})
+
+
+# ----- live rule registry -----
+class ThresholdRules:
+    def __init__(self, path: str = THRESHOLD_RULES_FILE, check_interval_s: float = THRESHOLD_RULES_CHECK_S):
+        self.path = path
+        self.check_interval_s = check_interval_s
+        self._lock = threading.Lock()
+        self._rulesets: Dict[str, RuleSet] = {}
+        self._inputs: Dict[str, frozenset] = {}  # ruleset -> columns its caller provides
+        self._mtime: Optional[float] = None  # of the last file tried, loaded or not
+        self._next_check = 0.0
+
+        # metrics
+        self._version = 0
+        self._reloads = 0
+        self._failures = 0
+        self._last_error: Optional[str] = None
+
+        self.reload(strict=True)
+
+    def reload(self, strict: bool = False) -> bool:
+        """
+        Compile the rule file and swap it in. On failure the current rules
+        stay (or the error is raised, with strict=True). Returns True if
+        new rules were installed.
+        """
+        with self._lock:
+            mtime = None
+            try:
+                mtime = os.stat(self.path).st_mtime
+                rulesets = load_rules(self.path)
+                check_inputs(rulesets, self._inputs)
+            except Exception as e:
+                self._failures += 1
+                self._last_error = str(e)
+                if mtime is not None:
+                    self._mtime = mtime  # don't retry this file until it changes again
+                if strict:
+                    raise
+                logger.error(f"Threshold rules not reloaded, keeping version {self._version}: {e}")
+                return False
+            self._rulesets = rulesets  # one assignment: readers see old or new, never a mix
+            self._mtime = mtime
+            self._version += 1
+            self._reloads += 1
+            self._last_error = None
+        logger.info(f"Threshold rules version {self._version} loaded from {self.path}: {sorted(rulesets)}")
+        return True
+
+    def declare_inputs(self, name: str, columns: Sequence[str]):
+        """
+        Record the columns the caller passes to ruleset `name`. Rule files
+        whose `name` rules read other columns are rejected from now on; the
+        current rules are checked right away (RuleFormatError).
+        """
+        with self._lock:
+            inputs = {name: frozenset(columns)}
+            check_inputs(self._rulesets, inputs)
+            self._inputs.update(inputs)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval_s
+        try:
+            changed = os.stat(self.path).st_mtime != self._mtime
+        except OSError:
+            changed = False  # file briefly missing while being replaced; keep the rules
+        if changed:
+            self.reload()
+
+    @property
+    def version(self) -> int:
+        """Bumped every time new rules are installed."""
+        self._maybe_reload()
+        return self._version
+
+    def get(self, name: str) -> RuleSet:
+        """Current compiled ruleset `name` (KeyError if the file has none)."""
+        self._maybe_reload()
+        return self._rulesets[name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "version": self._version,
+            "reloads": self._reloads,
+            "failures": self._failures,
+            "last_error": self._last_error,
+            "rulesets": {
+                name: {"issues": len(rs.issue_names), "columns": len(rs.plans)}
+                for name, rs in self._rulesets.items()
+            },
+        }
+
+
+# Rules shared by the anomaly engine and the detectors in backend/models
+threshold_rules = ThresholdRules()
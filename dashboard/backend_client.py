@@ -1,7 +1,12 @@
 # dashboard/backend_client.py
 
 import os
+import json
+import time
+import threading
 import requests
+from collections import deque
+from datetime import datetime, timezone
 from typing import Dict, Any, List
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
@@ -21,3 +26,100 @@ def fetch_anomaly_history() -> List[Dict[str, Any]]:
     resp = requests.get(url, timeout=5)
     resp.raise_for_status()
     return resp.json()
+
+
+def _record_key(record: Dict[str, Any]):
+    """(satellite_id, epoch seconds): the same record as served by /latest and by the stream."""
+    ts = datetime.fromisoformat(str(record.get("timestamp")).replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return record.get("satellite_id"), ts.timestamp()
+
+
+def _flatten(record: Dict[str, Any]) -> Dict[str, Any]:
+    """/latest-style record -> /history-style row."""
+    ann = record.get("anomaly", {})
+    return {
+        "timestamp": record.get("timestamp"),
+        "satellite_id": record.get("satellite_id"),
+        "severity": ann.get("severity", "normal"),
+        "issues": ann.get("issues", []),
+        "score": ann.get("score", 0.0),
+    }
+
+
+class AnomalyFeedClient:
+    """
+    Keeps a local copy of recent anomalies, fed by the backend's
+    /anomalies/stream server-sent events.
+
+    One instance is shared by every dashboard session (see streamlit_app.py),
+    so backend load does not grow with the number of open browsers: the
+    backend is queried once to seed the buffers, then only pushes deltas.
+    """
+
+    def __init__(self, base_url: str = API_BASE_URL, latest_size: int = 200, history_size: int = 500):
+        self.base_url = base_url
+        self._latest = deque(maxlen=latest_size)
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._seeded = set()  # keys of seed records the stream may still repeat
+        self.connected = False
+        self._thread = threading.Thread(target=self._run, name="anomaly-feed", daemon=True)
+        self._thread.start()
+
+    def latest(self) -> List[Dict[str, Any]]:
+        # newest first, like /anomalies/latest
+        with self._lock:
+            return list(self._latest)[::-1]
+
+    def history(self) -> List[Dict[str, Any]]:
+        # newest first, like /anomalies/history
+        with self._lock:
+            return list(self._history)[::-1]
+
+    def _seed(self):
+        latest = requests.get(f"{self.base_url}/anomalies/latest", timeout=4).json().get("data", [])
+        history = requests.get(f"{self.base_url}/anomalies/history?limit=200", timeout=4).json().get("data", [])
+        with self._lock:
+            self._latest.clear()
+            self._latest.extend(reversed(latest))
+            self._history.clear()
+            self._history.extend(reversed(history))
+            self._seeded = {_record_key(r) for r in latest}
+
+    def _append(self, record: Dict[str, Any]):
+        with self._lock:
+            if self._seeded:
+                # the stream opens with whatever was published between subscribing
+                # and the snapshot; skip those until the first record that is new
+                if _record_key(record) in self._seeded:
+                    return
+                self._seeded = set()
+            self._latest.append(record)
+            self._history.append(_flatten(record))
+
+    def _run(self):
+        backoff = 1.0
+        while True:
+            try:
+                with requests.get(f"{self.base_url}/anomalies/stream", stream=True, timeout=(4, 60)) as resp:
+                    resp.raise_for_status()
+                    # seed after subscribing so nothing falls between snapshot and stream
+                    self._seed()
+                    self.connected = True
+                    backoff = 1.0
+                    data = []
+                    for line in resp.iter_lines(decode_unicode=True):
+                        if line is None:
+                            continue
+                        if line.startswith("data:"):
+                            data.append(line[5:].strip())
+                        elif line == "" and data:
+                            self._append(json.loads("\n".join(data)))
+                            data = []
+            except Exception:
+                pass
+            self.connected = False
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
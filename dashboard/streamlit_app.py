@@ -3,45 +3,30 @@ import time
 import requests
 import pandas as pd
 import streamlit as st
-from backend_client import send_telemetry_sample, fetch_anomaly_history
+from streamlit_autorefresh import st_autorefresh
+from backend_client import send_telemetry_sample, fetch_anomaly_history, AnomalyFeedClient
 from components.alert_cards import render_alert_card
 from components.health_panel import render_health_panel
 from components.live_plots import render_score_trend, render_issue_distribution
 from components.orbit_visualizer import render_orbit_visualizer
 
 BASE_URL = "http://127.0.0.1:8000"
-LATEST_ENDPOINT = f"{BASE_URL}/anomalies/latest"
-HISTORY_ENDPOINT = f"{BASE_URL}/anomalies/history?limit=500"
 
 st.set_page_config(page_title="🛰 Satellite Anomaly Detector", layout="wide")
 
 st.title("🛰 Satellite Anomaly Detector — Mission Dashboard")
 st.markdown("Live telemetry → anomaly pipeline. Use controls on the right to filter/playback.")
 
-# fetch functions
-@st.cache_data(ttl=3)
-def fetch_latest():
-    try:
-        r = requests.get(LATEST_ENDPOINT, timeout=2)
-        return r.json().get("data", []) if r.ok else []
-    except Exception:
-        return []
-
-@st.cache_data(ttl=5)
-def fetch_history():
-    try:
-        r = requests.get(HISTORY_ENDPOINT, timeout=4)
-        data = r.json().get("data", []) if r.ok else []
-        # normalize issues as lists
-        for item in data:
-            if isinstance(item.get("issues"), str):
-                item["issues"] = item["issues"].split(",") if item["issues"] else []
-        return data
-    except Exception:
-        return []
+# one push subscription per dashboard process, shared by all browser sessions
+@st.cache_resource
+def get_feed():
+    return AnomalyFeedClient(BASE_URL)
 
-latest = fetch_latest()
-history = fetch_history()
+feed = get_feed()
+# reruns only re-read the local feed buffers; no backend requests
+st_autorefresh(interval=4000, key="feed_refresh")
+latest = feed.latest()
+history = feed.history()
 
 # build dataframe for UI controls
 df_hist = pd.DataFrame(history)
@@ -67,6 +52,7 @@ with st.sidebar:
         slider_index = 0
     st.markdown("---")
     st.write("Auto-refresh every ~4 seconds")
+    st.write("Live feed: " + ("connected" if feed.connected else "reconnecting..."))
 
 # MAIN layout
 col1, col2 = st.columns([3,1])
@@ -0,0 +1,77 @@
+"""
+Benchmark: JSON vs columnar telemetry decoding.
+
+Compares the CPU cost of turning a payload into the (N, 15) feature matrix:
+- JSON:     json.loads -> Telemetry models -> preprocess_telemetry_batch
+- NPZ/NPY:  decode_columnar (column arrays stacked directly)
+
+Usage (from project root):
+    python -m scripts.bench_columnar_ingest [n_rows ...]
+"""
+
+import json
+import sys
+import time
+
+import numpy as np
+
+from backend.api.routes.telemetry import Telemetry
+from backend.services.preprocess import FEATURE_FIELDS, preprocess_telemetry_batch
+from backend.services.columnar import (
+    decode_columnar, encode_npz, encode_npy, NPZ_CONTENT_TYPE, NPY_CONTENT_TYPE,
+)
+
+
+def make_columns(n: int) -> dict:
+    rng = np.random.default_rng(0)
+    cols = {name: rng.normal(50.0, 20.0, n) for name in FEATURE_FIELDS}
+    cols["timestamp"] = np.array(
+        [f"2025-01-01T00:{(i // 60) % 60:02d}:{i % 60:02d}+00:00" for i in range(n)]
+    )
+    cols["satellite_id"] = np.array([f"SAT-{i % 500}" for i in range(n)])
+    return cols
+
+
+def to_json(cols: dict) -> bytes:
+    names = list(cols)
+    rows = zip(*(cols[name].tolist() for name in names))
+    return json.dumps([dict(zip(names, r)) for r in rows]).encode()
+
+
+def json_path(body: bytes) -> np.ndarray:
+    samples = [Telemetry(**s) for s in json.loads(body)]
+    return preprocess_telemetry_batch(samples)
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'format':>6} {'bytes':>11} {'ms':>9} {'rows/s':>12}")
+    for n in sizes:
+        cols = make_columns(n)
+        payloads = {
+            "json": (to_json(cols), json_path),
+            "npz": (encode_npz(cols), lambda b: decode_columnar(b, NPZ_CONTENT_TYPE)),
+            "npy": (encode_npy(cols), lambda b: decode_columnar(b, NPY_CONTENT_TYPE)),
+        }
+        reference = None
+        for fmt, (body, decode) in payloads.items():
+            out = decode(body)
+            features = out if isinstance(out, np.ndarray) else out[2]
+            if reference is None:
+                reference = features
+            assert np.allclose(features, reference), f"{fmt} decoded different features"
+
+            secs = best_of(lambda: decode(body))
+            print(f"{n:>8} {fmt:>6} {len(body):>11} {secs * 1000:>9.2f} {n / secs:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
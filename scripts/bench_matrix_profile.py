@@ -0,0 +1,111 @@
+"""
+Benchmark: streaming matrix-profile discords (backend/services/matrix_profile.py)
+against recomputing each distance profile with MASS, per sample, one
+satellite at a time, as a run and as fleet ticks. Checks the scores first.
+
+Usage (from project root):
+    python -m scripts.bench_matrix_profile [window ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from backend.core.config import MP_SUBSEQ
+from backend.services.matrix_profile import MatrixProfileDiscords, distance_profile, sliding_moments
+from backend.services.preprocess import FEATURE_FIELDS, N_FEATURES
+
+CHANNELS = [FEATURE_FIELDS.index(c) for c in ("comms_rssi", "comms_snr", "comms_packet_loss")]
+FLEET = 100
+CHECK_SAMPLES = 50
+
+
+def make_features(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    features = np.zeros((n, N_FEATURES))
+    features[:, CHANNELS[0]] = rng.normal(-80.0, 2.0, n)
+    features[:, CHANNELS[1]] = rng.normal(12.0, 1.5, n)
+    features[:, CHANNELS[2]] = np.maximum(rng.normal(0.01, 0.003, n), 0.0)
+    for start in rng.integers(0, n - 30, n // 2000 + 1):
+        features[start:start + 20, CHANNELS] += (-12.0, -8.0, 0.25)
+    return features
+
+
+def from_scratch(series: np.ndarray, m: int, window: int) -> float:
+    """Score of the last sample of `series` (one channel), recomputed over its window."""
+    w = series[-window:]
+    d = distance_profile(w[-m:], w)[:-(m // 2)]
+    _, var = sliding_moments(w - w.mean(), m)
+    return float(d.min() / np.sqrt(2.0 * m * var.mean()))
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    windows = [int(a) for a in sys.argv[1:]] or [256, 512, 1024, 2048, 4096, 8192]
+    m = MP_SUBSEQ
+    print(f"subsequence {m}; microseconds per sample")
+    print(f"{'window':>8} {'mass':>10} {'incremental':>12} {'run':>10} {'fleet tick':>11} {'max |diff|':>11}")
+    for window in windows:
+        n = 2 * window
+        features = make_features(n)
+        n_timed = min(window, 2000)
+
+        # warm the window, then check the next samples against the from-scratch scores
+        mp = MatrixProfileDiscords(window=window, subsequence=m)
+        mp.update(["SAT"] * (n - CHECK_SAMPLES), features[:n - CHECK_SAMPLES])
+        diff = 0.0
+        for i in range(n - CHECK_SAMPLES, n):
+            got = mp.update(["SAT"], features[i:i + 1])[0]
+            want = [from_scratch(features[:i + 1, c], m, window) for c in CHANNELS]
+            diff = max(diff, float(np.max(np.abs(got - want))))
+
+        def mass():
+            for i in range(n - n_timed, n):
+                for c in CHANNELS:
+                    from_scratch(features[:i + 1, c], m, window)
+
+        def incremental():
+            mp = MatrixProfileDiscords(window=window, subsequence=m)
+            mp.update(["SAT"] * (n - n_timed), features[:n - n_timed])
+            t0 = time.perf_counter()
+            for i in range(n - n_timed, n):
+                mp.update(["SAT"], features[i:i + 1])
+            return time.perf_counter() - t0
+
+        def run():
+            mp = MatrixProfileDiscords(window=window, subsequence=m)
+            mp.update(["SAT"] * (n - n_timed), features[:n - n_timed])
+            t0 = time.perf_counter()
+            mp.update(["SAT"] * n_timed, features[n - n_timed:])
+            return time.perf_counter() - t0
+
+        def fleet():
+            mp = MatrixProfileDiscords(window=window, subsequence=m, initial_satellites=FLEET)
+            ids = [f"SAT-{s}" for s in range(FLEET)]
+            # the state arrays are full size from the first sample, so a few samples are enough
+            for t in range(4 * m):
+                mp.update(ids, np.repeat(features[t:t + 1], FLEET, axis=0))
+            t0 = time.perf_counter()
+            for t in range(4 * m, 4 * m + 20):
+                mp.update(ids, np.repeat(features[t:t + 1], FLEET, axis=0))
+            return (time.perf_counter() - t0) / 20
+
+        t_mass = best_of(mass, repeat=1) / n_timed
+        t_inc = min(incremental() for _ in range(3)) / n_timed
+        t_run = min(run() for _ in range(3)) / n_timed
+        t_fleet = fleet() / FLEET
+        print(f"{window:>8} {t_mass * 1e6:>10.1f} {t_inc * 1e6:>12.1f} {t_run * 1e6:>10.1f} "
+              f"{t_fleet * 1e6:>11.1f} {diff:>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: fleet orbit propagation (backend/models/fleet_propagator.py),
+per-object RK4 stepping vs propagate_kepler and propagate_rk4 over the
+whole fleet, plus their position error against RK4 with 1 s steps.
+
+Usage (from project root):
+    python -m scripts.bench_propagator [n_satellites ...]
+"""
+
+import math
+import sys
+import time
+
+import numpy as np
+
+from backend.core.config import ORBIT_RK4_STEP_S
+from backend.models.fleet_propagator import MU_EARTH, acceleration, propagate_kepler, propagate_rk4
+
+DT = 5.0
+ORBIT_S = 5800.0
+PER_OBJECT_MAX = 2000  # satellites timed one by one; the rest is extrapolated
+
+
+def random_states(n: int, seed: int = 0) -> np.ndarray:
+    """Near-circular LEO orbits with random planes and phases."""
+    rng = np.random.default_rng(seed)
+    r = rng.uniform(6700.0, 7800.0, n)
+    direction = rng.normal(size=(n, 3))
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    normal = np.cross(direction, rng.normal(size=(n, 3)))
+    normal /= np.linalg.norm(normal, axis=1, keepdims=True)
+    speed = np.sqrt(MU_EARTH / r) * rng.uniform(0.98, 1.02, n)
+    return np.concatenate([r[:, None] * direction, speed[:, None] * np.cross(normal, direction)], axis=1)
+
+
+def rk4_one(state: list, dt: float, step_s: float) -> list:
+    steps = max(1, math.ceil(abs(dt) / step_s))
+    h = dt / steps
+
+    def deriv(y):
+        return y[3:] + acceleration(np.array(y[:3])).tolist()
+
+    y = list(state)
+    for _ in range(steps):
+        k1 = deriv(y)
+        k2 = deriv([a + 0.5 * h * b for a, b in zip(y, k1)])
+        k3 = deriv([a + 0.5 * h * b for a, b in zip(y, k2)])
+        k4 = deriv([a + h * b for a, b in zip(y, k3)])
+        y = [a + h / 6.0 * (b1 + 2 * b2 + 2 * b3 + b4) for a, b1, b2, b3, b4 in zip(y, k1, k2, k3, k4)]
+    return y
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def max_error(x: np.ndarray, dt: float) -> tuple:
+    t = np.full(x.shape[0], dt)
+    ref = propagate_rk4(x, t, step_s=1.0)
+    err = lambda y: float(np.max(np.linalg.norm(y[:, :3] - ref[:, :3], axis=1)))
+    return err(propagate_kepler(x, t)), err(propagate_rk4(x, t))
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [100, 1000, 10000, 100000]
+    print(f"dt {DT:g} s, RK4 step {ORBIT_RK4_STEP_S:g} s; microseconds per satellite")
+    print(f"{'sats':>8} {'per-object':>11} {'kepler':>9} {'rk4':>9}")
+    for n in sizes:
+        x = random_states(n)
+        dt = np.full(n, DT)
+        timed = x[:min(n, PER_OBJECT_MAX)].tolist()
+        t_obj = best_of(lambda: [rk4_one(s, DT, ORBIT_RK4_STEP_S) for s in timed], repeat=1) / len(timed)
+        t_kep = best_of(lambda: propagate_kepler(x, dt)) / n
+        t_rk4 = best_of(lambda: propagate_rk4(x, dt)) / n
+        print(f"{n:>8} {t_obj * 1e6:>11.1f} {t_kep * 1e6:>9.2f} {t_rk4 * 1e6:>9.2f}")
+
+    x = random_states(1000, seed=1)
+    for dt in (DT, ORBIT_S):
+        kep, rk4 = max_error(x, dt)
+        print(f"max position error vs RK4 (1 s steps) after {dt:g} s: kepler {kep:.3g} km, rk4 {rk4:.3g} km")
+
+
+if __name__ == "__main__":
+    main()
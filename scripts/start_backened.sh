@@ -5,5 +5,5 @@ cd "$(dirname "$0")/.."
 uvicorn api.main:app --host 0.0.0.0 --port 8000 --reload
 # to run without reload, use:
 # uvicorn api.main:app --host
-# to run with multiple workers, use:
-# uvicorn api.main:app --host
+# to run with multiple workers (shared state, no raw store or rollups), use:
+# WEB_CONCURRENCY=4 uvicorn api.main:app --host 0.0.0.0 --port 8000
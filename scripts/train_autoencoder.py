@@ -0,0 +1,78 @@
+"""
+Train the dense telemetry autoencoder with Keras on healthy simulated
+telemetry (or an (N, 15) .npy matrix) and export it for NumPy inference.
+--out is a model file or a version directory, which gets a new
+<UTC timestamp>.npz version. Needs requirements-train.txt.
+
+Usage (from project root):
+    python -m scripts.train_autoencoder [--data features.npy] [--out data/models/autoencoder]
+"""
+
+import argparse
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backend.core.config import AUTOENCODER_MODEL_PATH
+from backend.inference.run_inference import DenseAutoencoder, export_dense_autoencoder
+from backend.services.preprocess import FEATURE_FIELDS, preprocess_telemetry_batch
+from simulator.telemetry_simulator import TelemetrySimulator
+
+
+def simulate(n_samples: int, n_satellites: int = 20) -> np.ndarray:
+    sims = [TelemetrySimulator(f"SAT-{i}", orbit_radius_km=6800 + 20 * i) for i in range(n_satellites)]
+    rows = [sims[i % n_satellites].step() for i in range(n_samples)]
+    return preprocess_telemetry_batch(rows)
+
+
+def build_model(n_inputs: int, hidden: list):
+    import tensorflow as tf
+
+    layers = [tf.keras.Input(shape=(n_inputs,))]
+    layers += [tf.keras.layers.Dense(units, activation="relu") for units in hidden]
+    layers += [tf.keras.layers.Dense(n_inputs, activation="linear")]
+    model = tf.keras.Sequential(layers)
+    model.compile(optimizer="adam", loss="mse")
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--data", help="(N, 15) .npy feature matrix; simulated when omitted")
+    parser.add_argument("--samples", type=int, default=200000)
+    parser.add_argument("--hidden", default="16,6,16", help="hidden layer widths")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--quantile", type=float, default=0.999, help="error quantile used as threshold")
+    parser.add_argument("--out", default=AUTOENCODER_MODEL_PATH)
+    args = parser.parse_args()
+
+    features = np.load(args.data) if args.data else simulate(args.samples)
+    mean = features.mean(axis=0)
+    scale = np.where(features.std(axis=0) > 0, features.std(axis=0), 1.0)
+    x = ((features - mean) / scale).astype(np.float32)
+
+    model = build_model(x.shape[1], [int(w) for w in args.hidden.split(",")])
+    model.fit(x, x, epochs=args.epochs, batch_size=256, validation_split=0.1, verbose=2)
+
+    if args.out.endswith(".npz"):
+        out = args.out
+    else:
+        out = os.path.join(args.out, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + ".npz")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    tmp = os.path.join(os.path.dirname(os.path.abspath(out)), "." + os.path.basename(out))
+    export_dense_autoencoder(model, tmp, mean=mean, scale=scale, features=FEATURE_FIELDS)
+
+    # threshold from the exported model itself, so it matches what the backend computes
+    errors = DenseAutoencoder(tmp, mmap=False).score(features)
+    threshold = float(np.quantile(errors, args.quantile))
+    export_dense_autoencoder(model, tmp, mean=mean, scale=scale, threshold=threshold, features=FEATURE_FIELDS)
+    os.replace(tmp, out)
+
+    keras_errors = np.mean((model.predict(x[:1000], verbose=0) - x[:1000]) ** 2, axis=1)
+    print(f"wrote {out}: threshold {threshold:.4g}, "
+          f"max |numpy - keras| error {np.max(np.abs(errors[:1000] - keras_errors)):.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 # simulator/simulator.py
+import os
+import json
 import time
 import random
 import requests
@@ -9,6 +11,9 @@ from sensor_failures import SensorFailureInjector
 from comms_anomalies import CommsAnomalyInjector
 
 BACKEND_URL = "http://127.0.0.1:8000/telemetry/"
+# long-lived WebSocket ingest link, used when SIM_TRANSPORT=ws
+STREAM_URL = os.getenv("SIM_STREAM_URL", "ws://127.0.0.1:8000/telemetry/stream")
+TRANSPORT = os.getenv("SIM_TRANSPORT", "http")  # "http" | "ws"
 
 SEND_INTERVAL_SECONDS = 3.0  # how often to send telemetry per sat
 
@@ -22,11 +27,42 @@ def build_pipeline(sat_id: str):
     return comms  # top of pipeline
 
 
+def stream_main(sims):
+    """
+    Push every tick's samples over one WebSocket connection instead of one
+    HTTP POST per sample. The server answers each frame in order, so waiting
+    for the reply before the next tick keeps us within its flow-control window.
+    """
+    from websockets.sync.client import connect
+
+    print(f"Streaming telemetry to {STREAM_URL}")
+    seq = 0
+    with connect(STREAM_URL) as ws:
+        while True:
+            samples = [sim.step(SEND_INTERVAL_SECONDS) for sim in sims.values()]
+            ws.send(json.dumps({"seq": seq, "samples": samples}))
+            reply = json.loads(ws.recv())
+            if reply.get("status") != "ok":
+                print(f"[tick {seq}] backend error {reply.get('code')}: {reply.get('detail')}")
+            else:
+                for r in reply["results"]:
+                    print(f"[{r['satellite_id']}] sent at {r['timestamp']} -> {r['anomaly']['severity']}")
+            seq += 1
+            time.sleep(SEND_INTERVAL_SECONDS)
+
+
 def main():
     satellites = ["SAT-1", "SAT-2", "SAT-3"]
     sims = {sid: build_pipeline(sid) for sid in satellites}
 
     print(f"Starting simulator for {len(satellites)} satellites.")
+    if TRANSPORT == "ws":
+        try:
+            stream_main(sims)
+        except KeyboardInterrupt:
+            print("Simulator stopped.")
+        return
+
     print(f"Sending telemetry to {BACKEND_URL}")
 
     try:
@@ -0,0 +1,17 @@
+# tests/conftest.py
+"""Point the backend at a throwaway database and data directories before it is imported."""
+
+import os
+import sys
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="satellite-tests-")
+os.environ.setdefault("DB_URL", "sqlite:///" + os.path.join(_TMP, "test.db"))
+os.environ.setdefault("ANOMALY_PARTITION_DIR", os.path.join(_TMP, "partitions"))
+os.environ.setdefault("ANOMALY_ARCHIVE_DIR", os.path.join(_TMP, "archive"))
+os.environ.setdefault("PERSIST_SPILL_DIR", os.path.join(_TMP, "spill"))
+os.environ.setdefault("RAW_STORE_DIR", os.path.join(_TMP, "raw"))
+os.environ.setdefault("AUTOENCODER_MODEL_PATH", os.path.join(_TMP, "models", "autoencoder"))
+os.environ.setdefault("SHARED_STATE_NAME", os.path.basename(_TMP))
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,82 @@
+# tests/test_admission.py
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.api.routes import telemetry
+from backend.services.admission import AdmissionController
+from backend.services.persistence import PersistenceQueueFull
+from backend.services.preprocess import preprocess_telemetry_batch
+from simulator.telemetry_simulator import TelemetrySimulator
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    controller = AdmissionController(max_inflight=100, max_inflight_per_satellite=2, critical_reserve=0.0)
+    monkeypatch.setattr(telemetry, "admission", controller)
+    return controller
+
+
+def batch(satellite_id, n):
+    sim = TelemetrySimulator(satellite_id)
+    samples = [sim.step() for _ in range(n)]
+    return [s["timestamp"] for s in samples], [satellite_id] * n, preprocess_telemetry_batch(samples)
+
+
+def test_shed_samples_never_reach_the_stateful_detectors(controller, monkeypatch):
+    seen = []
+    update = telemetry.change_detectors.update
+    monkeypatch.setattr(telemetry.change_detectors, "update", lambda ids, f: seen.append(len(ids)) or update(ids, f))
+
+    records, shed = telemetry._score_and_store(*batch("SAT-ADM1", 5))
+    assert len(records) == 2 and shed == [2, 3, 4]
+    assert seen == [2]
+
+
+def test_slots_are_released_when_the_rows_cannot_be_queued(controller, monkeypatch):
+    def full(rows):
+        raise PersistenceQueueFull("full")
+
+    monkeypatch.setattr(telemetry.event_writer, "submit", full)
+    with pytest.raises(PersistenceQueueFull):
+        telemetry._score_and_store(*batch("SAT-ADM2", 2))
+    assert controller.stats()["inflight"] == 0
+
+
+def test_bad_timestamp_fails_before_any_slot_is_taken(controller):
+    timestamps, ids, features = batch("SAT-ADM3", 2)
+    timestamps[1] = "not a time"
+    with pytest.raises(ValueError):
+        telemetry._score_and_store(timestamps, ids, features)
+    assert controller.stats()["inflight"] == 0
+
+
+def test_reserve_admits_critical_rows_while_nominal_ones_are_shed():
+    controller = AdmissionController(max_inflight=10, max_inflight_per_satellite=10, critical_reserve=0.4)
+    # nominal traffic alone stops at 60% of the limit
+    assert controller.admit(["SAT-A"] * 8, np.zeros(8, dtype=bool)).tolist() == [True] * 6 + [False] * 2
+
+    critical = np.array([False, True, False, True, True, True, True])
+    admitted = controller.admit(["SAT-B"] * 7, critical)
+    assert admitted.tolist() == [False, True, False, True, True, True, False]
+    assert controller.stats()["admitted"] == {"nominal": 6, "critical": 4}
+    assert controller.stats()["inflight"] == 10
+
+
+def test_routes_answer_429_or_503_with_retry_after(controller):
+    sim = TelemetrySimulator("SAT-ADM4")
+    with TestClient(app) as client:
+        # the satellite already has its 2 slots: per-satellite limit
+        controller.admit(["SAT-ADM4"] * 2, np.zeros(2, dtype=bool))
+        resp = client.post("/telemetry/batch", json=[sim.step(), sim.step()])
+        assert resp.status_code == 429
+        assert resp.headers["Retry-After"] == str(controller.retry_after)
+
+        # every fleet-wide slot is taken: global limit
+        controller.admit([f"SAT-F{i}" for i in range(98)], np.zeros(98, dtype=bool))
+        for path, body in (("/telemetry/", sim.step()), ("/telemetry/batch", [sim.step()])):
+            resp = client.post(path, json=body)
+            assert resp.status_code == 503
+            assert resp.headers["Retry-After"] == str(controller.retry_after)
+    assert controller.stats()["shed"] == {"satellite_limit": 2, "global_limit": 2}
@@ -0,0 +1,74 @@
+# tests/test_anomaly_detection.py
+import numpy as np
+import pytest
+
+from backend.inference.run_inference import MODEL_NAMES
+from backend.services.anomaly_engine import compute_anomaly, compute_anomaly_batch
+from backend.services.change_detectors import CHANGE_NAMES
+from backend.services.matrix_profile import DISCORD_NAMES
+from backend.services.preprocess import FEATURE_FIELDS
+
+
+def random_features(n, seed=0):
+    """Feature rows straddling every base telemetry threshold."""
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0.0, 1.0, (n, len(FEATURE_FIELDS)))
+    x[:, 6] = rng.uniform(40, 100, n)       # temp_payload, limit 70
+    x[:, 7] = rng.uniform(30, 90, n)        # temp_battery, limit 60
+    x[:, 9:12] = rng.uniform(0, 250, (n, 3))  # sensors, std limit 50
+    x[:, 14] = rng.uniform(0, 0.4, n)       # packet_loss, limit 0.2
+    x[rng.random(n) < 0.05, 6] = np.nan
+    return x
+
+
+def baseline_rules(row):
+    """The original per-sample rules of compute_anomaly."""
+    issues = []
+    if row[6] > 70:
+        issues.append("HIGH_PAYLOAD_TEMPERATURE")
+    if row[7] > 60:
+        issues.append("HIGH_BATTERY_TEMPERATURE")
+    if row[14] > 0.2:
+        issues.append("HIGH_PACKET_LOSS")
+    if np.std(row[9:12]) > 50:
+        issues.append("SENSOR_INCONSISTENCY")
+    return issues
+
+
+def test_batch_matches_the_original_rowwise_rules():
+    x = random_features(2000)
+    result = compute_anomaly_batch(x)
+    assert len(result) == len(x)
+    for row, got in zip(x, result.to_dicts()):
+        issues = baseline_rules(row)
+        assert got["issues"] == issues
+        assert got["severity"] == ("normal", "warning", "critical")[min(len(issues), 2)]
+        assert got["score"] == pytest.approx(min(1.0, len(issues) / 3.0))
+
+
+def test_single_sample_is_row_of_the_batch():
+    rng = np.random.default_rng(1)
+    n = 300
+    x = random_features(n, seed=1)
+    change = np.zeros((n, len(CHANGE_NAMES)))
+    change[:, CHANGE_NAMES.index("sensor2_value_stuck")] = rng.integers(0, 8, n)
+    change[:, CHANGE_NAMES.index("sensor3_value_cusum")] = rng.uniform(0, 20, n)
+    model = rng.uniform(0, 2, (n, len(MODEL_NAMES)))
+    discords = rng.uniform(0, 2, (n, len(DISCORD_NAMES)))
+    batch = compute_anomaly_batch(x, change=change, model=model, discords=discords)
+    dicts = batch.to_dicts()
+    for i in range(n):
+        single = compute_anomaly(x[i], change=change[i], model=model[i], discords=discords[i])
+        assert single == batch[i] == dicts[i]
+    assert {"SENSOR_STUCK", "SENSOR_DRIFT", "MODEL_RECONSTRUCTION_ERROR", "COMMS_DISCORD"} <= {
+        issue for d in dicts for issue in d["issues"]
+    }
+
+
+def test_missing_extra_columns_never_fire_and_bad_shapes_are_rejected():
+    x = random_features(50)
+    assert compute_anomaly_batch(x).to_dicts() == compute_anomaly_batch(
+        x, model=np.zeros((50, len(MODEL_NAMES)))
+    ).to_dicts()
+    with pytest.raises(ValueError):
+        compute_anomaly_batch(x, model=np.zeros((49, len(MODEL_NAMES))))
@@ -0,0 +1,31 @@
+# tests/test_batch_ingest.py
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.api.routes.telemetry import MAX_BATCH_SIZE
+from simulator.telemetry_simulator import TelemetrySimulator
+
+
+def samples(satellite_id, n):
+    sim = TelemetrySimulator(satellite_id)
+    out = [sim.step() for _ in range(n)]
+    out[10]["temp_payload"] = 95.0  # one hot sample
+    return out
+
+
+def test_batch_scores_like_one_request_per_sample():
+    batch = samples("SAT-B1", 40)
+    singles = [dict(s, satellite_id="SAT-B2") for s in batch]  # same values, fresh detector state
+    with TestClient(app) as client:
+        body = client.post("/telemetry/batch", json=batch).json()
+        one_by_one = [client.post("/telemetry/", json=s).json()["anomaly"] for s in singles]
+    assert body["count"] == 40 and body["shed"] == []
+    assert [r["anomaly"] for r in body["results"]] == one_by_one
+    assert "HIGH_PAYLOAD_TEMPERATURE" in one_by_one[10]["issues"]
+
+
+def test_oversized_and_empty_batches():
+    with TestClient(app) as client:
+        assert client.post("/telemetry/batch", json=[]).json()["count"] == 0
+        too_many = samples("SAT-B3", 11) * (MAX_BATCH_SIZE // 11 + 1)
+        assert client.post("/telemetry/batch", json=too_many).status_code == 413
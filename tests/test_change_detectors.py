@@ -0,0 +1,66 @@
+# tests/test_change_detectors.py
+import numpy as np
+
+from backend.services.anomaly_engine import compute_anomaly_batch
+from backend.services.change_detectors import ChangeDetectors
+from backend.services.preprocess import FEATURE_FIELDS
+
+N_SATS = 300
+ROUNDS = 1000  # 3e5 samples, the figure quoted next to SENSOR_STUCK / SENSOR_DRIFT in thresholds.yaml
+CHUNK = 50
+
+
+def nominal(rng, n):
+    """Rows drawn like simulator/telemetry_simulator.py's healthy telemetry."""
+    x = np.zeros((n, len(FEATURE_FIELDS)))
+    col = {name: j for j, name in enumerate(FEATURE_FIELDS)}
+    for name, mean, sd in (
+        ("temp_payload", 35, 1.5), ("temp_battery", 30, 1.0), ("temp_bus", 28, 1.0),
+        ("sensor1_value", 100, 3), ("sensor2_value", 102, 3), ("sensor3_value", 98, 3),
+        ("comms_rssi", -80, 2), ("comms_snr", 12, 1.5),
+    ):
+        x[:, col[name]] = rng.normal(mean, sd, n)
+    x[:, col["comms_packet_loss"]] = np.maximum(0.0, rng.normal(0.01, 0.003, n))
+    x[:, col["position_z"]] = rng.uniform(-50, 50, n)
+    return x
+
+
+def test_no_drift_or_stuck_alarm_on_nominal_telemetry():
+    rng = np.random.default_rng(18)
+    detectors = ChangeDetectors()
+    sats = np.tile([f"SAT-{i}" for i in range(N_SATS)], CHUNK)
+    alarms = 0
+    for _ in range(ROUNDS // CHUNK):
+        features = nominal(rng, sats.size)
+        result = compute_anomaly_batch(features, change=detectors.update(sats, features))
+        flags = result.issue_flags()
+        names = result.ruleset.issue_names
+        alarms += int(flags[:, [names.index("SENSOR_STUCK"), names.index("SENSOR_DRIFT")]].sum())
+    assert alarms == 0
+
+
+def test_drift_of_two_std_devs_is_flagged_quickly():
+    rng = np.random.default_rng(0)
+    detectors = ChangeDetectors()
+    sensor1 = FEATURE_FIELDS.index("sensor1_value")
+    features = nominal(rng, 400)
+    features[200:, sensor1] += 6.0  # 2 std devs
+    result = compute_anomaly_batch(features, change=detectors.update(["SAT-D"] * 400, features))
+    drift = result.issue_flags()[:, result.ruleset.issue_names.index("SENSOR_DRIFT")]
+    assert not drift[:200].any()
+    assert 200 < np.argmax(drift) < 230
+
+
+def test_frozen_sensor_is_flagged_on_its_fifth_repeat_and_a_noisy_one_is_not():
+    rng = np.random.default_rng(5)
+    detectors = ChangeDetectors()
+    sensor2 = FEATURE_FIELDS.index("sensor2_value")
+    frozen, noisy = nominal(rng, 100), nominal(rng, 100)
+    frozen[50:80, sensor2] = 101.7  # rows 51.. repeat row 50; it moves again at row 80
+    sats = ["SAT-FROZEN", "SAT-NOISY"] * 100
+    features = np.stack([frozen, noisy], axis=1).reshape(200, -1)
+    result = compute_anomaly_batch(features, change=detectors.update(sats, features))
+    stuck = result.issue_flags()[:, result.ruleset.issue_names.index("SENSOR_STUCK")]
+
+    assert np.nonzero(stuck[0::2])[0].tolist() == list(range(55, 80))  # stuck >= 5 from the fifth repeat
+    assert not stuck[1::2].any()
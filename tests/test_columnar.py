@@ -0,0 +1,87 @@
+# tests/test_columnar.py
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.services.columnar import (
+    ARROW_CONTENT_TYPE, NPY_CONTENT_TYPE, NPZ_CONTENT_TYPE,
+    ColumnarFormatError, UnsupportedColumnarFormat, decode_columnar, encode_npy, encode_npz,
+)
+from backend.services.preprocess import FEATURE_FIELDS
+from simulator.telemetry_simulator import TelemetrySimulator
+
+
+def columns(satellite_id, n=20):
+    sim = TelemetrySimulator(satellite_id)
+    samples = [sim.step() for _ in range(n)]
+    samples[3]["comms_packet_loss"] = 0.5
+    return samples, {name: np.array([s[name] for s in samples]) for name in ("timestamp", "satellite_id") + FEATURE_FIELDS}
+
+
+def encode_arrow(cols):
+    pa = pytest.importorskip("pyarrow")  # optional on the server too
+    table = pa.table({name: pa.array(col.tolist()) for name, col in cols.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+@pytest.mark.parametrize("content_type, encode", [
+    (NPZ_CONTENT_TYPE, encode_npz), (NPY_CONTENT_TYPE, encode_npy), (ARROW_CONTENT_TYPE, encode_arrow),
+])
+def test_every_format_decodes_to_the_same_matrix(content_type, encode):
+    samples, cols = columns("SAT-C1")
+    timestamps, satellite_ids, features = decode_columnar(encode(cols), content_type + "; charset=binary")
+    assert timestamps.tolist() == [s["timestamp"] for s in samples]
+    assert satellite_ids.tolist() == ["SAT-C1"] * len(samples)
+    assert np.array_equal(features, np.array([[s[f] for f in FEATURE_FIELDS] for s in samples]))
+
+
+def test_malformed_payloads_are_rejected():
+    _, cols = columns("SAT-C2")
+    with pytest.raises(UnsupportedColumnarFormat):
+        decode_columnar(encode_npz(cols), "text/csv")
+    with pytest.raises(ColumnarFormatError, match="missing"):
+        decode_columnar(encode_npz({k: v for k, v in cols.items() if k != "temp_bus"}), NPZ_CONTENT_TYPE)
+    cols["temp_bus"] = cols["temp_bus"].copy()
+    cols["temp_bus"][0] = np.nan
+    with pytest.raises(ColumnarFormatError, match="temp_bus"):
+        decode_columnar(encode_npz(cols), NPZ_CONTENT_TYPE)
+    cols["temp_bus"][0] = 20.0
+    cols["timestamp"] = cols["timestamp"].astype(object)
+    cols["timestamp"][5] = "nope"
+    with pytest.raises(ColumnarFormatError, match="row 5"):
+        decode_columnar(encode_npz({**cols, "timestamp": cols["timestamp"].astype(str)}), NPZ_CONTENT_TYPE)
+
+
+def test_route_rejects_bad_timestamps_and_oversized_bodies(monkeypatch):
+    from backend.api.routes import telemetry
+
+    _, cols = columns("SAT-C5")
+    cols["timestamp"] = cols["timestamp"].astype(object)
+    cols["timestamp"][0] = "nope"
+    body = encode_npz({**cols, "timestamp": cols["timestamp"].astype(str)})
+    with TestClient(app) as client:
+        post = lambda content: client.post("/telemetry/columnar", content=content,
+                                           headers={"content-type": NPZ_CONTENT_TYPE})
+        assert post(body).status_code == 422
+        monkeypatch.setattr(telemetry, "MAX_COLUMNAR_BYTES", len(body) - 1)
+        assert post(body).status_code == 413
+        # no Content-Length (chunked upload): cut off while reading
+        assert post(iter([body[:1000], body[1000:]])).status_code == 413
+
+
+def test_columnar_ingest_scores_like_the_json_batch():
+    samples, cols = columns("SAT-C3")
+    twin = [dict(s, satellite_id="SAT-C4") for s in samples]
+    with TestClient(app) as client:
+        body = client.post("/telemetry/columnar", content=encode_npz(cols),
+                           headers={"content-type": NPZ_CONTENT_TYPE}).json()
+        batch = client.post("/telemetry/batch", json=twin).json()["results"]
+        assert client.post("/telemetry/columnar", content=b"x", headers={"content-type": "text/csv"}).status_code == 415
+    assert body["count"] == len(samples)
+    assert body["severity"] == [r["anomaly"]["severity"] for r in batch]
+    assert body["score"] == [r["anomaly"]["score"] for r in batch]
+    assert body["issues"] == [r["anomaly"]["issues"] for r in batch]
@@ -0,0 +1,47 @@
+# tests/test_database.py
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, select, text
+
+from backend.core.database import _copy_value, bulk_insert, make_engine
+
+
+def test_sqlite_engines_are_tuned_unless_asked_not_to(tmp_path):
+    tuned = make_engine(f"sqlite:///{tmp_path / 'a.db'}")
+    plain = make_engine(f"sqlite:///{tmp_path / 'b.db'}", tuned=False)
+    with tuned.connect() as a, plain.connect() as b:
+        assert a.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert a.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert b.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+
+
+def test_bulk_insert_writes_every_row_in_the_callers_transaction(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'c.db'}")
+    table = Table("t", MetaData(), Column("id", Integer, primary_key=True),
+                  Column("name", String), Column("v", Float))
+    table.create(engine)
+    rows = [{"name": f"r{i}", "v": i / 2} for i in range(1000)]
+    with engine.begin() as conn:
+        bulk_insert(conn, table, rows)
+        bulk_insert(conn, table, [])
+    with engine.connect() as conn:
+        assert [dict(r._mapping) for r in conn.execute(select(table.c.name, table.c.v))] == rows
+
+
+def test_copy_values_are_escaped():
+    assert _copy_value(None) == "\\N"
+    assert _copy_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+    assert _copy_value(datetime(2026, 1, 2, 3, 4, 5)) == "2026-01-02 03:04:05"
+
+
+def test_default_database_is_the_bundled_sqlite_file():
+    env = {k: v for k, v in os.environ.items() if k != "DB_URL"}
+    out = subprocess.run(
+        [sys.executable, "-c", "from backend.core.config import DB_URL; print(DB_URL)"],
+        env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+    )
+    assert out.stdout.strip().startswith("sqlite:///") and out.stdout.strip().endswith("satellite_demo.db")
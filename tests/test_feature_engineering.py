@@ -0,0 +1,76 @@
+# tests/test_feature_engineering.py
+import numpy as np
+import pytest
+
+from backend.services import feature_engineering
+from backend.services.feature_engineering import STATS, RollingFeatures
+from backend.services.preprocess import N_FEATURES
+
+WINDOWS = (4, 9)
+
+
+def reference(t, x, windows=WINDOWS):
+    """Every rolling feature recomputed from the full window, sample by sample."""
+    n = x.shape[0]
+    out = np.empty((n, len(windows), len(STATS), N_FEATURES))
+    for k, w in enumerate(windows):
+        alpha = 2.0 / (w + 1)
+        ewma = x[0].copy()
+        for i in range(n):
+            win = x[max(0, i - w + 1):i + 1]
+            if i:
+                ewma = ewma + alpha * (x[i] - ewma)
+            dt = t[i] - t[max(0, i - w + 1)]
+            roc = (x[i] - win[0]) / dt if dt > 0 else np.full(N_FEATURES, np.nan)
+            out[i, k] = [win.mean(axis=0), win.std(axis=0), win.min(axis=0), win.max(axis=0), ewma, roc]
+    return out.reshape(n, -1)
+
+
+def series(n, seed):
+    rng = np.random.default_rng(seed)
+    t = 1.7e9 + np.cumsum(rng.uniform(0.5, 2.0, n))
+    x = rng.normal(50.0, 10.0, (n, N_FEATURES)) + np.linspace(0, 100, n)[:, None]
+    return t, x
+
+
+@pytest.mark.parametrize("chunks", [
+    [1] * 60,               # one sample per call: the per-round path
+    [3, 7, 2, 20, 28],      # mixed: short batches and runs of >= RUN_MIN_SAMPLES
+    [60],                   # one run
+])
+def test_streaming_matches_full_window_recompute(chunks):
+    t, x = series(sum(chunks), seed=0)
+    rf = RollingFeatures(windows=WINDOWS)
+    got, i = [], 0
+    for c in chunks:
+        got.append(rf.update(["SAT-A"] * c, t[i:i + c], x[i:i + c]))
+        i += c
+    np.testing.assert_allclose(np.concatenate(got), reference(t, x), rtol=1e-9, atol=1e-9)
+
+
+def test_interleaved_satellites_keep_separate_windows():
+    sats = {f"SAT-{s}": series(40, seed=s) for s in range(5)}
+    rf = RollingFeatures(windows=WINDOWS, initial_satellites=2)
+    rng = np.random.default_rng(9)
+    order = rng.permutation(np.repeat(list(sats), 40))
+    seen = {s: 0 for s in sats}
+    ids, t, x = [], [], []
+    for s in order.tolist():
+        ids.append(s)
+        t.append(sats[s][0][seen[s]])
+        x.append(sats[s][1][seen[s]])
+        seen[s] += 1
+    out = rf.update(ids, np.array(t), np.array(x))
+    ids = np.array(ids)
+    for s, (ts, xs) in sats.items():
+        np.testing.assert_allclose(out[ids == s], reference(ts, xs), rtol=1e-9, atol=1e-9)
+    assert rf.stats()["satellites"] == 5
+
+
+def test_resync_keeps_long_streams_exact(monkeypatch):
+    monkeypatch.setattr(feature_engineering, "RESYNC_EVERY", 16)
+    t, x = series(200, seed=3)
+    rf = RollingFeatures(windows=WINDOWS)
+    out = np.concatenate([rf.update(["SAT-R"], t[i:i + 1], x[i:i + 1]) for i in range(200)])
+    np.testing.assert_allclose(out, reference(t, x), rtol=1e-7)
+    assert rf.stats()["resyncs"] > 0
@@ -0,0 +1,52 @@
+# tests/test_feed.py
+import asyncio
+import json
+import threading
+
+from backend.services.feed import AnomalyFeed
+
+
+def record(satellite_id, severity):
+    return {"satellite_id": satellite_id, "anomaly": {"severity": severity, "issues": [], "score": 0.0}}
+
+
+def drain(queue):
+    out = []
+    while not queue.empty():
+        out.append(queue.get_nowait())
+    return out
+
+
+def test_subscribers_get_matching_records_once_in_order():
+    feed = AnomalyFeed(maxsize=10)
+
+    async def main():
+        everything = feed.subscribe()
+        critical = feed.subscribe(severities=["CRITICAL"])
+        sat2 = feed.subscribe(satellite_ids=["SAT-2"])
+        feed.publish([record("SAT-1", "normal"), record("SAT-2", "critical")])
+        # publishing from an ingest thread hands the records to the subscriber's loop
+        t = threading.Thread(target=feed.publish, args=([record("SAT-2", "warning")],))
+        t.start()
+        t.join()
+        await asyncio.sleep(0.01)
+        return drain(everything.queue), drain(critical.queue), drain(sat2.queue)
+
+    everything, critical, sat2 = asyncio.run(main())
+    assert [seq for seq, _ in everything] == [1, 2, 3]
+    assert [seq for seq, _ in critical] == [2]
+    assert [json.loads(p)["anomaly"]["severity"] for _, p in sat2] == ["critical", "warning"]
+    assert feed.stats()["published"] == 3
+
+
+def test_slow_subscriber_drops_its_oldest_records():
+    feed = AnomalyFeed(maxsize=3)
+
+    async def main():
+        sub = feed.subscribe()
+        feed.publish([record("SAT-1", "normal") for _ in range(5)])
+        return sub, drain(sub.queue)
+
+    sub, events = asyncio.run(main())
+    assert [seq for seq, _ in events] == [3, 4, 5]
+    assert sub.dropped == 2
@@ -0,0 +1,76 @@
+# tests/test_feed_client.py
+import json
+import threading
+import time
+
+from dashboard import backend_client
+from dashboard.backend_client import AnomalyFeedClient
+
+
+def record(satellite_id, second, severity="warning"):
+    return {
+        "timestamp": f"2025-01-01T00:00:{second:02d}Z",
+        "satellite_id": satellite_id,
+        "anomaly": {"severity": severity, "issues": ["TEMP_HIGH"], "score": 0.5},
+    }
+
+
+def served(record):
+    # /latest renders timestamps from epoch seconds, so they come back as +00:00
+    return dict(record, timestamp=record["timestamp"].replace("Z", "+00:00"))
+
+
+class FakeResponse:
+    def __init__(self, payload=None, events=()):
+        self.payload = payload
+        self.events = events
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+    def iter_lines(self, decode_unicode=False):
+        yield "retry: 3000"
+        yield ""
+        for seq, rec in self.events:
+            yield f"id: {seq}"
+            yield "event: anomaly"
+            yield f"data: {json.dumps(rec)}"
+            yield ""
+
+
+def test_records_seeded_and_streamed_are_kept_once(monkeypatch):
+    a, b, c = record("SAT-1", 1), record("SAT-2", 2), record("SAT-1", 3)
+    done = threading.Event()
+    streams = iter([FakeResponse(events=[(1, a), (2, b), (3, c)])])
+
+    def fake_get(url, **kwargs):
+        if url.endswith("/anomalies/stream"):
+            resp = next(streams, None)
+            if resp is None:  # one connection is enough for the test
+                done.set()
+                raise ConnectionError
+            return resp
+        # a and b were published after subscribing but before the snapshot was taken
+        seed = [served(b), served(a)]
+        if "/latest" in url:
+            return FakeResponse({"data": seed})
+        return FakeResponse({"data": [backend_client._flatten(r) for r in seed]})
+
+    monkeypatch.setattr(backend_client.requests, "get", fake_get)
+    client = AnomalyFeedClient(base_url="http://backend")
+    assert done.wait(5)
+    time.sleep(0.05)
+
+    assert [(r["satellite_id"], r["timestamp"]) for r in client.latest()] == [
+        ("SAT-1", c["timestamp"]), ("SAT-2", served(b)["timestamp"]), ("SAT-1", served(a)["timestamp"]),
+    ]
+    assert len(client.history()) == 3
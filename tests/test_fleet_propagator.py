@@ -0,0 +1,60 @@
+# tests/test_fleet_propagator.py
+import numpy as np
+import pytest
+
+from backend.models.fleet_propagator import MU_EARTH, propagate, propagate_kepler, propagate_rk4
+from scripts.bench_propagator import random_states
+
+ORBIT_S = 5800.0
+
+
+def elliptic_states(n, seed=0):
+    """LEO orbits with eccentricities up to ~0.35, plus a circular equatorial one."""
+    rng = np.random.default_rng(seed)
+    x = random_states(n, seed)
+    x[:, 3:] *= rng.uniform(1.0, 1.14, (n, 1))  # faster than circular: the current position is the perigee
+    x[0] = [7000.0, 0, 0, 0, np.sqrt(MU_EARTH / 7000.0), 0]
+    return x
+
+
+def position_error(a, b):
+    return np.max(np.linalg.norm(a[:, :3] - b[:, :3], axis=1))
+
+
+@pytest.mark.parametrize("dt", [10.0, 1000.0, ORBIT_S, -ORBIT_S / 3])
+def test_two_body_kepler_matches_fine_rk4(dt):
+    x = elliptic_states(200)
+    t = np.full(len(x), dt)
+    kep = propagate_kepler(x, t, j2=False)
+    ref = propagate_rk4(x, t, step_s=1.0, j2=False)
+    assert position_error(kep, ref) < 1e-5
+    assert np.max(np.abs(kep[:, 3:] - ref[:, 3:])) < 1e-8
+
+
+def test_j2_kepler_stays_within_its_secular_error_budget():
+    x = random_states(200, seed=1)
+    for dt, kepler_budget, rk4_budget in ((10.0, 0.5, 1e-6), (ORBIT_S, 40.0, 1e-2)):
+        t = np.full(len(x), dt)
+        ref = propagate_rk4(x, t, step_s=1.0)
+        assert position_error(propagate_kepler(x, t), ref) < kepler_budget
+        assert position_error(propagate_rk4(x, t), ref) < rk4_budget
+
+
+def test_kepler_conserves_the_orbit_and_runs_backwards():
+    x = elliptic_states(100, seed=2)
+    dt = np.random.default_rng(2).uniform(-3 * ORBIT_S, 3 * ORBIT_S, len(x))  # a different dt per row
+    y = propagate_kepler(x, dt, j2=False)
+    energy = lambda s: 0.5 * np.sum(s[:, 3:] ** 2, axis=1) - MU_EARTH / np.linalg.norm(s[:, :3], axis=1)
+    np.testing.assert_allclose(energy(y), energy(x), rtol=1e-10)
+    np.testing.assert_allclose(np.cross(y[:, :3], y[:, 3:]), np.cross(x[:, :3], x[:, 3:]), rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(propagate_kepler(y, -dt, j2=False), x, rtol=1e-8, atol=1e-6)
+
+
+def test_unbound_states_give_nan_and_unknown_methods_are_rejected():
+    x = random_states(3)
+    x[1, 3:] *= 1.5                        # escape speed
+    x[2, 3:] = 0.0                         # radial fall, no angular momentum
+    y = propagate_kepler(x, np.full(3, 10.0))
+    assert np.isfinite(y[0]).all() and np.isnan(y[1:]).all()
+    with pytest.raises(ValueError):
+        propagate(x, np.full(3, 10.0), method="sgp4")
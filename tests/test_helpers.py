@@ -0,0 +1,22 @@
+# tests/test_helpers.py
+import numpy as np
+
+from backend.utils.helpers import SatelliteIndex, satellite_groups, satellite_rounds
+
+
+def test_rows_are_assigned_on_first_sight_and_capacity_doubles():
+    grown = []
+    index = SatelliteIndex(2, grown.append)
+    assert index.rows(["B", "A", "B"]).tolist() == [1, 0, 1]  # np.unique order for a new batch
+    assert index.rows(["C", "A"]).tolist() == [2, 0]
+    assert grown == [4] and index.capacity == 4
+    assert len(index) == 3 and index["C"] == 2 and index.get("D") is None
+
+
+def test_rounds_apply_each_satellites_samples_in_batch_order():
+    rows = np.array([3, 1, 3, 0, 1, 3])
+    rounds = satellite_rounds(rows)
+    assert [r.tolist() for r in rounds] == [[3, 1, 0], [4, 2], [5]]  # by state row within a round
+    assert [r.tolist() for r in satellite_rounds(rows, np.array([1, 4, 3]))] == [[3, 1], [4]]
+    assert satellite_rounds(rows, np.array([], dtype=np.int64)) == []
+    assert [g.tolist() for g in satellite_groups(rows)] == [[3], [1, 4], [0, 2, 5]]
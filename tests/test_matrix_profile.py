@@ -0,0 +1,92 @@
+# tests/test_matrix_profile.py
+import numpy as np
+import pytest
+
+from backend.services.matrix_profile import DISCORD_CHANNELS, MatrixProfileDiscords, distance_profile
+from backend.services.preprocess import FEATURE_FIELDS, N_FEATURES
+
+W, M, REFRESH = 40, 6, 25
+CHANNELS = [FEATURE_FIELDS.index(c) for c in DISCORD_CHANNELS]
+
+
+def brute_force(x, window=W, m=M):
+    """Left matrix-profile score of every sample of one channel, NaN samples skipped."""
+    excl = m // 2
+    out = np.full(x.size, np.nan)
+    seen = []
+    for i, v in enumerate(x):
+        if np.isnan(v):
+            continue
+        seen.append(v)
+        if len(seen) < m + excl:
+            continue
+        win = np.array(seen[-window:])
+        subs = np.lib.stride_tricks.sliding_window_view(win, m)
+        query = subs[-1]
+        nearest = np.sqrt(((subs[:len(subs) - excl] - query) ** 2).sum(axis=1)).min()
+        noise = subs.var(axis=1).mean()
+        out[i] = nearest / np.sqrt(2 * m * noise)
+    return out
+
+
+def comms_series(n, seed):
+    """Noise around a level, with an outage-like level shift and a few dropped samples."""
+    rng = np.random.default_rng(seed)
+    x = np.zeros((n, N_FEATURES))
+    x[:, CHANNELS] = rng.normal([-80.0, 12.0, 0.05], [2.0, 1.0, 0.01], (n, 3))
+    x[n // 2:n // 2 + 8, CHANNELS[0]] -= 25.0
+    x[rng.choice(n, 4, replace=False), CHANNELS[1]] = np.nan
+    return x
+
+
+def test_distance_profile_matches_direct_distances():
+    rng = np.random.default_rng(0)
+    series = rng.normal(100.0, 5.0, 300)
+    query = rng.normal(100.0, 5.0, 12)
+    direct = np.linalg.norm(np.lib.stride_tricks.sliding_window_view(series, 12) - query, axis=1)
+    np.testing.assert_allclose(distance_profile(query, series), direct, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("chunks", [
+    [1] * 150,           # streaming, one sample per call (with refreshes every REFRESH samples)
+    [10, 3, 137],        # rounds, then a run of >= RUN_MIN_SAMPLES
+    [70, 80],            # two runs back to back
+])
+def test_streaming_and_run_paths_match_brute_force(chunks):
+    x = comms_series(sum(chunks), seed=1)
+    mp = MatrixProfileDiscords(window=W, subsequence=M, refresh=REFRESH)
+    got, i = [], 0
+    for c in chunks:
+        got.append(mp.update(["SAT-MP"] * c, x[i:i + c]))
+        i += c
+    got = np.concatenate(got)
+    for j, col in enumerate(CHANNELS):
+        np.testing.assert_allclose(got[:, j], brute_force(x[:, col]), rtol=1e-7, atol=1e-9)
+
+
+def test_interleaved_fleet_matches_brute_force_per_satellite():
+    sats = [f"SAT-{s}" for s in range(6)]
+    series = {s: comms_series(90, seed=10 + k) for k, s in enumerate(sats)}
+    mp = MatrixProfileDiscords(window=W, subsequence=M, refresh=REFRESH, initial_satellites=2)
+    # fleet-wide ticks; every third tick one satellite is late and arrives with the next one,
+    # so rounds cover both contiguous and scattered state rows
+    outs = {s: [] for s in sats}
+    pending = []
+    for i in range(90):
+        late = sats[i % len(sats)] if i % 3 == 0 and i < 89 else None
+        tick = pending + [(s, i) for s in sats if s != late]
+        pending = [(late, i)] if late else []
+        res = mp.update([s for s, _ in tick], np.array([series[s][j] for s, j in tick]))
+        for (s, _), r in zip(tick, res):
+            outs[s].append(r)
+    for s in sats:
+        got = np.array(outs[s])
+        for j, col in enumerate(CHANNELS):
+            np.testing.assert_allclose(got[:, j], brute_force(series[s][:, col]), rtol=1e-7, atol=1e-9)
+
+
+def test_level_shift_is_a_discord():
+    x = comms_series(200, seed=2)
+    scores = MatrixProfileDiscords(window=W, subsequence=M).update(["SAT-D"] * 200, x)[:, 0]
+    assert 100 <= np.nanargmax(scores) < 100 + M + 8
+    assert np.nanmax(scores[M + 3:95]) < 1.5 < np.nanmax(scores)
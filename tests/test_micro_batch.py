@@ -0,0 +1,48 @@
+# tests/test_micro_batch.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.services.micro_batch import MicroBatcher
+from simulator.telemetry_simulator import TelemetrySimulator
+
+
+def test_items_of_one_batch_get_their_own_results():
+    def process(items):
+        return [ValueError(f"bad {x}") if x < 0 else 2 * x for x in items]
+
+    batcher = MicroBatcher(process, max_batch=4, max_wait_ms=50)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(x) for x in (1, -1, 2, 3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert results[0] == 2 and results[2] == 4 and results[3] == 6
+    assert isinstance(results[1], ValueError)
+    assert batcher.stats()["full_flushes"] == 1
+
+
+def test_bad_timestamp_fails_only_its_own_request():
+    sim = TelemetrySimulator("SAT-MB")
+    samples = [sim.step() for _ in range(6)]
+    samples[2]["timestamp"] = "2026-13-99"
+    with TestClient(app) as client, ThreadPoolExecutor(6) as pool:
+        codes = list(pool.map(lambda s: client.post("/telemetry/", json=s).status_code, samples))
+    assert codes[2] == 422
+    assert codes[:2] + codes[3:] == [200] * 5
+
+
+def test_score_single_samples_isolates_unparseable_items():
+    from backend.api.routes.telemetry import _score_single_samples
+    from backend.services.preprocess import preprocess_telemetry
+
+    sim = TelemetrySimulator("SAT-MB2")
+    samples = [sim.step() for _ in range(3)]
+    items = [(s["timestamp"], s["satellite_id"], preprocess_telemetry(s)) for s in samples]
+    items[1] = ("2026-13-99",) + items[1][1:]
+    with TestClient(app):
+        results = _score_single_samples(items)
+    assert isinstance(results[1], ValueError)
+    assert results[0]["satellite_id"] == results[2]["satellite_id"] == "SAT-MB2"
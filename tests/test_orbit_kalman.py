@@ -0,0 +1,100 @@
+# tests/test_orbit_kalman.py
+import numpy as np
+import pytest
+
+from backend.models.fleet_propagator import MU_EARTH
+from backend.models.orbit_kalman import OrbitEKF, propagate
+
+DT = 10.0
+POS_SIGMA, VEL_SIGMA = 1.0, 0.01
+
+
+def circular_states(n, seed=0):
+    rng = np.random.default_rng(seed)
+    r = rng.uniform(6700.0, 7800.0, n)
+    u = rng.normal(size=(n, 3))
+    u /= np.linalg.norm(u, axis=1, keepdims=True)
+    w = np.cross(u, rng.normal(size=(n, 3)))
+    w /= np.linalg.norm(w, axis=1, keepdims=True)
+    return np.concatenate([r[:, None] * u, np.sqrt(MU_EARTH / r)[:, None] * np.cross(w, u)], axis=1)
+
+
+def measurements(n_sats, steps, seed=0):
+    """Two-body truth every DT seconds plus measurement noise: (steps, n_sats, 6)."""
+    rng = np.random.default_rng(seed)
+    x = circular_states(n_sats, seed)
+    truth = []
+    for _ in range(steps):
+        truth.append(x)
+        x, _ = propagate(x, np.full(n_sats, DT), max_step=1.0)
+    noise = rng.normal(size=(steps, n_sats, 6)) * np.r_[[POS_SIGMA] * 3, [VEL_SIGMA] * 3]
+    return np.array(truth) + noise
+
+
+def make_ekf():
+    return OrbitEKF(pos_sigma_km=POS_SIGMA, vel_sigma_kms=VEL_SIGMA, accel_psd=1e-10)
+
+
+def test_transition_jacobian_matches_finite_differences():
+    # the Jacobian is the product of the linearized substeps, so it matches to second order in the substep
+    x = circular_states(3)
+    dt = np.array([5.0, 30.0, 90.0])
+    _, phi = propagate(x, dt)
+    eps = np.r_[[1e-3] * 3, [1e-6] * 3]
+    fd = np.empty_like(phi)
+    for j in range(6):
+        d = np.zeros(6)
+        d[j] = eps[j]
+        plus, _ = propagate(x + d, dt)
+        minus, _ = propagate(x - d, dt)
+        fd[:, :, j] = (plus - minus) / (2 * eps[j])
+    assert (np.linalg.norm(phi - fd, axis=(1, 2)) / np.linalg.norm(fd, axis=(1, 2)) < 1e-4).all()
+
+
+def test_fleet_update_matches_satellites_filtered_one_by_one():
+    z = measurements(8, 12)
+    ids = [f"SAT-{i}" for i in range(8)]
+    fleet = make_ekf()
+    # two ticks per call, so that each call has two rounds
+    nis = np.concatenate([
+        fleet.update(ids * 2, np.repeat([k * DT, (k + 1) * DT], 8), z[k:k + 2, :, :3].reshape(-1, 3),
+                     z[k:k + 2, :, 3:].reshape(-1, 3)).reshape(2, 8)
+        for k in range(0, 12, 2)
+    ])
+    for i, sat in enumerate(ids):
+        single = make_ekf()
+        alone = [single.update([sat], [k * DT], z[k, i, :3], z[k, i, 3:])[0] for k in range(12)]
+        np.testing.assert_allclose(nis[:, i], alone, rtol=1e-9)
+        x, P = fleet.state(sat)
+        x1, P1 = single.state(sat)
+        np.testing.assert_allclose(x, x1, rtol=1e-12)
+        np.testing.assert_allclose(P, P1, rtol=1e-9)
+    assert np.isnan(nis[0]).all() and np.isfinite(nis[1:]).all()
+
+
+def test_nis_is_chi_square_on_nominal_orbits_and_flags_a_manoeuvre():
+    z = measurements(200, 30, seed=1)
+    ekf = make_ekf()
+    ids = [f"SAT-{i}" for i in range(200)]
+    nis = np.array([ekf.update(ids, np.full(200, k * DT), z[k, :, :3], z[k, :, 3:]) for k in range(30)])
+    settled = nis[10:].ravel()
+    assert 5.0 < settled.mean() < 7.0                 # chi-square, 6 degrees of freedom
+    assert np.mean(settled > 22.46) < 0.005           # its 99.9th percentile
+
+    jumped = z[29] + np.r_[0, 0, 0, 0.1, 0, 0]       # 100 m/s burn on every satellite
+    burn = ekf.update(ids, np.full(200, 30 * DT), jumped[:, :3], jumped[:, 3:])
+    assert (burn > 22.46).all()
+
+
+def test_tracks_restart_after_a_gap_and_skip_bad_measurements():
+    z = measurements(1, 4)[:, 0]
+    ekf = OrbitEKF(pos_sigma_km=POS_SIGMA, vel_sigma_kms=VEL_SIGMA, reinit_gap_s=60.0)
+    assert np.isnan(ekf.update(["S"], [0.0], z[0, :3], z[0, 3:])[0])
+    before = ekf.state("S")
+    assert np.isnan(ekf.update(["S"], [DT], [np.nan, 0, 0], z[1, 3:])[0])
+    np.testing.assert_array_equal(ekf.state("S")[0], before[0])
+    assert np.isfinite(ekf.update(["S"], [DT], z[1, :3], z[1, 3:])[0])
+    assert np.isnan(ekf.update(["S"], [DT + 61.0], z[2, :3], z[2, 3:])[0])
+    assert ekf.stats()["tracks_started"] == 2
+    with pytest.raises(ValueError):
+        OrbitEKF(pos_sigma_km=0.0)
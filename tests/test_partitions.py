@@ -0,0 +1,66 @@
+# tests/test_partitions.py
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.core.database import make_engine
+from backend.core.models import AnomalyEvent
+from backend.services.partitions import PartitionedAnomalyStore, _read_archive, day_of
+
+DAY = datetime(2026, 1, 10)
+
+
+@pytest.fixture
+def store(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'main.db'}")
+    AnomalyEvent.__table__.create(engine)
+    return PartitionedAnomalyStore(engine, str(tmp_path / "partitions"), str(tmp_path / "archive"))
+
+
+def events(n, issues="TEMP_HIGH", start=DAY):
+    return [
+        {"timestamp": start + timedelta(minutes=i), "satellite_id": "SAT-1", "severity": "warning",
+         "issues": issues, "score": 0.5}
+        for i in range(n)
+    ]
+
+
+def test_issue_filter_matches_the_name_literally(store):
+    store.write(events(2, "TEMP_HIGH") + events(3, "TEMPXHIGH,SOLAR") + events(1, "100%"))
+    assert len(store.history(10, issue="TEMP_HIGH")) == 2
+    assert len(store.history(10, issue="TEMPXHIGH")) == 3
+    assert len(store.history(10, issue="100%")) == 1
+    assert store.history(10, issue="%") == []
+
+
+def test_rows_written_while_archiving_land_in_a_new_shard(store, monkeypatch):
+    # another worker, whose engine for the day stays open
+    other = PartitionedAnomalyStore(store.engine, store.partition_dir, store.archive_dir)
+    other.write(events(5))
+    write_archive = store._write_day_archive
+    late = threading.Thread(target=other.write, args=(events(1, start=DAY + timedelta(hours=5)),))
+
+    def racing(day, rows):
+        late.start()
+        time.sleep(0.2)
+        assert late.is_alive()  # waiting for the shard lock
+        return write_archive(day, rows)
+
+    monkeypatch.setattr(store, "_write_day_archive", racing)
+    path = store.archive_day(day_of(DAY))
+    late.join(10)
+    assert len(_read_archive(path)["id"]) == 5
+    assert day_of(DAY) in store.hot_days()  # the late row went into a new shard
+
+    rows = store.history(100)
+    assert len(rows) == len({r["id"] for r in rows}) == 6
+    monkeypatch.setattr(store, "_write_day_archive", write_archive)
+    assert len(_read_archive(store.archive_day(day_of(DAY)))["id"]) == 6
+
+
+def test_null_scores_read_back_from_an_archive_as_none(store):
+    store.write([dict(events(1)[0], score=None)] + events(1, start=DAY + timedelta(hours=1)))
+    store.archive_day(day_of(DAY))
+    assert [r["score"] for r in store.history(10)] == [0.5, None]
@@ -0,0 +1,124 @@
+# tests/test_persistence.py
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.services.persistence import EventWriter, PersistenceQueueFull
+
+
+class FlakyStore:
+    def __init__(self):
+        self.down = True
+        self.rows = []
+
+    def write(self, rows):
+        if self.down:
+            raise ConnectionError("database unavailable")
+        self.rows.extend(rows)
+
+
+class RecordingStore:
+    """Records each write; `gate` (when set) holds writes until it is opened."""
+
+    def __init__(self, delay_s=0.0, gate=None):
+        self.delay_s = delay_s
+        self.gate = gate
+        self.writes = []
+
+    def write(self, rows):
+        if self.gate is not None:
+            self.gate.wait()
+        time.sleep(self.delay_s)
+        self.writes.append((time.monotonic(), list(rows)))
+
+
+def wait_for(fn, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not fn():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def rows(n):
+    t = datetime(2026, 10, 18, 12, 0, 0)
+    return [
+        {"timestamp": t + timedelta(seconds=i), "satellite_id": "SAT-P", "severity": "warning",
+         "issues": "A,B", "score": 0.5}
+        for i in range(n)
+    ]
+
+
+def test_rows_rejected_by_the_store_are_spilled_and_replayed(tmp_path):
+    store = FlakyStore()
+    writer = EventWriter(store, batch_size=4, flush_interval_ms=1, max_retries=2,
+                         spill_dir=str(tmp_path), replay_interval_s=0.05)
+    writer.submit(rows(10))
+    assert writer.flush()
+    stats = writer.stats()
+    assert stats["rows_spilled"] == 10 and stats["spill_files"] > 0 and not store.rows
+
+    # a restarted writer replays what the first one spilled
+    writer.stop()
+    store.down = False
+    writer = EventWriter(store, spill_dir=str(tmp_path), replay_interval_s=0.05)
+    writer.start()
+    writer.stop()
+    assert store.rows == rows(10)
+    assert writer.stats()["rows_replayed"] == 10 and writer.stats()["spill_files"] == 0
+
+
+def test_a_full_batch_is_flushed_without_waiting_for_the_interval(tmp_path):
+    store = RecordingStore()
+    writer = EventWriter(store, batch_size=8, flush_interval_ms=60_000, spill_dir=str(tmp_path))
+    writer.submit(rows(5))
+    time.sleep(0.1)
+    assert store.writes == []                  # below batch_size, interval far away
+    writer.submit(rows(5))
+    wait_for(lambda: store.writes)
+    writer.stop()
+    assert [len(w) for _, w in store.writes] == [8, 2]   # written in batch_size chunks
+
+
+def test_a_partial_batch_is_flushed_after_the_interval(tmp_path):
+    store = RecordingStore()
+    writer = EventWriter(store, batch_size=1000, flush_interval_ms=100, spill_dir=str(tmp_path))
+    writer.start()
+    t0 = time.monotonic()
+    writer.submit(rows(3))
+    wait_for(lambda: store.writes)
+    assert store.writes[0][0] - t0 >= 0.09
+    assert store.writes[0][1] == rows(3)
+    writer.stop()
+
+
+def test_stop_drains_everything_still_queued(tmp_path):
+    store = RecordingStore(delay_s=0.01)
+    writer = EventWriter(store, batch_size=4, flush_interval_ms=60_000, spill_dir=str(tmp_path))
+    for i in range(5):
+        writer.submit(rows(3))
+    writer.stop()
+    assert sum(len(w) for _, w in store.writes) == 15
+    assert writer.pending == 0
+
+
+def test_full_queue_rejects_rows_and_stats_report_depth_and_latency(tmp_path):
+    gate = threading.Event()
+    store = RecordingStore(delay_s=0.02, gate=gate)
+    writer = EventWriter(store, batch_size=2, flush_interval_ms=1, max_queue=6, spill_dir=str(tmp_path))
+    writer.submit(rows(4))
+    writer.submit(rows(2))
+    with pytest.raises(PersistenceQueueFull):
+        writer.submit(rows(1))
+    assert writer.stats()["queue_depth"] == 6
+
+    gate.set()
+    assert writer.flush()
+    writer.submit(rows(1))                     # room again once flushed
+    assert writer.flush()
+    stats = writer.stats()
+    assert stats["queue_depth"] == 0 and stats["rows_written"] == 7
+    assert stats["flushes"] == 4 and stats["last_flush_size"] == 1
+    assert 20.0 <= stats["flush_latency_ms"]["p50"] <= stats["flush_latency_ms"]["p99"] <= stats["flush_latency_ms"]["max"]
+    writer.stop()
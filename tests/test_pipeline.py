@@ -0,0 +1,130 @@
+# tests/test_pipeline.py
+import random
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.models.fusion import fusion_anomaly, fusion_anomaly_batch
+from backend.models.orbit_kalman import OrbitEKF
+from backend.services.pipeline import INPUT, DetectorFeatures, DetectorPipeline, Node, PipelineError
+from backend.services.preprocess import FEATURE_FIELDS
+from simulator.telemetry_simulator import TelemetrySimulator
+
+
+def sleeper(seconds, value):
+    def fn(x):
+        time.sleep(seconds)
+        return x * value
+    return fn
+
+
+def fail(x):
+    raise RuntimeError("detector down")
+
+
+def collect(*args):
+    return args
+
+
+@pytest.fixture
+def make_pipeline():
+    pipelines = []
+
+    def make(nodes):
+        pipelines.append(DetectorPipeline(nodes, executor="thread", workers=4))
+        return pipelines[-1]
+
+    yield make
+    for p in pipelines:
+        p.close()
+
+
+def test_independent_nodes_run_concurrently(make_pipeline):
+    p = make_pipeline([
+        Node("a", sleeper(0.3, 1)), Node("b", sleeper(0.3, 2)), Node("c", sleeper(0.3, 3)),
+        Node("fuse", collect, deps=("a", "b", "c"), inline=True),
+    ])
+    run = p.run(1)
+    assert run["fuse"] == (1, 2, 3)
+    assert 300 <= run.elapsed_ms < 750
+    assert not (run.late or run.failed or run.skipped)
+
+
+def test_late_and_failed_nodes_are_fused_without(make_pipeline):
+    p = make_pipeline([
+        Node("fast", sleeper(0.0, 1), timeout_ms=1000),
+        Node("slow", sleeper(1.0, 2), timeout_ms=100),
+        Node("broken", fail),
+        Node("after_broken", sleeper(0.0, 3), deps=("broken",)),
+        Node("fuse", collect, deps=("fast", "slow", "after_broken"), inline=True, partial=True),
+        Node("strict", collect, deps=("fast", "slow"), inline=True),
+    ])
+    t0 = time.perf_counter()
+    run = p.run(5)
+    assert time.perf_counter() - t0 < 0.8          # did not wait for the slow node
+    assert run["fuse"] == (5, None, None)
+    assert run.late == ["slow"]
+    assert list(run.failed) == ["broken"] and "detector down" in run.failed["broken"]
+    assert sorted(run.skipped) == ["after_broken", "strict"]
+    stats = p.stats()
+    assert stats["partial_runs"] == 1 and stats["nodes"]["slow"]["late"] == 1
+
+
+@pytest.mark.parametrize("nodes", [
+    [Node("a", collect, deps=("b",)), Node("b", collect, deps=("a",))],
+    [Node("a", collect, deps=("nowhere",))],
+    [Node("a", collect), Node("a", collect)],
+    [Node(INPUT, collect)],
+])
+def test_malformed_graphs_are_rejected(nodes):
+    with pytest.raises(PipelineError):
+        DetectorPipeline(nodes)
+
+
+def test_batch_fusion_matches_rowwise_fusion():
+    rng = np.random.default_rng(0)
+    orbit, sensor = rng.uniform(0, 1, 200), rng.uniform(0, 1, 200)
+    sensor[::7] = np.nan
+    fused = fusion_anomaly_batch(orbit, sensor, None)
+    for i in range(200):
+        one = fusion_anomaly(orbit[i], None if np.isnan(sensor[i]) else sensor[i], None)
+        assert fused["fusion_score"][i] == pytest.approx(one["fusion_score"])
+        assert fused["severity"][i] == one["severity"]
+    assert (fusion_anomaly_batch(None, None, None)["fusion_score"] == 0).all()
+
+
+def test_features_share_the_ekf_rows_and_track_inclination_quietly():
+    random.seed(3)
+    sims = [TelemetrySimulator(f"SAT-IN{i}") for i in range(20)]  # more than the initial 16 rows
+    ids, t, rows = [], [], []
+    for k in range(100):
+        for sim in sims:
+            sample = sim.step(5.0)
+            ids.append(sim.satellite_id)
+            t.append(5.0 * k)
+            rows.append([sample[f] for f in FEATURE_FIELDS])
+    ekf = OrbitEKF()
+    features = DetectorFeatures(ekf)
+    orbit = features({"satellite_ids": ids, "t": np.array(t), "features": np.array(rows)})["orbit"]
+
+    assert features.stats()["satellites"] == ekf.stats()["satellites"] == 20
+    assert np.isfinite(orbit["nis"][20:]).all()
+    # a nominal orbit stays below INCLINATION_CHANGE (2 deg); one raw sample does not
+    change = np.abs(orbit["inclination_now"] - orbit["inclination_prev"])
+    assert np.nanmax(change) < 2.0
+
+
+def test_fusion_routes_score_every_sample():
+    sims = [TelemetrySimulator(f"SAT-FU{i}") for i in range(4)]
+    batch = [sim.step() for _ in range(3) for sim in sims]
+    with TestClient(app) as client:
+        results = client.post("/fusion/batch", json=batch).json()["results"]
+        single = client.post("/fusion/", json=sims[0].step()).json()
+    assert [r["satellite_id"] for r in results] == [s["satellite_id"] for s in batch]
+    for r in results + [single]:
+        assert 0.0 <= r["fusion_score"] <= 1.0
+        assert r["severity"] in ("NORMAL", "WARNING", "CRITICAL")
+        assert set(r["missing_detectors"]) <= {"orbit", "sensor", "comms"}
@@ -0,0 +1,77 @@
+# tests/test_raw_store.py
+import os
+
+import numpy as np
+import pytest
+
+from backend.services.raw_store import SLOT_SIZE, RawTelemetryStore, Segment, SegmentCorrupt
+
+T0 = 1_700_000_000.0
+
+
+def rows(n, start=T0, step=10.0):
+    t = start + step * np.arange(n)
+    return t, np.arange(n * 15, dtype=float).reshape(n, 15)
+
+
+def test_round_trip_across_days_and_chunks(tmp_path):
+    store = RawTelemetryStore(str(tmp_path), capacity=64)
+    t, x = rows(1000, step=400.0)  # ~4.6 days, several chunks per day
+    store.append_batch(["SAT-1"] * len(t), t, x)
+    got_t, got_x = store.read_range("SAT-1", t[100], t[900])
+    assert np.array_equal(got_t, t[100:900]) and np.array_equal(got_x, x[100:900])
+    store.close()
+
+
+def test_similar_ids_do_not_share_files(tmp_path):
+    store = RawTelemetryStore(str(tmp_path))
+    ids = ["SAT/1", "SAT_1", "SAT%2F1", "..", "."]
+    for i, sid in enumerate(ids):
+        store.append(sid, *rows(1 + i))
+    for i, sid in enumerate(ids):
+        assert store.read_range(sid, T0, T0 + 1e6)[0].size == 1 + i
+    assert all(os.path.dirname(p) != str(tmp_path) for p in store._segments)
+    store.close()
+
+
+def test_read_segments_are_bounded(tmp_path):
+    store = RawTelemetryStore(str(tmp_path), capacity=16, max_open=4)
+    t, x = rows(16 * 20)
+    store.append("SAT-1", t, x)
+    assert store.read_range("SAT-1", T0, T0 + 1e6)[0].size == t.size
+    assert len(store._segments) <= 4
+    store.close()
+
+
+def test_wide_range_reads_only_existing_days(tmp_path, monkeypatch):
+    store = RawTelemetryStore(str(tmp_path))
+    store.append("SAT-1", *rows(5))
+    listings = []
+    listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda d: listings.append(d) or listdir(d))
+    assert store.read_range("SAT-1", 0.0, 4e9)[0].size == 5  # ~126 years
+    assert len(listings) == 1
+    store.close()
+
+
+def test_torn_header_falls_back_to_previous_row_count(tmp_path):
+    path = str(tmp_path / "seg.seg")
+    seg = Segment(path, capacity=32)
+    seg.append(*rows(3))
+    seg.append(*rows(2, start=T0 + 100))
+    seq = seg._seq
+    seg.close()
+
+    # tear the newest header slot
+    with open(path, "r+b") as f:
+        f.seek((seq % 2) * SLOT_SIZE + 8)
+        f.write(b"\xff" * 8)
+    seg = Segment(path)
+    assert seg.rows == 3
+    assert np.array_equal(seg.range(0, 2 * T0)[0], rows(3)[0])
+    seg.close()
+
+    with open(path, "r+b") as f:
+        f.write(b"\0" * 2 * SLOT_SIZE)
+    with pytest.raises(SegmentCorrupt):
+        Segment(path)
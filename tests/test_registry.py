@@ -0,0 +1,91 @@
+# tests/test_registry.py
+import os
+import time
+
+import numpy as np
+import pytest
+
+from backend.inference.registry import ModelRegistry
+from backend.inference.run_inference import DenseAutoencoder, load_npz
+from backend.services.preprocess import FEATURE_FIELDS
+
+N = len(FEATURE_FIELDS)
+
+
+def save_model(path, scale):
+    """An identity autoencoder whose score is (scale - 1)^2 * mean(x^2)."""
+    np.savez(path, W0=np.eye(N, dtype=np.float32) * scale, b0=np.zeros(N, dtype=np.float32),
+             activations=np.array(["linear"]))
+
+
+def wait_for(fn, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not fn():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_load_npz_maps_stored_arrays_in_place(tmp_path):
+    path = str(tmp_path / "a.npz")
+    arrays = {"W0": np.arange(12.0).reshape(3, 4), "b0": np.arange(4, dtype=np.float32)}
+    np.savez(path, **arrays)
+    mapped = load_npz(path, mmap=True)
+    assert all(isinstance(mapped[k], np.memmap) for k in arrays)
+    for k, v in arrays.items():
+        np.testing.assert_array_equal(mapped[k], v)
+
+    np.savez_compressed(path, **arrays)
+    read = load_npz(path, mmap=True)
+    assert not any(isinstance(v, np.memmap) for v in read.values())
+    np.testing.assert_array_equal(read["W0"], arrays["W0"])
+
+
+def test_models_load_lazily_and_follow_current(tmp_path):
+    d = tmp_path / "ae"
+    d.mkdir()
+    save_model(str(d / "001.npz"), 1.0)
+    save_model(str(d / "002.npz"), 2.0)
+    loads = []
+    reg = ModelRegistry(check_interval_s=0.0)
+    reg.register("ae", str(d), lambda f: loads.append(f) or DenseAutoencoder(f))
+    assert loads == []                                   # nothing at registration
+    assert reg.get("ae").path.endswith("002.npz")        # last version by default
+    assert reg.versions("ae") == ["001", "002"]
+
+    reg.activate("ae", "001")
+    assert reg.get("ae").path.endswith("001.npz")
+    assert open(d / "CURRENT").read().strip() == "001"
+    with pytest.raises(KeyError):
+        reg.activate("ae", "003")
+    assert reg.stats()["ae"]["loads"] == 2
+
+
+def test_new_versions_swap_in_and_bad_ones_are_skipped(tmp_path):
+    d = tmp_path / "ae"
+    d.mkdir()
+    save_model(str(d / "001.npz"), 1.0)
+    reg = ModelRegistry(check_interval_s=0.0)
+    reg.register("ae", str(d), DenseAutoencoder)
+    first = reg.get("ae")
+    x = np.ones((1, N))
+    assert first.score(x)[0] == 0.0
+
+    with open(d / "002.npz", "wb") as f:
+        f.write(b"not a zip file")
+    reg.get("ae")
+    wait_for(lambda: reg.stats()["ae"]["failures"] == 1)
+    assert reg.get("ae") is first and reg.stats()["ae"]["last_error"]
+
+    save_model(str(d / ".003.npz"), 3.0)                  # written under a dot-name, then published
+    os.replace(d / ".003.npz", d / "003.npz")
+    reg.get("ae")
+    wait_for(lambda: reg.stats()["ae"]["version"] == "003")
+    assert reg.get("ae").score(x)[0] == pytest.approx(4.0)
+    assert first.score(x)[0] == 0.0                      # holders of the old model still work
+
+
+def test_missing_artifact_serves_no_model(tmp_path):
+    reg = ModelRegistry(check_interval_s=0.0)
+    reg.register("ae", str(tmp_path / "nowhere"), DenseAutoencoder)
+    assert reg.get("ae") is None
+    assert reg.stats()["ae"]["version"] is None
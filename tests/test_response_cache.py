@@ -0,0 +1,40 @@
+# tests/test_response_cache.py
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.services.response_cache import ResponseCache
+from simulator.telemetry_simulator import TelemetrySimulator
+
+
+def test_bodies_are_rendered_once_per_version():
+    cache = ResponseCache(max_entries=2, shared=False)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    body, etag = cache.get_or_render("a", compute)
+    assert cache.get_or_render("a", compute) == (body, etag) and len(calls) == 1
+    cache.bump()
+    body2, etag2 = cache.get_or_render("a", compute)
+    assert body2 == b'{"n":2}' and etag2 != etag
+    cache.get_or_render("b", compute)
+    cache.get_or_render("c", compute)
+    assert cache.stats()["evictions"] == 1 and cache.stats()["entries"] == 2
+
+
+def test_unchanged_poll_gets_304_until_the_next_ingest():
+    sim = TelemetrySimulator("SAT-E1")
+    params = {"satellite_id": "SAT-E1", "limit": 10}
+    with TestClient(app) as client:
+        client.post("/telemetry/", json=sim.step())
+        first = client.get("/anomalies/latest", params=params)
+        etag = first.headers["etag"]
+        again = client.get("/anomalies/latest", params=params, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.headers["etag"] == etag
+
+        client.post("/telemetry/", json=sim.step())
+        fresh = client.get("/anomalies/latest", params=params, headers={"If-None-Match": etag})
+        assert fresh.status_code == 200 and fresh.headers["etag"] != etag
+        assert len(fresh.json()["data"]) == len(first.json()["data"]) + 1
@@ -0,0 +1,108 @@
+# tests/test_rollups.py
+import os
+
+import numpy as np
+import pytest
+
+from backend.services import rollups as rollups_module
+from backend.services.rollups import RollupStore
+from backend.utils.thresholds import ThresholdRules
+
+RULES = """
+telemetry:
+  rules:
+    - {column: a, op: ">", value: 1, issue: A_HIGH, score: 0.5}
+"""
+T0 = 1_700_000_040.0
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 1))
+
+
+def record(*issues):
+    return {"satellite_id": "SAT-R", "anomaly": {"score": 0.5, "severity": "warning", "issues": list(issues)}}
+
+
+def test_issue_counters_follow_the_active_rules(tmp_path, monkeypatch):
+    path = str(tmp_path / "rules.yaml")
+    write(path, RULES)
+    monkeypatch.setattr(rollups_module, "threshold_rules", ThresholdRules(path=path, check_interval_s=0.0))
+    store = RollupStore()
+
+    store.add_records([record("A_HIGH"), record()], np.array([T0, T0 + 1]))
+    assert store.issue_names == ["A_HIGH"]
+
+    write(path, RULES + "    - {column: b, op: \">\", value: 1, issue: B_HIGH, score: 0.5}\n")
+    store.add_records([record("A_HIGH", "B_HIGH")], np.array([T0 + 2]))
+    assert store.issue_names == ["A_HIGH", "B_HIGH"]
+
+    # names of stored events from older rules are counted as well
+    store._add_columns({
+        "id": np.arange(2), "satellite_id": np.array(["SAT-R", "SAT-R"]),
+        "timestamp": np.array([T0 + 3, T0 + 4]) * 1e6, "score": np.array([0.2, 0.3]),
+        "severity": np.array(["warning", "normal"]), "issues": np.array(["OLD,A_HIGH", ""]),
+    })
+    points = store.query("SAT-R", T0 - 60, T0 + 60)["points"]
+    assert sum(p["count"] for p in points) == 5
+    totals = {}
+    for p in points:
+        for name, k in p["issues"].items():
+            totals[name] = totals.get(name, 0) + k
+    assert totals == {"A_HIGH": 3, "B_HIGH": 1, "OLD": 1}
+
+
+def event_store(resolutions, events):
+    store = RollupStore(resolutions=resolutions)
+    t, score, severity = zip(*events)
+    store.add(["SAT-R"] * len(events), np.array(t), np.array(score),
+              np.array([rollups_module.SEVERITY_CODES[s] for s in severity]), [[] for _ in events])
+    return store
+
+
+def test_resolution_is_the_finest_that_fits_the_point_budget_and_reaches_back():
+    store = event_store((("1m", 60, 60), ("1h", 3600, 720), ("1d", 86400, 365)), [(T0, 0.1, "normal")])
+    assert store.query("SAT-R", T0, T0 + 3000, max_points=500)["resolution"] == "1m"
+    assert store.query("SAT-R", T0, T0 + 3000, max_points=40)["resolution"] == "1h"
+    assert store.query("SAT-R", T0, T0 + 10 * 86400, max_points=500)["resolution"] == "1h"
+    assert store.query("SAT-R", T0, T0 + 30 * 86400, max_points=500)["resolution"] == "1d"
+
+    # two hours later the 60-slot minute ring no longer reaches T0
+    store.add(["SAT-R"], np.array([T0 + 7200]), np.array([0.1]), np.array([0]), [[]])
+    assert store.query("SAT-R", T0, T0 + 600, max_points=500)["resolution"] == "1h"
+    assert store.query("SAT-R", T0 + 7200, T0 + 7800, max_points=500)["resolution"] == "1m"
+
+
+def test_bucket_aggregates_at_every_resolution():
+    # T0 sits 840 s into its hour and 80040 s into its UTC day
+    store = event_store((("1m", 60, 4000), ("1h", 3600, 720), ("1d", 86400, 365)), [
+        (T0, 0.2, "normal"),
+        (T0 + 10, 0.8, "critical"),
+        (T0 + 20, 0.5, "warning"),
+        (T0 + 70, 0.4, "warning"),
+        (T0 + 3600, 0.6, "warning"),
+        (T0 + 86400, 0.9, "critical"),
+    ])
+
+    def summary(result):
+        return [
+            (p["count"], pytest.approx(p["max_score"]), pytest.approx(p["mean_score"]),
+             [p["severity"][s] for s in rollups_module.SEVERITIES])
+            for p in result["points"]
+        ]
+
+    minutes = store.query("SAT-R", T0 - 60, T0 + 120, max_points=10)
+    assert minutes["resolution"] == "1m" and minutes["bucket_seconds"] == 60
+    assert summary(minutes) == [(3, 0.8, 0.5, [1, 1, 1]), (1, 0.4, 0.4, [0, 1, 0])]
+
+    hours = store.query("SAT-R", T0 - 60, T0 + 2 * 86400, max_points=100)
+    assert hours["resolution"] == "1h"
+    assert summary(hours) == [(4, 0.8, 0.475, [1, 2, 1]), (1, 0.6, 0.6, [0, 1, 0]), (1, 0.9, 0.9, [0, 0, 1])]
+
+    days = store.query("SAT-R", T0 - 60, T0 + 2 * 86400, max_points=5)
+    assert days["resolution"] == "1d"
+    assert summary(days) == [(5, 0.8, 0.5, [1, 3, 1]), (1, 0.9, 0.9, [0, 0, 1])]
+    assert days["points"][0]["timestamp"] == "2023-11-14T00:00:00+00:00"
@@ -0,0 +1,106 @@
+# tests/test_run_inference.py
+import numpy as np
+import pytest
+
+from backend.inference.run_inference import DenseAutoencoder, ModelFormatError, export_dense_autoencoder
+from backend.services.preprocess import FEATURE_FIELDS
+
+
+class FakeDense:
+    """The two methods of a Keras Dense layer that the exporter uses."""
+
+    def __init__(self, kernel, bias, activation):
+        self.name = f"dense_{activation}"
+        self._weights = [kernel, bias]
+        self._activation = activation
+
+    def get_weights(self):
+        return self._weights
+
+    def get_config(self):
+        return {"activation": self._activation}
+
+
+class FakeInput:
+    name = "input"
+
+    def get_weights(self):
+        return []
+
+
+class FakeModel:
+    def __init__(self, widths, activations, seed=0):
+        rng = np.random.default_rng(seed)
+        self.layers = [FakeInput()]  # skipped by the exporter
+        for (a, b), act in zip(zip(widths, widths[1:]), activations):
+            self.layers.append(FakeDense(rng.normal(0, 0.3, (a, b)).astype(np.float32),
+                                         rng.normal(0, 0.1, b).astype(np.float32), act))
+
+
+ACT = {
+    "relu": lambda a: np.maximum(a, 0),
+    "tanh": np.tanh,
+    "sigmoid": lambda a: 1 / (1 + np.exp(-a)),
+    "elu": lambda a: np.where(a < 0, np.expm1(a), a),
+    "softplus": lambda a: np.log1p(np.exp(a)),
+    "linear": lambda a: a,
+}
+
+
+def forward(model, x, mean, scale):
+    z = (x - mean) / scale
+    a = z
+    for layer in model.layers[1:]:
+        W, b = layer.get_weights()
+        a = ACT[layer.get_config()["activation"]](a @ W.astype(float) + b)
+    return a, ((a - z) ** 2).mean(axis=1)
+
+
+@pytest.fixture
+def exported(tmp_path):
+    n = len(FEATURE_FIELDS)
+    acts = ["relu", "tanh", "elu", "sigmoid", "softplus", "linear"]
+    model = FakeModel([n, 12, 8, 4, 8, 12, n], acts)
+    rng = np.random.default_rng(1)
+    mean, scale = rng.normal(0, 5, n), rng.uniform(0.5, 3, n)
+    path = str(tmp_path / "ae.npz")
+    export_dense_autoencoder(model, path, mean=mean, scale=scale, threshold=0.25)
+    return model, path, mean.astype(np.float32), scale.astype(np.float32)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+@pytest.mark.parametrize("batch_size", [1, 7, 4096])
+def test_scores_match_a_plain_forward_pass(exported, mmap, batch_size):
+    model, path, mean, scale = exported
+    ae = DenseAutoencoder(path, batch_size=batch_size, mmap=mmap)
+    assert ae.threshold == 0.25 and ae.dtype == np.float32
+    assert (ae.mapped > 0) == mmap
+    x = np.random.default_rng(2).normal(0, 10, (50, len(FEATURE_FIELDS)))
+    recon, err = forward(model, x, mean, scale)
+    np.testing.assert_allclose(ae.reconstruct(x), recon, rtol=1e-4, atol=1e-5)
+    np.testing.assert_allclose(ae.score(x), err, rtol=1e-4, atol=1e-6)
+
+
+def test_nan_inputs_score_nan_without_touching_other_rows(exported):
+    _, path, _, _ = exported
+    ae = DenseAutoencoder(path, batch_size=4)
+    x = np.random.default_rng(3).normal(0, 1, (10, len(FEATURE_FIELDS)))
+    clean = ae.score(x)
+    x[5, 2] = np.nan
+    err = ae.score(x)
+    assert np.isnan(err[5])
+    np.testing.assert_array_equal(np.delete(err, 5), np.delete(clean, 5))
+
+
+@pytest.mark.parametrize("arrays", [
+    {"b0": np.zeros(15)},                                                     # no kernels
+    {"W0": np.zeros((15, 4)), "b0": np.zeros(4)},                             # output width != input
+    {"W0": np.zeros((15, 15)), "b0": np.zeros(3)},                            # bias shape
+    {"W0": np.zeros((15, 15)), "b0": np.zeros(15), "activations": np.array(["gelu"])},
+    {"W0": np.zeros((2, 2)), "b0": np.zeros(2), "features": np.array(["rssi", "bogus"])},
+])
+def test_malformed_exports_are_rejected(tmp_path, arrays):
+    path = str(tmp_path / "bad.npz")
+    np.savez(path, **arrays)
+    with pytest.raises(ModelFormatError):
+        DenseAutoencoder(path)
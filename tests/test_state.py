@@ -0,0 +1,33 @@
+# tests/test_state.py
+from datetime import datetime, timedelta, timezone
+
+from backend.services.state import AnomalyState
+
+T0 = datetime(2026, 5, 1, tzinfo=timezone.utc)
+
+
+def record(satellite_id, i, severity="warning", issues=("SENSOR_DRIFT",)):
+    return {
+        "timestamp": (T0 + timedelta(seconds=i)).isoformat(),
+        "satellite_id": satellite_id,
+        "anomaly": {"severity": severity, "issues": list(issues), "score": i / 10},
+    }
+
+
+def test_rings_keep_the_newest_records_per_satellite_and_fleet():
+    state = AnomalyState(per_sat_capacity=4, fleet_capacity=6, max_satellites=2, shared=False)
+    records = [record(("SAT-1", "SAT-2")[i % 2], i, issues=("NEW_ISSUE",) if i == 9 else ()) for i in range(10)]
+    state.add(records[:3])
+    state.add(records[3:])
+
+    assert state.latest(100) == records[::-1][:6]
+    assert state.latest(100, "SAT-1") == [r for r in records if r["satellite_id"] == "SAT-1"][::-1][:4]
+    assert state.latest(2, "SAT-2") == [records[9], records[7]]
+    assert state.latest(5, "SAT-9") == []
+
+
+def test_satellites_over_the_limit_are_not_stored():
+    state = AnomalyState(per_sat_capacity=4, fleet_capacity=6, max_satellites=2, shared=False)
+    state.add([record("SAT-1", 0), record("SAT-2", 1), record("SAT-3", 2)])
+    assert [r["satellite_id"] for r in state.latest(10)] == ["SAT-2", "SAT-1"]
+    assert state.stats()["satellites"] == 2
@@ -0,0 +1,69 @@
+# tests/test_stream_ingest.py
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from simulator.telemetry_simulator import TelemetrySimulator
+
+
+def test_one_reply_per_frame_in_order():
+    sim = TelemetrySimulator("SAT-WS1")
+    frames = [
+        {"seq": 1, "samples": [sim.step() for _ in range(5)]},
+        dict(sim.step(), seq=2),
+        "not json",
+        {"seq": 4, "samples": [dict(sim.step(), temp_battery="hot")]},
+        [sim.step(), sim.step()],
+    ]
+    with TestClient(app) as client, client.websocket_connect("/telemetry/stream") as ws:
+        for frame in frames:
+            ws.send_text(frame if isinstance(frame, str) else json.dumps(frame))
+        replies = [ws.receive_json() for _ in frames]
+
+        # the same samples posted as one batch for a fresh satellite score identically
+        ok = frames[0]["samples"] + [{k: v for k, v in frames[1].items() if k != "seq"}] + frames[4]
+        batch = client.post("/telemetry/batch", json=[dict(s, satellite_id="SAT-WS2") for s in ok]).json()
+
+    assert [r["seq"] for r in replies] == [1, 2, None, 4, None]
+    assert [r["status"] for r in replies] == ["ok", "ok", "error", "error", "ok"]
+    assert replies[2]["code"] == replies[3]["code"] == 422
+    streamed = replies[0]["results"] + replies[1]["results"] + replies[4]["results"]
+    assert [r["anomaly"] for r in streamed] == [r["anomaly"] for r in batch["results"]]
+
+
+def test_a_stalled_consumer_bounds_the_inbox_and_pauses_the_reader(monkeypatch):
+    from backend.api.routes import telemetry
+
+    seen = {"peak": 0, "blocked_puts": 0}
+
+    class HeldQueue(asyncio.Queue):
+        """Inbox whose consumer stays parked until the reader has filled it."""
+        held = True
+
+        async def put(self, item):
+            if self.full():
+                seen["blocked_puts"] += 1
+            await super().put(item)
+            seen["peak"] = max(seen["peak"], self.qsize())
+
+        async def get(self):
+            for _ in range(500):
+                if not self.held or self.full():
+                    break
+                await asyncio.sleep(0.01)
+            HeldQueue.held = False
+            return await super().get()
+
+    monkeypatch.setattr(telemetry, "STREAM_MAX_INFLIGHT", 4)
+    monkeypatch.setattr(telemetry.asyncio, "Queue", HeldQueue)
+    sim = TelemetrySimulator("SAT-WS3")
+    with TestClient(app) as client, client.websocket_connect("/telemetry/stream") as ws:
+        for seq in range(20):
+            ws.send_text(json.dumps(dict(sim.step(), seq=seq)))
+        replies = [ws.receive_json() for _ in range(20)]
+
+    assert [r["seq"] for r in replies] == list(range(20))
+    assert seen["peak"] == 4
+    assert seen["blocked_puts"] > 0
@@ -0,0 +1,89 @@
+# tests/test_thresholds.py
+import os
+
+import numpy as np
+import pytest
+import yaml
+
+from backend.utils.thresholds import RuleFormatError, ThresholdRules, compile_rules
+
+RULES = """
+demo:
+  derived:
+    spread: {op: absdiff, of: [a, b]}
+  rules:
+    - column: a
+      levels:
+        - {op: ">", value: 10, issue: A_HIGH, score: 0.6}
+        - {op: ">=", value: 5, issue: A_RAISED, score: 0.3}
+    - {column: spread, op: ">", value: 2, issue: SPREAD, score: 0.4}
+  score: {cap: 1.0}
+  severity: {by: issues, tiers: {warning: 1, critical: 2}}
+"""
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+    # make the mtime change visible even on coarse-grained filesystems
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 1))
+
+
+@pytest.fixture
+def rules(tmp_path):
+    path = str(tmp_path / "rules.yaml")
+    write(path, RULES)
+    live = ThresholdRules(path=path, check_interval_s=0.0)
+    live.declare_inputs("demo", ("a", "b"))
+    return path, live
+
+
+def test_fused_lookup_matches_rowwise_rules():
+    rs = compile_rules(yaml.safe_load(RULES))["demo"]
+    rng = np.random.default_rng(0)
+    a = rng.choice([np.nan, 4.0, 5.0, 7.0, 10.0, 12.0], 500)
+    b = rng.uniform(0, 15, 500)
+    result = rs.evaluate({"a": a, "b": b})
+    for i in range(a.size):
+        issues = []
+        if a[i] > 10:
+            issues.append("A_HIGH")
+        elif a[i] >= 5:
+            issues.append("A_RAISED")
+        if not np.isnan(a[i]) and abs(a[i] - b[i]) > 2:
+            issues.append("SPREAD")
+        score = min(1.0, 0.6 * ("A_HIGH" in issues) + 0.3 * ("A_RAISED" in issues) + 0.4 * ("SPREAD" in issues))
+        row = result[i]
+        assert row["issues"] == issues
+        assert row["score"] == pytest.approx(score)
+        assert row["severity"] == ("normal", "warning", "critical")[min(len(issues), 2)]
+
+
+@pytest.mark.parametrize("broken", [
+    RULES.replace("critical: 2", "critical: two"),     # non-numeric tier
+    RULES.replace("column: a\n", "column: aa\n"),      # misspelled column
+    RULES.replace("score: 0.4", "score: high"),        # non-numeric score
+    "demo: [unclosed",                                 # not YAML
+    "other: {rules: []}",                              # declared ruleset missing
+])
+def test_failed_reload_keeps_last_good_rules(rules, broken):
+    path, live = rules
+    write(path, broken)
+    assert live.get("demo").evaluate({"a": 11.0, "b": 11.0})[0]["issues"] == ["A_HIGH"]
+    stats = live.stats()
+    assert stats["version"] == 1 and stats["failures"] == 1 and stats["last_error"]
+    # the broken file is not parsed again on every check, only once it changes
+    for _ in range(3):
+        live.get("demo")
+    assert live.stats()["failures"] == 1
+
+    write(path, RULES.replace("value: 10", "value: 20"))
+    assert live.get("demo").evaluate({"a": 11.0, "b": 11.0})[0]["issues"] == ["A_RAISED"]
+    assert live.stats()["version"] == 2
+
+
+def test_declaring_inputs_rejects_current_rules_reading_unknown_columns(rules):
+    _, live = rules
+    with pytest.raises(RuleFormatError):
+        live.declare_inputs("demo", ("a",))
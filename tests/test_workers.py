@@ -0,0 +1,75 @@
+# tests/test_workers.py
+import subprocess
+import sys
+
+from backend.services.response_cache import ResponseCache
+from backend.services.shm import claim_single_process
+
+CLAIM = "from backend.services.shm import claim_single_process; print(claim_single_process({name!r}))"
+
+
+def test_second_process_cannot_claim_a_held_lock(tmp_path):
+    name = f"{tmp_path.name}-single-worker"
+    assert claim_single_process(name) and claim_single_process(name)
+    out = subprocess.run([sys.executable, "-c", CLAIM.format(name=name)], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+ETAG = """
+from backend.services.response_cache import ResponseCache
+cache = ResponseCache(shared=True, name={name!r})
+if {bump}:
+    cache.bump()
+print(cache.etag(ResponseCache.key("latest", {{"limit": 200}})))
+"""
+
+
+def test_etag_of_another_worker_is_honoured(tmp_path):
+    from multiprocessing import shared_memory
+
+    name = f"{tmp_path.name}-cache-version"
+    other_worker = lambda bump: subprocess.run(
+        [sys.executable, "-c", ETAG.format(name=name, bump=bump)], capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    ours = ResponseCache(shared=True, name=name)
+    try:
+        key = ResponseCache.key("latest", {"limit": 200})
+        tag = other_worker(bump=False)
+        assert tag == ours.etag(key)
+        assert ours.not_modified(key, tag)
+        # a write in any worker makes every earlier tag stale
+        other_worker(bump=True)
+        assert not ours.not_modified(key, tag)
+    finally:
+        shared_memory.SharedMemory(name=name).unlink()
+
+
+def test_etag_of_an_unshared_process_is_not_honoured():
+    ours, theirs = ResponseCache(shared=False), ResponseCache(shared=False)
+    key = ResponseCache.key("rollup", {"satellite_id": "SAT-1"})
+    assert ours.not_modified(key, ours.etag(key))
+    assert not ours.not_modified(key, theirs.etag(key))
+
+
+WRITER = """
+from backend.services.state import AnomalyState
+state = AnomalyState(per_sat_capacity=8, fleet_capacity=16, max_satellites=4, shared=True, name={name!r})
+state.add([{{"timestamp": "2026-05-01T00:00:0{{}}+00:00".format(i), "satellite_id": "SAT-W{{}}".format(i % 2),
+            "anomaly": {{"severity": "warning", "issues": ["FROM_CHILD"], "score": 0.5}}}} for i in range(5)])
+"""
+
+
+def test_state_written_by_another_process_is_visible(tmp_path):
+    from multiprocessing import shared_memory
+
+    from backend.services.state import AnomalyState
+
+    name = f"{tmp_path.name}-anomalies"
+    state = AnomalyState(per_sat_capacity=8, fleet_capacity=16, max_satellites=4, shared=True, name=name)
+    try:
+        subprocess.run([sys.executable, "-c", WRITER.format(name=name)], check=True)
+        assert [r["timestamp"] for r in state.latest(10)] == [f"2026-05-01T00:00:0{i}+00:00" for i in range(4, -1, -1)]
+        assert [r["anomaly"]["issues"] for r in state.latest(1, "SAT-W1")] == [["FROM_CHILD"]]
+    finally:
+        state.close()
+        shared_memory.SharedMemory(name=name).unlink()